@@ -1,1209 +1,113 @@
-import streamlit as st
-import pandas as pd
-import os
-
-# ---------------------------
-# Paths e diretórios
-# ---------------------------
-DATA_DIR = "data"
-os.makedirs(DATA_DIR, exist_ok=True)
-
-PATH_COLAB = os.path.join(DATA_DIR, "colaboradores.csv")
-PATH_MICRO = os.path.join(DATA_DIR, "microareas.csv")
-PATH_ATIV = os.path.join(DATA_DIR, "atividades.csv")
-PATH_DEM = os.path.join(DATA_DIR, "demandas.csv")
-PATH_COLAB_ATIV = os.path.join(DATA_DIR, "colab_atividades.csv")
-
-# ---------------------------
-# Lista padrão Grupo x Atividade x tempo (min) x fator (% por projeto)
-# ---------------------------
-DEFAULT_GRUPOS_ATIVIDADES = [
-    ("Entrada", "Fotos", 5, 100),
-    ("Entrada", "Dar entrada labtrack", 5, 100),
-    ("Entrada", "Dar entrada atlas", 5, 50),
-    ("Entrada", "Montar minuta", 10, 100),
-    ("Entrada", "Assinar ID", 5, 100),
-    ("Entrada", "Emendas ID", 30, 20),
-    ("Entrada", "Planilha ETS", 5, 50),
-    ("Entrada", "Gerar minutas", 5, 100),
-
-    ("17087", "Ensaiar aquecimento", 10, 60),
-    ("17087", "Devolução", 5, 100),
-    ("17087", "Choque", 10, 20),
-    ("17087", "Fechar relatório 17087", 10, 60),
-    ("17087", "Assinar 17087", 10, 60),
-    ("17087", "Emendas 17087", 30, 12),
-
-    ("EMC", "Radiada", 30, 55),
-    ("EMC", "Imunidade", 40, 55),
-    ("EMC", "Intensidade de campo", 150, 20),
-    ("EMC", "Ensaio conduzido", 30, 20),
-    ("EMC", "Imunidade conduzida", 80, 20),
-    ("EMC", "Configurações EMC", 60, 20),
-    ("EMC", "Fechar relatório EMC", 20, 55),
-    ("EMC", "Assinar EMC", 20, 55),
-    ("EMC", "Emendas EMC", 30, 10),
-    ("EMC", "Ensaio acompanhado", 480, 2),
-    ("EMC", "Estudo de Normas, Acompanhamento Clientes, Desenvolvimento da Área, Gerenciar a Agenda", 480, 2),
-    ("EMC", "Dúvidas comercial", 60, 4),
-    ("EMC", "Reuniões", 120, 10),
-
-    ("RF", "Configurações RF", 120, 40),
-    ("RF", "Wi-Fi", 420, 15),
-    ("RF", "Ensaio DFS", 45, 5),
-    ("RF", "Ensaio SAR", 60, 20),
-    ("RF", "BT", 120, 25),
-    ("RF", "Lora", 120, 5),
-    ("RF", "Emendas RF", 30, 10),
-    ("RF", "Fechar relatório RF", 30, 40),
-    ("RF", "Assinar RF", 10, 40),
-    ("RF", "Reuniões", 120, 15),
-    ("RF", "Dúvidas comercial", 120, 4),
-
-    ("EMC Extras", "Ensaios Eletrodomésticos", 120, 5),
-    ("EMC Extras", "Devolver eletrodoméstico", 30, 5),
-    ("EMC Extras", "Fechar relatório eletrodomésticos", 30, 5),
-    ("EMC Extras", "Eletromedicos", 480, 5),
-    ("EMC Extras", "Fechar relatório eletromedicos", 60, 5),
-    ("EMC Extras", "Fechar relatório TV", 120, 5),
-    ("EMC Extras", "TVs", 480, 5),
-
-    ("3GPP", "IPV6", 60, 5),
-    ("3GPP", "Ensaios Funcionais (2G, 3G e 4G)", 480, 5),
-    ("3GPP", "Reuniões", 60, 5),
-    ("3GPP", "Retestes", 240, 5),
-    ("3GPP", "Funcional", 60, 5),
-    ("3GPP", "Fechar relatório ipv6", 60, 5),
+import time
 
-    ("Baterias", "Ensaio de Powerbank", 90, 10),
-    ("Baterias", "Fechar relatório Powerbank", 30, 10),
-    ("Baterias", "Organizar Powerbanks (devolução, cronograma, etc)", 30, 10),
+_INICIO_IMPORTACAO = time.perf_counter()
 
-    ("Acústicos", "Ensaio acústico", 60, 5),
-    ("Acústicos", "Relatórios ensaio acústico", 60, 5),
-    ("Acústicos", "Devolver amostras acústico", 60, 5),
-    ("Acústicos", "Retirar amostras acústico", 60, 5),
-    ("Acústicos", "Fotos das amostras acústico", 60, 5),
-    ("Acústicos", "outros ensaios (Exemplo, TV)", 240, 5),
-
-    ("Desenvolvimento", "Desenvolvimento de Melhorias", 480, 5),
-]
-
-# ---------------------------
-# Lista padrão de colaboradores: (cargo, microarea_principal, nome)
-# ---------------------------
-DEFAULT_COLABS = [
-    ("Estagiário", "Entrada", "Kaua"),
-    ("Estagiário", "Entrada", "Henrique"),
-    ("Assistente", "Entrada", "Cristian"),
-    ("Estagiário", "Entrada", "Isadora"),
-
-    ("Assistente", "17087", "Arthur"),
-
-    ("Analista", "EMC", "Philipe"),
-    ("Especialista", "EMC", "Elinaldo"),
-    ("Assistente", "EMC", "Fernando"),
-    ("Estagiário", "EMC", "João de Paula"),
-    ("Assistente", "EMC", "Eduardo Altnetter"),
-    ("Assistente", "EMC", "Júlia Nascimento"),
-    ("Analista", "EMC", "Felipe Constant"),
-
-    ("Assistente", "RF", "João Daneres"),
-    ("Assistente", "RF", "Bernardo"),
-    ("Estagiário", "RF", "Rafael"),
-    ("Assistente", "RF", "Francis"),
-    ("Assistente", "RF", "João Vitor"),
-    ("Estagiário", "RF", "Georgia"),
-
-    ("Analista", "3GPP", "Greter"),
-    ("Analista", "3GPP", "Eduardo Oliveira"),
-
-    ("Analista", "RF", "João Pinheiro"),
-    ("Assistente", "RF", "Marcelo"),
-
-    ("Estagiário", "Baterias", "Fabricio"),
-]
-
-# ---------------------------
-# Utilitários de dados
-# ---------------------------
-def load_csv(path, columns):
-    if not os.path.exists(path):
-        df = pd.DataFrame(columns=columns)
-        df.to_csv(path, index=False)
-    else:
-        df = pd.read_csv(path)
-    for c in columns:
-        if c not in df.columns:
-            df[c] = None
-    return df[columns]
-
-
-def save_csv(path, df):
-    df.to_csv(path, index=False)
-
-
-def new_id(df):
-    if df.empty or "id" not in df.columns:
-        return 1
-    return int(df["id"].max()) + 1
-
-
-def get_colaboradores():
-    cols = [
-        "id", "nome", "cargo", "carga_diaria",
-        "microarea_principal", "microareas_secundarias", "ativo"
-    ]
-    df = load_csv(PATH_COLAB, cols)
-    if df.empty:
-        return df
-    df["carga_diaria"] = pd.to_numeric(df["carga_diaria"], errors="coerce")
-    df["ativo"] = df["ativo"].fillna("sim")
-    return df
-
-
-def get_microareas():
-    return load_csv(PATH_MICRO, ["id", "nome", "descricao"])
-
-
-def get_atividades():
-    cols = [
-        "id", "nome", "microarea", "categoria",
-        "responsavel_funcao", "hh_por_unidade", "fator_por_projeto"
-    ]
-    df = load_csv(PATH_ATIV, cols)
-    if df.empty:
-        return df
-    df["hh_por_unidade"] = pd.to_numeric(df["hh_por_unidade"], errors="coerce")
-    df["fator_por_projeto"] = pd.to_numeric(df["fator_por_projeto"], errors="coerce")
-    df["hh_por_unidade"] = df["hh_por_unidade"].fillna(1.0)
-    df["fator_por_projeto"] = df["fator_por_projeto"].fillna(1.0)
-    return df
-
-
-def get_demandas():
-    cols = ["id", "periodo", "atividade_id", "quantidade"]
-    df = load_csv(PATH_DEM, cols)
-    if df.empty:
-        return df
-    df["quantidade"] = pd.to_numeric(df["quantidade"], errors="coerce")
-    return df
+import importlib
 
+import streamlit as st
 
-def get_colab_atividades():
-    cols = ["id", "colab_id", "atividade_id", "microarea", "percentual"]
-    df = load_csv(PATH_COLAB_ATIV, cols)
-    if df.empty:
-        return df
-    df["colab_id"] = pd.to_numeric(df["colab_id"], errors="coerce")
-    df["atividade_id"] = pd.to_numeric(df["atividade_id"], errors="coerce")
-    df["percentual"] = pd.to_numeric(df["percentual"], errors="coerce")
-    return df
+# engine (e pandas) só entra quando usado: nas telas e nos painéis da barra lateral
+_IMPORTACAO_S = time.perf_counter() - _INICIO_IMPORTACAO
 
 # ---------------------------
-# Seed inicial de micro-áreas + atividades
+# Telas: nome no menu -> (módulo, função), importadas só quando abertas
 # ---------------------------
-def seed_default_microareas_atividades(microareas, atividades):
-    """
-    Cria/atualiza micro-áreas e atividades com base em DEFAULT_GRUPOS_ATIVIDADES,
-    usando tempo em minutos e fator em % por projeto.
-    - hh_por_unidade = minutos / 60
-    - fator_por_projeto = percentual / 100
-    """
-
-    # Micro-áreas
-    existentes_micro = set(microareas["nome"].dropna().tolist())
-    novas_micro = []
-
-    for grupo, _, _, _ in DEFAULT_GRUPOS_ATIVIDADES:
-        if grupo and grupo not in existentes_micro:
-            base = microareas if not novas_micro else pd.concat(
-                [microareas, pd.DataFrame(novas_micro)], ignore_index=True
-            )
-            new = {
-                "id": new_id(base),
-                "nome": grupo,
-                "descricao": ""
-            }
-            novas_micro.append(new)
-            existentes_micro.add(grupo)
-
-    if novas_micro:
-        microareas = pd.concat([microareas, pd.DataFrame(novas_micro)], ignore_index=True)
-        save_csv(PATH_MICRO, microareas)
-
-    # Atividades
-    existentes_ativ = set(atividades["nome"].dropna().tolist())
-    novas_ativ = []
-
-    for grupo, nome, minutos, perc in DEFAULT_GRUPOS_ATIVIDADES:
-        hh = float(minutos) / 60.0
-        fator = float(perc) / 100.0   # 100% -> 1.0; 50% -> 0.5; 5% -> 0.05
-
-        if nome in existentes_ativ:
-            mask = atividades["nome"] == nome
-            atividades.loc[mask, "microarea"] = grupo
-            atividades.loc[mask, "hh_por_unidade"] = hh
-            atividades.loc[mask, "fator_por_projeto"] = fator
-        else:
-            base = atividades if not novas_ativ else pd.concat(
-                [atividades, pd.DataFrame(novas_ativ)], ignore_index=True
-            )
-            new = {
-                "id": new_id(base),
-                "nome": nome,
-                "microarea": grupo,
-                "categoria": "",
-                "responsavel_funcao": "",
-                "hh_por_unidade": hh,
-                "fator_por_projeto": fator,
-            }
-            novas_ativ.append(new)
-
-    if novas_ativ:
-        atividades = pd.concat([atividades, pd.DataFrame(novas_ativ)], ignore_index=True)
-
-    save_csv(PATH_ATIV, atividades)
+TELAS = {
+    "Colaboradores": ("telas.colaboradores", "tela_colaboradores"),
+    "Micro-áreas & Atividades": ("telas.microareas_atividades", "tela_microareas_atividades"),
+    "Demandas": ("telas.demandas", "tela_demandas"),
+    "Painel": ("telas.painel", "tela_painel"),
+    "Tendências": ("telas.tendencias", "tela_tendencias"),
+    "Cenários": ("telas.cenarios", "tela_cenarios"),
+    "Análise de Atividades": ("telas.analise_atividades", "tela_analise_atividades"),
+    "Importação": ("telas.importacao", "tela_importacao"),
+}
 
-    return microareas, atividades
 
-# ---------------------------
-# Seed de colaboradores padrão
-# ---------------------------
-def seed_default_colaboradores(colabs):
+@st.cache_resource
+def _tempos():
     """
-    Cria colaboradores padrão com base em DEFAULT_COLABS.
-    Não duplica nomes já existentes.
+    Tempos de carregamento do processo, compartilhados entre reruns e sessões:
+    - importacao_s: importação do app no primeiro run (partida a frio)
+    - telas: {nome: {importacao_s, renderizacoes, primeira_s, ultima_s}}
     """
-    existentes = set(colabs["nome"].dropna().tolist())
-    novos = []
-
-    for cargo, microarea, nome in DEFAULT_COLABS:
-        if nome in existentes:
-            continue
-
-        if cargo == "Estagiário":
-            carga_diaria = 6.0
-        else:
-            carga_diaria = 8.0
+    return {"importacao_s": None, "telas": {}}
 
-        base = colabs if not novos else pd.concat([colabs, pd.DataFrame(novos)], ignore_index=True)
-        novos.append({
-            "id": new_id(base),
-            "nome": nome,
-            "cargo": cargo,
-            "carga_diaria": carga_diaria,
-            "microarea_principal": microarea,
-            "microareas_secundarias": "",
-            "ativo": "sim",
-        })
-        existentes.add(nome)
 
-    if novos:
-        colabs = pd.concat([colabs, pd.DataFrame(novos)], ignore_index=True)
-        save_csv(PATH_COLAB, colabs)
-
-    return colabs
-
-# ---------------------------
-# Cálculos de capacidade e alocação
-# ---------------------------
-def calcular_capacidades(colabs, dias_uteis):
+def abrir_tela(nome):
     """
-    capacidade_diaria = carga_diaria
-    capacidade_mensal = capacidade_diaria * dias_uteis
+    Importa o módulo da tela (só na primeira vez no processo) e a renderiza,
+    registrando o tempo de importação e de cada renderização.
     """
-    df = colabs.copy()
-    df["capacidade_diaria"] = df["carga_diaria"].fillna(0)
-    df["capacidade_mensal"] = df["capacidade_diaria"] * dias_uteis
-    return df[["id", "nome", "cargo", "microarea_principal", "capacidade_diaria", "capacidade_mensal"]]
-
-
-def calcular_alocacoes(colabs, microareas, atividades, demandas, colab_ativ, periodo, dias_uteis):
+    modulo, funcao = TELAS[nome]
+    inicio = time.perf_counter()
+    tela = getattr(importlib.import_module(modulo), funcao)
+    from engine import medicao
+    # só depois de importar: uma importação que falha não deixa registro incompleto
+    registro = _tempos()["telas"].setdefault(nome, {
+        "importacao_s": time.perf_counter() - inicio, "renderizacoes": 0, "primeira_s": None, "ultima_s": None,
+    })
+
+    inicio = time.perf_counter()
+    try:
+        with medicao(funcao, tela=nome):
+            tela()
+    finally:
+        # st.stop()/st.rerun() também passam por aqui; conta o tempo até a interrupção
+        duracao = time.perf_counter() - inicio
+        registro["renderizacoes"] += 1
+        if registro["primeira_s"] is None:
+            registro["primeira_s"] = duracao
+        registro["ultima_s"] = duracao
+
+
+def _mostrar_diagnostico():
     """
-    Usa demandas (quantidade por atividade) + hh_por_unidade das atividades
-    e distribui horas entre colaboradores de acordo com percentuais.
-    Também calcula demanda x capacidade por micro-área (mensal).
+    Painel opcional com a instrumentação do processo: totais por função
+    (tempo inclui as funções chamadas dentro dela) e exportação dos eventos.
     """
-    dem = demandas[demandas["periodo"] == periodo].copy()
-    if dem.empty:
-        return (
-            pd.DataFrame(columns=["id_colaborador", "hh_alocadas"]),
-            pd.DataFrame(columns=["microarea", "hh_necessarias", "capacidade_mensal", "saldo"])
-        )
-
-    ativ = atividades.copy()
-    dem_ativ = dem.merge(
-        ativ,
-        left_on="atividade_id",
-        right_on="id",
-        suffixes=("_dem", "_ativ")
-    )
-
-    dem_ativ["hh_total_atividade"] = dem_ativ["quantidade"] * dem_ativ["hh_por_unidade"]
-
-    alocs = []
-    for _, row in dem_ativ.iterrows():
-        atividade_id = int(row["atividade_id"])
-        microarea = row["microarea"]
-        hh_total = row["hh_total_atividade"]
-
-        ca = colab_ativ[colab_ativ["atividade_id"] == atividade_id]
-        if ca.empty:
-            continue
-
-        pesos = ca["percentual"].fillna(0).tolist()
-        colab_ids = ca["colab_id"].tolist()
-        if not pesos or sum(pesos) == 0:
-            pesos = [1] * len(colab_ids)
-
-        soma_pesos = float(sum(pesos))
-        for cid, peso in zip(colab_ids, pesos):
-            frac = peso / soma_pesos
-            alocs.append({
-                "id_colaborador": int(cid),
-                "atividade_id": atividade_id,
-                "microarea": microarea,
-                "hh_alocadas": hh_total * frac
-            })
-
-    if not alocs:
-        df_aloc = pd.DataFrame(columns=["id_colaborador", "hh_alocadas"])
-    else:
-        df_aloc = pd.DataFrame(alocs).groupby("id_colaborador", as_index=False)["hh_alocadas"].sum()
-
-    dem_micro = dem_ativ.groupby("microarea", as_index=False)["hh_total_atividade"].sum()
-    dem_micro.rename(columns={"hh_total_atividade": "hh_necessarias"}, inplace=True)
-
-    caps = calcular_capacidades(colabs, dias_uteis)
-    cap_micro = caps.groupby("microarea_principal", as_index=False)["capacidade_mensal"].sum()
-    cap_micro.rename(columns={
-        "microarea_principal": "microarea",
-        "capacidade_mensal": "capacidade_mensal"
-    }, inplace=True)
-
-    df_micro = dem_micro.merge(cap_micro, on="microarea", how="left")
-    df_micro["capacidade_mensal"] = df_micro["capacidade_mensal"].fillna(0)
-    df_micro["saldo"] = df_micro["capacidade_mensal"] - df_micro["hh_necessarias"]
-
-    return df_aloc, df_micro
-
-# ---------------------------
-# Tela: Colaboradores
-# ---------------------------
-def tela_colaboradores():
-    st.header("Cadastro de Colaboradores")
-
-    colabs = get_colaboradores()
-    microareas = get_microareas()
-    colab_ativ = get_colab_atividades()
-    atividades = get_atividades()
-
-    if st.button("Carregar lista padrão de colaboradores"):
-        colabs = seed_default_colaboradores(colabs)
-        st.success("Colaboradores padrão carregados/atualizados com sucesso!")
-
-    # Novo colaborador
-    st.subheader("Novo colaborador")
-
-    with st.form("form_colaborador"):
-        nome = st.text_input("Nome")
-
-        cargo = st.selectbox(
-            "Cargo",
-            ["Estagiário", "Assistente", "Analista", "Especialista", "Coordenador"]
-        )
-
-        carga_default = 6.0 if cargo == "Estagiário" else 8.0
-
-        carga_diaria = st.number_input(
-            "Carga horária diária (h)",
-            min_value=1.0, max_value=12.0,
-            value=carga_default, step=0.5
-        )
-
-        ativo = st.checkbox("Ativo", value=True)
-
-        submitted = st.form_submit_button("Salvar colaborador")
-
-        if submitted:
-            if not nome:
-                st.error("Informe o nome do colaborador.")
-            else:
-                new = {
-                    "id": new_id(colabs),
-                    "nome": nome,
-                    "cargo": cargo,
-                    "carga_diaria": carga_diaria,
-                    "microarea_principal": "",
-                    "microareas_secundarias": "",
-                    "ativo": "sim" if ativo else "nao"
-                }
-                colabs = pd.concat([colabs, pd.DataFrame([new])], ignore_index=True)
-                save_csv(PATH_COLAB, colabs)
-                st.success("Colaborador salvo com sucesso!")
-
-    # Lista de colaboradores
-    st.subheader("Colaboradores cadastrados")
-    if colabs.empty:
-        st.info("Nenhum colaborador cadastrado ainda.")
-    else:
-        df_show = colabs.copy()
-        df_show["capacidade_diaria"] = df_show["carga_diaria"].fillna(0)
-        df_show["capacidade_mensal_22d"] = df_show["capacidade_diaria"] * 22
-        st.dataframe(df_show, use_container_width=True)
-
-    # Editar / excluir colaborador
-    st.subheader("Editar / excluir colaborador")
-    if not colabs.empty:
-        nomes_colab = colabs["nome"].tolist()
-        sel_nome = st.selectbox("Selecione um colaborador para editar/excluir", options=[""] + nomes_colab)
-        if sel_nome:
-            row = colabs[colabs["nome"] == sel_nome].iloc[0]
-            col1, col2 = st.columns(2)
-            with col1:
-                novo_nome = st.text_input("Nome", value=row["nome"], key="edit_colab_nome")
-                cargo_lista = ["Estagiário", "Assistente", "Analista", "Especialista", "Coordenador"]
-                idx_cargo = cargo_lista.index(row["cargo"]) if row["cargo"] in cargo_lista else 0
-                novo_cargo = st.selectbox(
-                    "Cargo",
-                    cargo_lista,
-                    index=idx_cargo,
-                    key="edit_colab_cargo"
-                )
-                nova_carga = st.number_input(
-                    "Carga horária diária (h)",
-                    min_value=1.0, max_value=12.0,
-                    value=float(row["carga_diaria"]) if not pd.isna(row["carga_diaria"]) else 8.0,
-                    step=0.5,
-                    key="edit_colab_carga"
-                )
-            with col2:
-                micro_princ = st.selectbox(
-                    "Micro-área principal",
-                    options=[""] + microareas["nome"].tolist(),
-                    index=0 if row["microarea_principal"] not in microareas["nome"].tolist()
-                    else ([""] + microareas["nome"].tolist()).index(row["microarea_principal"]),
-                    key="edit_colab_micro"
-                )
-                ativo_flag = st.checkbox("Ativo", value=(row["ativo"] == "sim"), key="edit_colab_ativo")
-
-            col_a, col_b = st.columns(2)
-            with col_a:
-                if st.button("Salvar alterações do colaborador"):
-                    colabs.loc[colabs["id"] == row["id"], "nome"] = novo_nome
-                    colabs.loc[colabs["id"] == row["id"], "cargo"] = novo_cargo
-                    colabs.loc[colabs["id"] == row["id"], "carga_diaria"] = nova_carga
-                    colabs.loc[colabs["id"] == row["id"], "microarea_principal"] = micro_princ
-                    colabs.loc[colabs["id"] == row["id"], "ativo"] = "sim" if ativo_flag else "nao"
-                    save_csv(PATH_COLAB, colabs)
-                    st.success("Colaborador atualizado.")
-            with col_b:
-                if st.button("Excluir colaborador"):
-                    colab_ativ = get_colab_atividades()
-                    colab_ativ = colab_ativ[colab_ativ["colab_id"] != row["id"]]
-                    save_csv(PATH_COLAB_ATIV, colab_ativ)
-                    colabs = colabs[colabs["id"] != row["id"]]
-                    save_csv(PATH_COLAB, colabs)
-                    st.success("Colaborador excluído.")
-
-    if colabs.empty or atividades.empty or microareas.empty:
-        st.info("Cadastre colaboradores, micro-áreas e atividades para configurar área de atuação.")
+    if not st.sidebar.toggle("Diagnóstico de desempenho"):
         return
-
-    # Vincular atividades a um colaborador (modo por colaborador)
-    st.subheader("Vincular atividades a um colaborador (modo por colaborador)")
-
-    with st.form("form_atuacao_colab"):
-        colab_nome = st.selectbox(
-            "Colaborador",
-            options=colabs["nome"].tolist()
-        )
-        colab_row = colabs[colabs["nome"] == colab_nome].iloc[0]
-        colab_id = int(colab_row["id"])
-
-        micro_princ = st.selectbox(
-            "Micro-área principal deste colaborador",
-            options=[""] + microareas["nome"].tolist(),
-            index=0 if colab_row["microarea_principal"] not in microareas["nome"].tolist()
-            else ([""] + microareas["nome"].tolist()).index(colab_row["microarea_principal"])
-        )
-
-        micro_sel = st.selectbox(
-            "Micro-área das atividades a vincular",
-            options=microareas["nome"].tolist()
-        )
-
-        atividades_micro = atividades[atividades["microarea"] == micro_sel]
-        if atividades_micro.empty:
-            st.warning("Não há atividades cadastradas para esta micro-área.")
-            atividades_sel = []
-        else:
-            atividades_sel = st.multiselect(
-                "Atividades para vincular a este colaborador",
-                options=atividades_micro["nome"].tolist()
-            )
-
-        percentual = st.number_input(
-            "Percentual de participação do colaborador em cada atividade selecionada (%)",
-            min_value=0.0, max_value=100.0, value=50.0, step=5.0
-        )
-
-        submitted_atuacao = st.form_submit_button("Salvar vínculos de atividades (por colaborador)")
-
-        if submitted_atuacao:
-            colabs.loc[colabs["id"] == colab_id, "microarea_principal"] = micro_princ
-            save_csv(PATH_COLAB, colabs)
-
-            if not atividades_sel:
-                st.error("Selecione ao menos uma atividade.")
-            else:
-                colab_ativ = get_colab_atividades()
-                novos = []
-                for nome_ativ in atividades_sel:
-                    ativ_row = atividades[atividades["nome"] == nome_ativ].iloc[0]
-                    atividade_id = int(ativ_row["id"])
-                    base = colab_ativ if not novos else pd.concat([colab_ativ, pd.DataFrame(novos)], ignore_index=True)
-                    novos.append({
-                        "id": new_id(base),
-                        "colab_id": colab_id,
-                        "atividade_id": atividade_id,
-                        "microarea": micro_sel,
-                        "percentual": percentual
-                    })
-                if novos:
-                    colab_ativ = pd.concat([colab_ativ, pd.DataFrame(novos)], ignore_index=True)
-                    save_csv(PATH_COLAB_ATIV, colab_ativ)
-                    st.success("Vínculos de atividades registrados para o colaborador.")
-
-    # Vincular vários colaboradores a uma atividade (modo por atividade)
-    st.subheader("Vincular vários colaboradores a uma atividade (modo por atividade)")
-
-    with st.form("form_atuacao_atividade"):
-        micro_sel2 = st.selectbox(
-            "Micro-área da atividade",
-            options=microareas["nome"].tolist()
-        )
-
-        atividades_micro2 = atividades[atividades["microarea"] == micro_sel2]
-        if atividades_micro2.empty:
-            st.warning("Não há atividades cadastradas para esta micro-área.")
-            atividade_nome2 = None
-        else:
-            atividade_nome2 = st.selectbox(
-                "Atividade",
-                options=atividades_micro2["nome"].tolist()
-            )
-
-        nomes_colabs = colabs["nome"].tolist()
-        colabs_sel = st.multiselect(
-            "Colaboradores que participarão desta atividade",
-            options=nomes_colabs
-        )
-
-        percentuais = {}
-        if atividade_nome2 and colabs_sel:
-            st.markdown("**Percentual de participação por colaborador (%)**")
-            for nome_c in colabs_sel:
-                cid = int(colabs[colabs["nome"] == nome_c]["id"].iloc[0])
-                key_input = f"pct_{cid}_{atividade_nome2}"
-                valor = st.number_input(
-                    f"{nome_c} (%)",
-                    min_value=0.0, max_value=100.0,
-                    value=0.0,
-                    step=5.0,
-                    key=key_input
-                )
-                percentuais[cid] = valor
-
-        submitted_atuacao2 = st.form_submit_button("Salvar vínculos de colaboradores (por atividade)")
-
-        if submitted_atuacao2:
-            if not atividade_nome2:
-                st.error("Selecione uma atividade.")
-            elif not colabs_sel:
-                st.error("Selecione pelo menos um colaborador.")
-            else:
-                atividades_local = get_atividades()
-                colab_ativ = get_colab_atividades()
-
-                ativ_row2 = atividades_local[atividades_local["nome"] == atividade_nome2].iloc[0]
-                atividade_id2 = int(ativ_row2["id"])
-
-                for cid, pct in percentuais.items():
-                    mask = (colab_ativ["colab_id"] == cid) & (colab_ativ["atividade_id"] == atividade_id2)
-                    if mask.any():
-                        colab_ativ.loc[mask, "percentual"] = pct
-                        colab_ativ.loc[mask, "microarea"] = micro_sel2
-                    else:
-                        new_row = {
-                            "id": new_id(colab_ativ),
-                            "colab_id": cid,
-                            "atividade_id": atividade_id2,
-                            "microarea": micro_sel2,
-                            "percentual": pct
-                        }
-                        colab_ativ = pd.concat([colab_ativ, pd.DataFrame([new_row])], ignore_index=True)
-
-                save_csv(PATH_COLAB_ATIV, colab_ativ)
-                st.success("Participações por atividade atualizadas.")
-
-    # Editar / excluir vínculos
-    st.subheader("Editar / excluir vínculos de colaborador x atividade")
-    colab_ativ = get_colab_atividades()
-    if colab_ativ.empty:
-        st.info("Ainda não há atividades vinculadas a colaboradores.")
-    else:
-        df_map = colab_ativ.merge(
-            colabs[["id", "nome"]],
-            left_on="colab_id",
-            right_on="id",
-            how="left"
-        ).merge(
-            atividades[["id", "nome", "microarea"]],
-            left_on="atividade_id",
-            right_on="id",
-            how="left",
-            suffixes=("_colab", "_ativ")
-        )
-        df_map_show = df_map[["id_x", "nome_colab", "nome_ativ", "microarea", "percentual"]]
-        df_map_show.rename(columns={
-            "id_x": "id_vinculo",
-            "nome_colab": "colaborador",
-            "nome_ativ": "atividade"
-        }, inplace=True)
-        st.dataframe(df_map_show, use_container_width=True)
-
-        labels = df_map_show.apply(
-            lambda r: f'{int(r["id_vinculo"])} - {r["colaborador"]} - {r["atividade"]} ({r["microarea"]})',
-            axis=1
-        ).tolist()
-        ids = df_map_show["id_vinculo"].tolist()
-        sel_label = st.selectbox("Selecione um vínculo para editar/excluir", options=[""] + labels)
-        if sel_label:
-            idx = labels.index(sel_label)
-            vinc_id = ids[idx]
-            vinc_row = colab_ativ[colab_ativ["id"] == vinc_id].iloc[0]
-            novo_percentual = st.number_input(
-                "Percentual (%)",
-                min_value=0.0, max_value=100.0,
-                value=float(vinc_row["percentual"]) if not pd.isna(vinc_row["percentual"]) else 0.0,
-                step=5.0,
-                key=f"edit_vinc_{vinc_id}"
-            )
-            col_a, col_b = st.columns(2)
-            with col_a:
-                if st.button("Salvar percentual do vínculo"):
-                    colab_ativ.loc[colab_ativ["id"] == vinc_id, "percentual"] = novo_percentual
-                    save_csv(PATH_COLAB_ATIV, colab_ativ)
-                    st.success("Vínculo atualizado.")
-            with col_b:
-                if st.button("Excluir vínculo"):
-                    colab_ativ = colab_ativ[colab_ativ["id"] != vinc_id]
-                    save_csv(PATH_COLAB_ATIV, colab_ativ)
-                    st.success("Vínculo excluído.")
-
-# ---------------------------
-# Tela: Micro-áreas & Atividades
-# ---------------------------
-def tela_microareas_atividades():
-    st.header("Cadastro de Micro-áreas e Atividades")
-
-    microareas = get_microareas()
-    atividades = get_atividades()
-    colabs = get_colaboradores()
-
-    if st.button("Carregar lista padrão de micro-áreas e atividades"):
-        microareas, atividades = seed_default_microareas_atividades(microareas, atividades)
-        st.success("Lista padrão carregada/atualizada com sucesso!")
-
-    tab_micro, tab_ativ = st.tabs(["Micro-áreas", "Atividades"])
-
-    # Micro-áreas
-    with tab_micro:
-        st.subheader("Nova micro-área")
-        with st.form("form_micro"):
-            nome = st.text_input("Nome da micro-área")
-            descricao = st.text_area("Descrição (opcional)")
-            submitted = st.form_submit_button("Salvar micro-área")
-
-            if submitted:
-                if not nome:
-                    st.error("Informe um nome para a micro-área.")
-                else:
-                    if (microareas["nome"] == nome).any():
-                        st.warning("Já existe uma micro-área com esse nome.")
-                    else:
-                        new = {
-                            "id": new_id(microareas),
-                            "nome": nome,
-                            "descricao": descricao
-                        }
-                        microareas = pd.concat(
-                            [microareas, pd.DataFrame([new])],
-                            ignore_index=True
-                        )
-                        save_csv(PATH_MICRO, microareas)
-                        st.success("Micro-área salva com sucesso!")
-
-        st.subheader("Micro-áreas cadastradas")
-        if microareas.empty:
-            st.info("Nenhuma micro-área cadastrada ainda.")
-        else:
-            st.dataframe(microareas, use_container_width=True)
-
-        # Editar / excluir micro-área
-        st.subheader("Editar / excluir micro-área")
-        if not microareas.empty:
-            nomes_micro = microareas["nome"].tolist()
-            sel_micro = st.selectbox("Selecione uma micro-área", options=[""] + nomes_micro)
-            if sel_micro:
-                row = microareas[microareas["nome"] == sel_micro].iloc[0]
-                novo_nome = st.text_input("Nome da micro-área", value=row["nome"], key="edit_micro_nome")
-                nova_desc = st.text_area("Descrição", value=row["descricao"] if row["descricao"] else "", key="edit_micro_desc")
-
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    if st.button("Salvar alterações da micro-área"):
-                        old_name = row["nome"]
-                        microareas.loc[microareas["id"] == row["id"], "nome"] = novo_nome
-                        microareas.loc[microareas["id"] == row["id"], "descricao"] = nova_desc
-                        save_csv(PATH_MICRO, microareas)
-
-                        atividades_local = get_atividades()
-                        atividades_local.loc[atividades_local["microarea"] == old_name, "microarea"] = novo_nome
-                        save_csv(PATH_ATIV, atividades_local)
-
-                        colabs_local = get_colaboradores()
-                        colabs_local.loc[colabs_local["microarea_principal"] == old_name, "microarea_principal"] = novo_nome
-                        save_csv(PATH_COLAB, colabs_local)
-
-                        colab_ativ_local = get_colab_atividades()
-                        colab_ativ_local.loc[colab_ativ_local["microarea"] == old_name, "microarea"] = novo_nome
-                        save_csv(PATH_COLAB_ATIV, colab_ativ_local)
-
-                        st.success("Micro-área atualizada.")
-                with col_b:
-                    if st.button("Excluir micro-área"):
-                        microareas = microareas[microareas["id"] != row["id"]]
-                        save_csv(PATH_MICRO, microareas)
-                        st.success("Micro-área excluída. Verifique atividades associadas.")
-
-    # Atividades
-    with tab_ativ:
-        st.subheader("Nova atividade (tempo em minutos)")
-
-        with st.form("form_ativ"):
-            nome_ativ = st.text_input("Nome da atividade")
-            micro = st.selectbox(
-                "Micro-área",
-                options=[""] + microareas["nome"].tolist()
-            )
-            categoria = st.text_input(
-                "Categoria (ensaio, relatório, setup, análise, etc.)",
-                value=""
-            )
-            responsavel_funcao = st.selectbox(
-                "Responsável pela função (opcional)",
-                options=[""] + colabs["nome"].tolist()
-            )
-
-            min_por_unidade = st.number_input(
-                "Tempo por execução da atividade (minutos)",
-                min_value=0.0, step=5.0, value=60.0
-            )
-            fator_por_projeto = st.number_input(
-                "Fator por projeto (quantas execuções dessa atividade por projeto)",
-                min_value=0.0, step=0.1, value=1.0
-            )
-            submitted_ativ = st.form_submit_button("Salvar atividade")
-
-            if submitted_ativ:
-                if not nome_ativ or not micro:
-                    st.error("Informe pelo menos nome da atividade e micro-área.")
-                else:
-                    hh_por_unidade = min_por_unidade / 60.0
-                    new = {
-                        "id": new_id(atividades),
-                        "nome": nome_ativ,
-                        "microarea": micro,
-                        "categoria": categoria,
-                        "responsavel_funcao": responsavel_funcao,
-                        "hh_por_unidade": hh_por_unidade,
-                        "fator_por_projeto": fator_por_projeto
-                    }
-                    atividades = pd.concat(
-                        [atividades, pd.DataFrame([new])],
-                        ignore_index=True
-                    )
-                    save_csv(PATH_ATIV, atividades)
-                    st.success("Atividade salva com sucesso!")
-
-        st.subheader("Atividades cadastradas")
-        if atividades.empty:
-            st.info("Nenhuma atividade cadastrada ainda.")
-        else:
-            df_show = atividades.copy()
-            df_show["min_por_unidade"] = (df_show["hh_por_unidade"].fillna(0) * 60).round(1)
-            df_show["fator_%"] = (df_show["fator_por_projeto"].fillna(0) * 100).round(1)
-            st.dataframe(df_show, use_container_width=True)
-
-        # Editar / excluir atividade
-        st.subheader("Editar / excluir atividade")
-        if not atividades.empty:
-            nomes_ativ = atividades["nome"].tolist()
-            sel_ativ = st.selectbox("Selecione uma atividade", options=[""] + nomes_ativ)
-            if sel_ativ:
-                row = atividades[atividades["nome"] == sel_ativ].iloc[0]
-                col1, col2 = st.columns(2)
-                with col1:
-                    novo_nome = st.text_input("Nome da atividade", value=row["nome"], key="edit_ativ_nome")
-                    micro = st.selectbox(
-                        "Micro-área",
-                        options=microareas["nome"].tolist(),
-                        index=microareas["nome"].tolist().index(row["microarea"]) if row["microarea"] in microareas["nome"].tolist() else 0,
-                        key="edit_ativ_micro"
-                    )
-                    categoria = st.text_input(
-                        "Categoria",
-                        value=row["categoria"] if row["categoria"] else "",
-                        key="edit_ativ_cat"
-                    )
-                with col2:
-                    responsavel_funcao = st.selectbox(
-                        "Responsável pela função",
-                        options=[""] + colabs["nome"].tolist(),
-                        index=([""] + colabs["nome"].tolist()).index(row["responsavel_funcao"]) if row["responsavel_funcao"] in colabs["nome"].tolist() else 0,
-                        key="edit_ativ_resp"
-                    )
-                    min_por_unidade_edit = st.number_input(
-                        "Tempo por execução (minutos)",
-                        min_value=0.0,
-                        step=5.0,
-                        value=float(row["hh_por_unidade"]) * 60.0 if not pd.isna(row["hh_por_unidade"]) else 60.0,
-                        key="edit_ativ_min"
-                    )
-                    fator_por_projeto = st.number_input(
-                        "Fator por projeto",
-                        min_value=0.0,
-                        step=0.1,
-                        value=float(row["fator_por_projeto"]) if not pd.isna(row["fator_por_projeto"]) else 1.0,
-                        key="edit_ativ_fator"
-                    )
-
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    if st.button("Salvar alterações da atividade"):
-                        atividades_local = get_atividades()
-                        hh_por_unidade_edit = min_por_unidade_edit / 60.0
-                        atividades_local.loc[atividades_local["id"] == row["id"], "nome"] = novo_nome
-                        atividades_local.loc[atividades_local["id"] == row["id"], "microarea"] = micro
-                        atividades_local.loc[atividades_local["id"] == row["id"], "categoria"] = categoria
-                        atividades_local.loc[atividades_local["id"] == row["id"], "responsavel_funcao"] = responsavel_funcao
-                        atividades_local.loc[atividades_local["id"] == row["id"], "hh_por_unidade"] = hh_por_unidade_edit
-                        atividades_local.loc[atividades_local["id"] == row["id"], "fator_por_projeto"] = fator_por_projeto
-                        save_csv(PATH_ATIV, atividades_local)
-                        st.success("Atividade atualizado.")
-                with col_b:
-                    if st.button("Excluir atividade"):
-                        demandas_local = get_demandas()
-                        demandas_local = demandas_local[demandas_local["atividade_id"] != row["id"]]
-                        save_csv(PATH_DEM, demandas_local)
-
-                        colab_ativ_local = get_colab_atividades()
-                        colab_ativ_local = colab_ativ_local[colab_ativ_local["atividade_id"] != row["id"]]
-                        save_csv(PATH_COLAB_ATIV, colab_ativ_local)
-
-                        atividades_local = get_atividades()
-                        atividades_local = atividades_local[atividades_local["id"] != row["id"]]
-                        save_csv(PATH_ATIV, atividades_local)
-                        st.success("Atividade excluída.")
-
-# ---------------------------
-# Tela: Demandas
-# ---------------------------
-def tela_demandas():
-    st.header("Cadastro de Demandas")
-
-    atividades = get_atividades()
-    demandas = get_demandas()
-
-    if atividades.empty:
-        st.warning("Cadastre atividades antes de inserir demanda.")
-        return
-
-    st.subheader("Gerar demandas automaticamente a partir do número de projetos")
-
-    with st.form("form_demanda_projetos"):
-        periodo = st.text_input("Período (ex.: 2025-11)", value="")
-        num_projetos = st.number_input(
-            "Quantidade de projetos no período",
-            min_value=0.0, step=1.0, value=0.0
-        )
-
-        submitted_auto = st.form_submit_button("Gerar demandas para o período")
-
-        if submitted_auto:
-            if not periodo:
-                st.error("Informe o período.")
-            elif num_projetos <= 0:
-                st.error("Informe uma quantidade de projetos maior que zero.")
-            else:
-                demandas = demandas[demandas["periodo"] != periodo].copy()
-
-                novas_dem = []
-                next_id = new_id(demandas)
-
-                for _, row in atividades.iterrows():
-                    fator = row["fator_por_projeto"] if not pd.isna(row["fator_por_projeto"]) else 1.0
-                    qtd = num_projetos * fator
-                    if qtd <= 0:
-                        continue
-                    novas_dem.append({
-                        "id": next_id,
-                        "periodo": periodo,
-                        "atividade_id": int(row["id"]),
-                        "quantidade": qtd
-                    })
-                    next_id += 1
-
-                if novas_dem:
-                    demandas = pd.concat(
-                        [demandas, pd.DataFrame(novas_dem)],
-                        ignore_index=True
-                    )
-                    save_csv(PATH_DEM, demandas)
-                    st.success("Demandas geradas automaticamente a partir do número de projetos.")
-
-    st.subheader("Demandas cadastradas (todas as atividades)")
-
-    demandas = get_demandas()
-    if demandas.empty:
-        st.info("Nenhuma demanda cadastrada ainda.")
-    else:
-        df_show = demandas.merge(
-            atividades[["id", "nome", "microarea", "hh_por_unidade"]],
-            left_on="atividade_id",
-            right_on="id",
-            how="left",
-            suffixes=("_dem", "_ativ")
-        )
-
-        if "id_dem" in df_show.columns:
-            df_show.rename(columns={"id_dem": "id_demanda"}, inplace=True)
-        elif "id_x" in df_show.columns:
-            df_show.rename(columns={"id_x": "id_demanda"}, inplace=True)
-        else:
-            df_show.rename(columns={"id": "id_demanda"}, inplace=True)
-
-        df_show["hh_total_atividade"] = df_show["quantidade"] * df_show["hh_por_unidade"]
-        df_show.rename(columns={"nome": "atividade"}, inplace=True)
-
-        cols = [
-            "id_demanda", "periodo", "atividade", "microarea",
-            "quantidade", "hh_por_unidade", "hh_total_atividade"
-        ]
-        cols = [c for c in cols if c in df_show.columns]
-
-        st.dataframe(df_show[cols], use_container_width=True)
-
-    st.subheader("Excluir demandas de um período")
-    demandas = get_demandas()
-    if not demandas.empty:
-        periodos = sorted(demandas["periodo"].dropna().unique().tolist())
-        sel_per = st.selectbox("Período para limpar demandas", options=[""] + periodos)
-        if sel_per:
-            if st.button("Excluir todas as demandas desse período"):
-                demandas = demandas[demandas["periodo"] != sel_per]
-                save_csv(PATH_DEM, demandas)
-                st.success(f"Demandas do período {sel_per} excluídas.")
-
-# ---------------------------
-# Tela: Painel
-# ---------------------------
-def tela_painel():
-    st.header("Painel Geral - Demanda x Capacidade")
-
-    colabs = get_colaboradores()
-    microareas = get_microareas()
-    atividades = get_atividades()
-    demandas = get_demandas()
-    colab_ativ = get_colab_atividades()
-
-    if atividades.empty or demandas.empty or colabs.empty:
-        st.warning("Para visualizar o painel, é necessário ter colaboradores, atividades e demandas cadastradas.")
-        return
-
-    periodos = sorted(demandas["periodo"].dropna().unique().tolist())
-    periodo_sel = st.selectbox("Selecione o período", options=periodos)
-
-    dias_uteis = st.number_input(
-        "Dias úteis no período (para cálculo das horas diárias)",
-        min_value=15, max_value=31, value=22, step=1
-    )
-
-    df_caps = calcular_capacidades(colabs, dias_uteis)
-    df_aloc, df_micro = calcular_alocacoes(colabs, microareas, atividades, demandas, colab_ativ, periodo_sel, dias_uteis)
-
-    st.subheader("Resumo diário global (todos os grupos)")
-
-    if df_micro.empty:
-        st.info("Nenhuma demanda para o período selecionado.")
-    else:
-        hh_mes_total = df_micro["hh_necessarias"].sum()
-        hh_dia_necessarias = hh_mes_total / dias_uteis if dias_uteis > 0 else 0
-
-        colabs_ativos = colabs[colabs["ativo"] == "sim"].copy()
-        capacidade_dia_atual = colabs_ativos["carga_diaria"].fillna(0).sum()
-
-        colabs_necessarios_8h = hh_dia_necessarias / 8 if hh_dia_necessarias > 0 else 0
-        colabs_atuais_equiv_8h = capacidade_dia_atual / 8 if capacidade_dia_atual > 0 else 0
-        gap_colabs_8h = colabs_necessarios_8h - colabs_atuais_equiv_8h
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Horas diárias necessárias", f"{hh_dia_necessarias:.2f} h/dia")
-            st.metric("Colaboradores 8h necessários", f"{colabs_necessarios_8h:.2f}")
-        with col2:
-            st.metric("Capacidade diária atual", f"{capacidade_dia_atual:.2f} h/dia")
-            st.metric("Colaboradores 8h equivalentes atuais", f"{colabs_atuais_equiv_8h:.2f}")
-
-        st.markdown(
-            f"**Gap de colaboradores (equivalente a 8h/dia):** "
-            f"{gap_colabs_8h:.2f}  (positivo = falta gente, negativo = sobra capacidade)"
-        )
-
-    st.markdown("---")
-
-    st.subheader("Demanda x Capacidade por Micro-área (mensal)")
-
-    if df_micro.empty:
-        st.info("Nenhuma demanda para o período selecionado.")
-    else:
-        st.dataframe(df_micro, use_container_width=True)
-        data_chart = df_micro.set_index("microarea")[["hh_necessarias", "capacidade_mensal"]]
-        if not data_chart.empty:
-            st.bar_chart(data_chart)
-
-    st.subheader("Utilização por colaborador (mensal)")
-
-    df_col = df_caps.merge(
-        df_aloc,
-        left_on="id",
-        right_on="id_colaborador",
-        how="left"
-    )
-    df_col["hh_alocadas"] = df_col["hh_alocadas"].fillna(0.0)
-    df_col["utilizacao_%"] = (
-        df_col["hh_alocadas"] / df_col["capacidade_mensal"].replace(0, pd.NA)
-    ) * 100
-    df_col["utilizacao_%"] = df_col["utilizacao_%"].round(1)
-
-    df_col_show = df_col[[
-        "nome", "cargo", "microarea_principal",
-        "capacidade_diaria", "capacidade_mensal", "hh_alocadas", "utilizacao_%"
-    ]].sort_values("utilizacao_%", ascending=False)
-
-    st.dataframe(df_col_show, use_container_width=True)
-
-    st.subheader("Necessidade de capacidade adicional por Micro-área (mensal)")
-
-    if not df_micro.empty:
-        df_deficit = df_micro[df_micro["saldo"] < 0].copy()
-        if df_deficit.empty:
-            st.success("Não há déficit de capacidade nas micro-áreas para o período selecionado.")
-        else:
-            df_deficit["faltam_horas"] = -df_deficit["saldo"]
-            df_deficit["equiv_funcionarios"] = (df_deficit["faltam_horas"] / (8 * dias_uteis)).round(2)
-            df_deficit["equiv_estagiarios"] = (df_deficit["faltam_horas"] / (6 * dias_uteis)).round(2)
-            st.dataframe(
-                df_deficit[[
-                    "microarea", "hh_necessarias", "capacidade_mensal",
-                    "faltam_horas", "equiv_funcionarios", "equiv_estagiarios"
-                ]],
-                use_container_width=True
-            )
-
-# ---------------------------
-# Tela: Análise de Atividades (mapa de calor)
-# ---------------------------
-def tela_analise_atividades():
-    st.header("Análise de Atividades (tempo por projeto)")
-
-    atividades = get_atividades()
-    if atividades.empty:
-        st.warning("Não há atividades cadastradas. Vá em 'Micro-áreas & Atividades' para carregar a lista padrão.")
-        return
-
-    st.subheader("Parâmetros da análise")
-    num_projetos = st.number_input(
-        "Número de projetos para simulação",
-        min_value=1.0,
-        step=10.0,
-        value=500.0
+    from engine import eventos_jsonl, metricas, zerar_metricas
+
+    df = metricas()
+    df["tempo_total_ms"] = (df["tempo_total_s"] * 1000).round(1)
+    df["tempo_medio_ms"] = (df["tempo_medio_s"] * 1000).round(2)
+    df["tempo_max_ms"] = (df["tempo_max_s"] * 1000).round(1)
+    st.sidebar.dataframe(
+        df[["funcao", "chamadas", "tempo_total_ms", "tempo_medio_ms", "tempo_max_ms", "linhas", "bytes"]],
+        hide_index=True
     )
-
-    df = atividades.copy()
-    df["min_por_unidade"] = (df["hh_por_unidade"].fillna(0) * 60).round(1)
-    df["fator_%"] = (df["fator_por_projeto"].fillna(0) * 100).round(1)
-    df["hh_por_projeto"] = (df["hh_por_unidade"].fillna(0) * df["fator_por_projeto"].fillna(0)).round(3)
-    df["min_por_projeto"] = (df["hh_por_projeto"] * 60).round(1)
-    df["hh_total_periodo"] = (df["hh_por_projeto"] * num_projetos).round(2)
-
-    st.subheader("Atividades ordenadas por tempo total no período")
-    df_rank = df.sort_values("hh_total_periodo", ascending=False)[
-        ["microarea", "nome", "min_por_unidade", "fator_%", "min_por_projeto", "hh_total_periodo"]
-    ]
-    df_rank.rename(columns={
-        "microarea": "grupo",
-        "nome": "atividade",
-        "min_por_unidade": "min/execução",
-        "fator_%": "% projetos",
-        "min_por_projeto": "min/projeto",
-        "hh_total_periodo": f"hh em {int(num_projetos)} projetos"
-    }, inplace=True)
-
-    col_target = f"hh em {int(num_projetos)} projetos"
-
-    st.dataframe(
-        df_rank.style.background_gradient(
-            subset=[col_target],
-            cmap="Reds"
-        ),
-        use_container_width=True
-    )
-
-    st.markdown("---")
-    st.subheader("Resumo por grupo (micro-área)")
-
-    df_grp = df.groupby("microarea", as_index=False).agg(
-        hh_por_projeto=("hh_por_projeto", "sum")
-    )
-    df_grp["hh_por_dia_proj"] = (df_grp["hh_por_projeto"] / 22).round(2)
-    df_grp["hh_total_periodo"] = (df_grp["hh_por_projeto"] * num_projetos).round(2)
-
-    df_grp.rename(columns={
-        "microarea": "grupo",
-        "hh_por_projeto": "hh/projeto (grupo)",
-        "hh_por_dia_proj": "hh/dia (22d, 1 projeto/dia)",
-        "hh_total_periodo": col_target
-    }, inplace=True)
-
-    st.dataframe(
-        df_grp.style.background_gradient(
-            subset=[col_target],
-            cmap="Reds"
-        ),
-        use_container_width=True
-    )
-
-    st.bar_chart(
-        df_grp.set_index("grupo")[col_target]
+    st.sidebar.download_button(
+        "Exportar eventos (JSONL)",
+        data=eventos_jsonl(),
+        file_name="diagnostico.jsonl",
+        mime="application/jsonl"
     )
+    if st.sidebar.button("Zerar medições"):
+        zerar_metricas()
+
+
+def _ms(segundos):
+    # registros são compartilhados entre sessões: outra pode ainda não ter medido
+    return "—" if segundos is None else f"{segundos * 1000:.0f}"
+
+
+def _mostrar_tempos():
+    tempos = _tempos()
+    with st.sidebar.expander("Tempos de carregamento"):
+        st.caption(f"Importação inicial do app: {_ms(tempos['importacao_s'])} ms")
+        st.table([
+            {
+                "tela": nome,
+                "importação (ms)": _ms(r["importacao_s"]),
+                "1ª renderização (ms)": _ms(r["primeira_s"]),
+                "última (ms)": _ms(r["ultima_s"]),
+                "renderizações": r["renderizacoes"],
+            }
+            for nome, r in tempos["telas"].items()
+        ])
 
-    st.markdown(
-        "_Obs.: 'hh/projeto' considera o tempo da atividade multiplicado pela fração de projetos que exigem essa atividade (fator %)._"
-    )
 
 # ---------------------------
 # Navegação principal
@@ -1213,30 +117,23 @@ def main():
         page_title="Capacidade x Demanda - Laboratório",
         layout="wide"
     )
+    tempos = _tempos()
+    if tempos["importacao_s"] is None:
+        tempos["importacao_s"] = _IMPORTACAO_S
 
     st.title("Gestão de Demanda x Capacidade do Laboratório")
 
-    menu = st.sidebar.radio(
-        "Navegação",
-        [
-            "Colaboradores",
-            "Micro-áreas & Atividades",
-            "Demandas",
-            "Painel",
-            "Análise de Atividades"
-        ]
-    )
+    menu = st.sidebar.radio("Navegação", list(TELAS))
+    abrir_tela(menu)
 
-    if menu == "Colaboradores":
-        tela_colaboradores()
-    elif menu == "Micro-áreas & Atividades":
-        tela_microareas_atividades()
-    elif menu == "Demandas":
-        tela_demandas()
-    elif menu == "Painel":
-        tela_painel()
-    elif menu == "Análise de Atividades":
-        tela_analise_atividades()
+    from engine import estatisticas_cache
+    cache = estatisticas_cache()
+    st.sidebar.caption(
+        f"Cache de dados: {cache['hits']} hits / {cache['misses']} misses "
+        f"({cache['tabelas']} tabelas em memória)"
+    )
+    _mostrar_tempos()
+    _mostrar_diagnostico()
 
 
 if __name__ == "__main__":
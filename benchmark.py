@@ -0,0 +1,367 @@
+"""
+Benchmark do app com dados sintéticos.
+
+Gera colaboradores, micro-áreas, atividades, demandas e vínculos no tamanho
+pedido, grava num diretório temporário e mede tempo e pico de memória das
+funções principais. O resultado vai para um JSON, para comparar versões.
+
+Exemplos:
+    python benchmark.py --tamanho grande
+    python benchmark.py --colaboradores 1000 --atividades 2000 --periodos 60
+    python benchmark.py --tamanho medio --comparar benchmark_resultados_antes.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+TAMANHOS = {
+    "pequeno": {"colaboradores": 50, "atividades": 100, "periodos": 12, "microareas": 8},
+    "medio": {"colaboradores": 300, "atividades": 600, "periodos": 24, "microareas": 15},
+    "grande": {"colaboradores": 1000, "atividades": 2000, "periodos": 60, "microareas": 30},
+}
+
+CARGOS = ["Estagiário", "Assistente", "Analista", "Especialista", "Coordenador"]
+
+
+def gerar_dados_sinteticos(colaboradores, atividades, periodos, microareas, vinculos_por_atividade=3, seed=0):
+    """
+    Cria as cinco tabelas do app com o esquema dos CSVs.
+    Retorna {tabela: DataFrame}.
+    """
+    rng = np.random.default_rng(seed)
+    nomes_micro = [f"Micro {i}" for i in range(1, microareas + 1)]
+
+    df_micro = pd.DataFrame({
+        "id": np.arange(1, microareas + 1),
+        "nome": nomes_micro,
+        "descricao": "",
+    })
+
+    cargos = rng.choice(CARGOS, colaboradores)
+    df_colab = pd.DataFrame({
+        "id": np.arange(1, colaboradores + 1),
+        "nome": [f"Colaborador {i}" for i in range(1, colaboradores + 1)],
+        "cargo": cargos,
+        "carga_diaria": np.where(cargos == "Estagiário", 6.0, 8.0),
+        "microarea_principal_id": rng.integers(1, microareas + 1, colaboradores),
+        "microareas_secundarias": "",
+        "ativo": "sim",
+    })
+
+    df_ativ = pd.DataFrame({
+        "id": np.arange(1, atividades + 1),
+        "nome": [f"Atividade {i}" for i in range(1, atividades + 1)],
+        "microarea_id": rng.integers(1, microareas + 1, atividades),
+        "categoria": "",
+        "responsavel_funcao": "",
+        "hh_por_unidade": rng.choice([5, 10, 30, 60, 120, 480], atividades) / 60.0,
+        "fator_por_projeto": rng.choice([0.02, 0.05, 0.1, 0.2, 0.5, 1.0], atividades),
+    })
+
+    lista_periodos = pd.period_range("2020-01", periods=periodos, freq="M").strftime("%Y-%m")
+    projetos = rng.integers(200, 900, periodos)
+    df_dem = pd.DataFrame({
+        "periodo": np.repeat(lista_periodos, atividades),
+        "atividade_id": np.tile(df_ativ["id"].to_numpy(), periodos),
+        "quantidade": np.outer(projetos, df_ativ["fator_por_projeto"].to_numpy()).ravel(),
+    })
+    df_dem.insert(0, "id", np.arange(1, len(df_dem) + 1))
+
+    n_vinc = atividades * vinculos_por_atividade
+    ativ_vinc = np.repeat(df_ativ["id"].to_numpy(), vinculos_por_atividade)
+    df_colab_ativ = pd.DataFrame({
+        "id": np.arange(1, n_vinc + 1),
+        "colab_id": rng.integers(1, colaboradores + 1, n_vinc),
+        "atividade_id": ativ_vinc,
+        "percentual": rng.choice([0.0, 25.0, 50.0, 100.0], n_vinc),
+    })
+
+    return {
+        "colaboradores": df_colab,
+        "microareas": df_micro,
+        "atividades": df_ativ,
+        "demandas": df_dem,
+        "colab_atividades": df_colab_ativ,
+    }
+
+
+def medir(nome, func, repeticoes, preparar=None):
+    """
+    Roda func `repeticoes` vezes para medir tempo e mais uma vez sob
+    tracemalloc para o pico de memória (tracemalloc distorce o tempo).
+    preparar(), se informado, roda antes de cada execução e fica fora da medição.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    func()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    resultado = {
+        "nome": nome,
+        "tempo_min_s": min(tempos),
+        "tempo_mediana_s": statistics.median(tempos),
+        "pico_memoria_mb": pico / 1024 / 1024,
+    }
+    print(f"{nome:<45} {resultado['tempo_mediana_s'] * 1000:>10.1f} ms {resultado['pico_memoria_mb']:>9.1f} MB")
+    return resultado
+
+
+def versao_git():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(parametros, repeticoes):
+    diretorio = tempfile.mkdtemp(prefix="bench_app_")
+    os.environ["APP_DATA_DIR"] = diretorio
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import engine
+
+    dados = gerar_dados_sinteticos(**parametros)
+    for tabela, df in dados.items():
+        df.to_csv(os.path.join(diretorio, f"{tabela}.csv"), index=False)
+
+    def limpar_cache():
+        engine._cache_tabelas()["tabelas"].clear()
+
+    resultados = []
+    # partida a frio: importação num processo novo (a UI importa as telas sob demanda)
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    for modulo in ("engine", "app"):
+        resultados.append(medir(
+            f"importar {modulo} (processo novo)",
+            lambda modulo=modulo: subprocess.run([sys.executable, "-c", f"import {modulo}"], cwd=raiz, check=True),
+            repeticoes
+        ))
+
+    caminhos = {
+        "colaboradores": (engine.PATH_COLAB, list(dados["colaboradores"].columns)),
+        "microareas": (engine.PATH_MICRO, list(dados["microareas"].columns)),
+        "atividades": (engine.PATH_ATIV, list(dados["atividades"].columns)),
+        "demandas": (engine.PATH_DEM, list(dados["demandas"].columns)),
+        "colab_atividades": (engine.PATH_COLAB_ATIV, list(dados["colab_atividades"].columns)),
+    }
+    for tabela, (path, cols) in caminhos.items():
+        resultados.append(medir(
+            f"load_csv[{tabela}] (frio)",
+            lambda path=path, cols=cols: engine.load_csv(path, cols),
+            repeticoes, preparar=limpar_cache
+        ))
+    resultados.append(medir(
+        "load_csv[demandas] (cache)",
+        lambda: engine.load_csv(engine.PATH_DEM, caminhos["demandas"][1]),
+        repeticoes
+    ))
+
+    # o que uma tela paga para ler as cinco tabelas: get_* a cada rerun x repositório da sessão
+    resultados.append(medir(
+        "get_* (5 tabelas em cache)",
+        lambda: [carregar() for carregar, _ in engine.TABELAS_REPOSITORIO.values()],
+        repeticoes
+    ))
+    repo = engine.Repositorio()
+    resultados.append(medir(
+        "Repositorio.tabela (5 tabelas)",
+        lambda: [repo.tabela(t) for t in engine.TABELAS_REPOSITORIO],
+        repeticoes
+    ))
+    resultados.append(medir(
+        "Repositorio: inserir + ler vínculo",
+        lambda: (
+            repo.inserir("colab_atividades", pd.DataFrame([{
+                "colab_id": 1, "atividade_id": 1, "percentual": 0.0
+            }])),
+            repo.tabela("colab_atividades"),
+        ),
+        repeticoes
+    ))
+
+    colabs = engine.get_colaboradores()
+    microareas = engine.get_microareas()
+    atividades = engine.get_atividades()
+    demandas = engine.get_demandas()
+    colab_ativ = engine.get_colab_atividades()
+    periodo = demandas["periodo"].iloc[-1]
+
+    resultados.append(medir(
+        "calcular_capacidades",
+        lambda: engine.calcular_capacidades(colabs, 22),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "calcular_alocacoes (1 período)",
+        lambda: engine.calcular_alocacoes(colabs, microareas, atividades, demandas, colab_ativ, periodo, 22),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "calcular_alocacoes_lote (todos os períodos)",
+        lambda: engine.calcular_alocacoes_lote(colabs, atividades, demandas, colab_ativ, 22),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "montar_matriz_pesos",
+        lambda: engine.montar_matriz_pesos(colab_ativ),
+        repeticoes
+    ))
+    pesos = engine.montar_matriz_pesos(colab_ativ)
+    resultados.append(medir(
+        "calcular_alocacoes_lote (matriz de pesos pronta)",
+        lambda: engine.calcular_alocacoes_lote(colabs, atividades, demandas, pesos, 22),
+        repeticoes
+    ))
+    agregados = engine.get_demanda_hh()
+    resultados.append(medir(
+        "get_demanda_hh (agregados em dia)",
+        lambda: engine.get_demanda_hh([periodo]),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "calcular_alocacoes (1 período, agregados)",
+        lambda: engine.calcular_alocacoes(
+            colabs, microareas, atividades, engine.get_demanda_hh([periodo]), pesos, periodo, 22
+        ),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "calcular_alocacoes_lote (agregados)",
+        lambda: engine.calcular_alocacoes_lote(colabs, atividades, agregados, pesos, 22),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "calcular_painel (todos os períodos, CLI)",
+        lambda: engine.calcular_painel(dias_uteis=22),
+        repeticoes
+    ))
+    dias = engine.dias_uteis_periodo(periodo)
+    dem_periodo = demandas[demandas["periodo"] == periodo]
+    resultados.append(medir(
+        "programar_periodo (1 período, dia a dia)",
+        lambda: engine.programar_periodo(colabs, atividades, dem_periodo, pesos, dias),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "simular_demanda (10k cenários)",
+        lambda: engine.simular_demanda(atividades, 500, pesos, 10000, seed=0),
+        repeticoes
+    ))
+
+    # Seeds sobre a base sintética já gravada: mede a atualização por nome
+    # (só a 1ª repetição insere os itens que faltam; a mediana é da atualização)
+    resultados.append(medir(
+        "seed_default_microareas_atividades (base existente)",
+        lambda: engine.seed_default_microareas_atividades(),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "seed_default_colaboradores (base existente)",
+        lambda: engine.seed_default_colaboradores(),
+        repeticoes
+    ))
+
+    cronograma = pd.DataFrame({
+        "periodo": pd.period_range("2030-01", periods=12, freq="M").strftime("%Y-%m"),
+        "num_projetos": 500.0,
+    })
+    resultados.append(medir(
+        "gerar_demandas (12 períodos)",
+        lambda: engine.gerar_demandas(atividades, cronograma, engine.get_storage().proximo_id("demandas")),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "gerar + gravar demandas com agregados (12 períodos)",
+        lambda: engine.gravar_demandas(engine.gerar_demandas(atividades, cronograma), cronograma["periodo"]),
+        repeticoes
+    ))
+    resultados.append(medir(
+        "gerar + gravar demandas (12 períodos)",
+        lambda: engine.get_storage().substituir(
+            "demandas",
+            engine.gerar_demandas(atividades, cronograma, engine.get_storage().proximo_id("demandas")),
+            periodo=cronograma["periodo"].tolist()
+        ),
+        repeticoes
+    ))
+
+    return resultados
+
+
+def comparar(resultados, path_base):
+    with open(path_base, encoding="utf-8") as f:
+        base = {r["nome"]: r for r in json.load(f)["resultados"]}
+
+    print(f"\nComparação com {path_base} (mediana atual / mediana base):")
+    for r in resultados:
+        anterior = base.get(r["nome"])
+        if anterior is None or anterior["tempo_mediana_s"] == 0:
+            continue
+        razao = r["tempo_mediana_s"] / anterior["tempo_mediana_s"]
+        marca = "  <-- regressão" if razao > 1.2 else ""
+        print(f"{r['nome']:<45} {razao:>6.2f}x{marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark com dados sintéticos do laboratório.")
+    parser.add_argument("--tamanho", choices=sorted(TAMANHOS), default="medio")
+    parser.add_argument("--colaboradores", type=int)
+    parser.add_argument("--atividades", type=int)
+    parser.add_argument("--periodos", type=int)
+    parser.add_argument("--microareas", type=int)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    parametros = dict(TAMANHOS[args.tamanho])
+    for chave in parametros:
+        if getattr(args, chave) is not None:
+            parametros[chave] = getattr(args, chave)
+
+    print(f"Parâmetros: {parametros}")
+    resultados = executar(parametros, args.repeticoes)
+
+    saida = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "versao": versao_git(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "parametros": parametros,
+        "repeticoes": args.repeticoes,
+        "resultados": resultados,
+    }
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(saida, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
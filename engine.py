@@ -0,0 +1,3115 @@
+"""
+Núcleo do app sem interface: armazenamento, carregamento das tabelas, listas
+padrão e cálculos de capacidade, alocação, simulação e contratações.
+
+Não importa o Streamlit, então serve para relatórios em lote (cron, vários
+processos em paralelo) pela linha de comando:
+
+    python engine.py periodos
+    python engine.py painel --periodo 2024-01 --periodo 2024-02 --saida relatorios
+    python engine.py painel --dias-uteis 21 --formato json
+    python engine.py programacao --periodo 2024-01 --feriado 2024-01-01
+    python engine.py importar --tabela demandas demandas.csv --rejeitadas rejeitadas.csv
+    python engine.py --metricas medicoes.jsonl painel
+
+O armazenamento segue as mesmas variáveis do app (APP_STORAGE, APP_DATA_DIR).
+"""
+import argparse
+import functools
+import pandas as pd
+import numpy as np
+import os
+import json
+import random
+import sqlite3
+import sys
+import threading
+import time
+import zipfile
+from collections import deque
+from contextlib import contextmanager
+from itertools import product
+
+try:
+    import fcntl
+except ImportError:  # Windows: só a trava entre threads do processo
+    fcntl = None
+
+# ---------------------------
+# Paths e diretórios
+# ---------------------------
+DATA_DIR = os.environ.get("APP_DATA_DIR", "data")
+os.makedirs(DATA_DIR, exist_ok=True)
+
+PATH_COLAB = os.path.join(DATA_DIR, "colaboradores.csv")
+PATH_MICRO = os.path.join(DATA_DIR, "microareas.csv")
+PATH_ATIV = os.path.join(DATA_DIR, "atividades.csv")
+PATH_DEM = os.path.join(DATA_DIR, "demandas.csv")
+PATH_COLAB_ATIV = os.path.join(DATA_DIR, "colab_atividades.csv")
+PATH_PESOS = os.path.join(DATA_DIR, "pesos_vinculos.npz")
+PATH_DEMANDA_HH_ATIV = os.path.join(DATA_DIR, "demanda_hh_atividade.csv")
+PATH_DEMANDA_HH_MICRO = os.path.join(DATA_DIR, "demanda_hh_microarea.csv")
+
+# ---------------------------
+# Lista padrão Grupo x Atividade x tempo (min) x fator (% por projeto)
+# ---------------------------
+DEFAULT_GRUPOS_ATIVIDADES = [
+    ("Entrada", "Fotos", 5, 100),
+    ("Entrada", "Dar entrada labtrack", 5, 100),
+    ("Entrada", "Dar entrada atlas", 5, 50),
+    ("Entrada", "Montar minuta", 10, 100),
+    ("Entrada", "Assinar ID", 5, 100),
+    ("Entrada", "Emendas ID", 30, 20),
+    ("Entrada", "Planilha ETS", 5, 50),
+    ("Entrada", "Gerar minutas", 5, 100),
+
+    ("17087", "Ensaiar aquecimento", 10, 60),
+    ("17087", "Devolução", 5, 100),
+    ("17087", "Choque", 10, 20),
+    ("17087", "Fechar relatório 17087", 10, 60),
+    ("17087", "Assinar 17087", 10, 60),
+    ("17087", "Emendas 17087", 30, 12),
+
+    ("EMC", "Radiada", 30, 55),
+    ("EMC", "Imunidade", 40, 55),
+    ("EMC", "Intensidade de campo", 150, 20),
+    ("EMC", "Ensaio conduzido", 30, 20),
+    ("EMC", "Imunidade conduzida", 80, 20),
+    ("EMC", "Configurações EMC", 60, 20),
+    ("EMC", "Fechar relatório EMC", 20, 55),
+    ("EMC", "Assinar EMC", 20, 55),
+    ("EMC", "Emendas EMC", 30, 10),
+    ("EMC", "Ensaio acompanhado", 480, 2),
+    ("EMC", "Estudo de Normas, Acompanhamento Clientes, Desenvolvimento da Área, Gerenciar a Agenda", 480, 2),
+    ("EMC", "Dúvidas comercial", 60, 4),
+    ("EMC", "Reuniões", 120, 10),
+
+    ("RF", "Configurações RF", 120, 40),
+    ("RF", "Wi-Fi", 420, 15),
+    ("RF", "Ensaio DFS", 45, 5),
+    ("RF", "Ensaio SAR", 60, 20),
+    ("RF", "BT", 120, 25),
+    ("RF", "Lora", 120, 5),
+    ("RF", "Emendas RF", 30, 10),
+    ("RF", "Fechar relatório RF", 30, 40),
+    ("RF", "Assinar RF", 10, 40),
+    ("RF", "Reuniões", 120, 15),
+    ("RF", "Dúvidas comercial", 120, 4),
+
+    ("EMC Extras", "Ensaios Eletrodomésticos", 120, 5),
+    ("EMC Extras", "Devolver eletrodoméstico", 30, 5),
+    ("EMC Extras", "Fechar relatório eletrodomésticos", 30, 5),
+    ("EMC Extras", "Eletromedicos", 480, 5),
+    ("EMC Extras", "Fechar relatório eletromedicos", 60, 5),
+    ("EMC Extras", "Fechar relatório TV", 120, 5),
+    ("EMC Extras", "TVs", 480, 5),
+
+    ("3GPP", "IPV6", 60, 5),
+    ("3GPP", "Ensaios Funcionais (2G, 3G e 4G)", 480, 5),
+    ("3GPP", "Reuniões", 60, 5),
+    ("3GPP", "Retestes", 240, 5),
+    ("3GPP", "Funcional", 60, 5),
+    ("3GPP", "Fechar relatório ipv6", 60, 5),
+
+    ("Baterias", "Ensaio de Powerbank", 90, 10),
+    ("Baterias", "Fechar relatório Powerbank", 30, 10),
+    ("Baterias", "Organizar Powerbanks (devolução, cronograma, etc)", 30, 10),
+
+    ("Acústicos", "Ensaio acústico", 60, 5),
+    ("Acústicos", "Relatórios ensaio acústico", 60, 5),
+    ("Acústicos", "Devolver amostras acústico", 60, 5),
+    ("Acústicos", "Retirar amostras acústico", 60, 5),
+    ("Acústicos", "Fotos das amostras acústico", 60, 5),
+    ("Acústicos", "outros ensaios (Exemplo, TV)", 240, 5),
+
+    ("Desenvolvimento", "Desenvolvimento de Melhorias", 480, 5),
+]
+
+# ---------------------------
+# Lista padrão de colaboradores: (cargo, microarea_principal, nome)
+# ---------------------------
+DEFAULT_COLABS = [
+    ("Estagiário", "Entrada", "Kaua"),
+    ("Estagiário", "Entrada", "Henrique"),
+    ("Assistente", "Entrada", "Cristian"),
+    ("Estagiário", "Entrada", "Isadora"),
+
+    ("Assistente", "17087", "Arthur"),
+
+    ("Analista", "EMC", "Philipe"),
+    ("Especialista", "EMC", "Elinaldo"),
+    ("Assistente", "EMC", "Fernando"),
+    ("Estagiário", "EMC", "João de Paula"),
+    ("Assistente", "EMC", "Eduardo Altnetter"),
+    ("Assistente", "EMC", "Júlia Nascimento"),
+    ("Analista", "EMC", "Felipe Constant"),
+
+    ("Assistente", "RF", "João Daneres"),
+    ("Assistente", "RF", "Bernardo"),
+    ("Estagiário", "RF", "Rafael"),
+    ("Assistente", "RF", "Francis"),
+    ("Assistente", "RF", "João Vitor"),
+    ("Estagiário", "RF", "Georgia"),
+
+    ("Analista", "3GPP", "Greter"),
+    ("Analista", "3GPP", "Eduardo Oliveira"),
+
+    ("Analista", "RF", "João Pinheiro"),
+    ("Assistente", "RF", "Marcelo"),
+
+    ("Estagiário", "Baterias", "Fabricio"),
+]
+
+# ---------------------------
+# Cargos e carga horária diária
+# ---------------------------
+CARGOS = ["Estagiário", "Assistente", "Analista", "Especialista", "Coordenador"]
+
+# Carga diária (h) por cargo; cargos fora do dicionário usam CARGA_DIARIA_PADRAO
+CARGA_DIARIA_CARGO = {"Estagiário": 6.0}
+CARGA_DIARIA_PADRAO = 8.0
+
+# Cargos considerados pelo plano de contratações, em ordem de preferência
+CARGOS_CONTRATACAO = ["Estagiário", "Assistente", "Analista"]
+
+
+def carga_diaria_cargo(cargo):
+    return CARGA_DIARIA_CARGO.get(cargo, CARGA_DIARIA_PADRAO)
+
+# ---------------------------
+# Armazenamento: CSV (padrão) ou SQLite
+# ---------------------------
+STORAGE_BACKEND = os.environ.get("APP_STORAGE", "csv").lower()
+PATH_DB = os.path.join(DATA_DIR, "app.db")
+JOURNAL_MAX_BYTES = 256 * 1024
+
+# Colunas e tipos (SQLite) das tabelas (as duas últimas são agregados derivados).
+# Micro-áreas são referenciadas pelo id; os nomes entram na leitura (juntar_microareas)
+SCHEMA_TABELAS = {
+    "colaboradores": [
+        ("id", "INTEGER PRIMARY KEY"), ("nome", "TEXT"), ("cargo", "TEXT"),
+        ("carga_diaria", "REAL"), ("microarea_principal_id", "INTEGER"),
+        ("microareas_secundarias", "TEXT"), ("ativo", "TEXT"),
+    ],
+    "microareas": [
+        ("id", "INTEGER PRIMARY KEY"), ("nome", "TEXT"), ("descricao", "TEXT"),
+    ],
+    "atividades": [
+        ("id", "INTEGER PRIMARY KEY"), ("nome", "TEXT"), ("microarea_id", "INTEGER"),
+        ("categoria", "TEXT"), ("responsavel_funcao", "TEXT"),
+        ("hh_por_unidade", "REAL"), ("fator_por_projeto", "REAL"),
+    ],
+    "demandas": [
+        ("id", "INTEGER PRIMARY KEY"), ("periodo", "TEXT"),
+        ("atividade_id", "INTEGER"), ("quantidade", "REAL"),
+    ],
+    "colab_atividades": [
+        ("id", "INTEGER PRIMARY KEY"), ("colab_id", "INTEGER"),
+        ("atividade_id", "INTEGER"), ("percentual", "REAL"),
+    ],
+    "demanda_hh_atividade": [
+        ("id", "INTEGER PRIMARY KEY"), ("periodo", "TEXT"), ("atividade_id", "INTEGER"),
+        ("microarea_id", "INTEGER"), ("hh_total_atividade", "REAL"),
+    ],
+    "demanda_hh_microarea": [
+        ("id", "INTEGER PRIMARY KEY"), ("periodo", "TEXT"), ("microarea_id", "INTEGER"),
+        ("hh_necessarias", "REAL"),
+    ],
+}
+
+# Tipos em memória/disco do armazenamento colunar (Parquet/Feather)
+SCHEMA_COLUNAR = {
+    "colaboradores": {
+        "id": "Int64", "cargo": "category", "carga_diaria": "float64",
+        "microarea_principal_id": "Int64", "ativo": "category",
+    },
+    "microareas": {"id": "Int64"},
+    "atividades": {
+        "id": "Int64", "microarea_id": "Int64", "categoria": "category",
+        "hh_por_unidade": "float64", "fator_por_projeto": "float64",
+    },
+    "demandas": {
+        "id": "Int64", "periodo": "category", "atividade_id": "Int64", "quantidade": "float64",
+    },
+    "colab_atividades": {
+        "id": "Int64", "colab_id": "Int64", "atividade_id": "Int64", "percentual": "float64",
+    },
+    "demanda_hh_atividade": {
+        "id": "Int64", "periodo": "category", "atividade_id": "Int64",
+        "microarea_id": "Int64", "hh_total_atividade": "float64",
+    },
+    "demanda_hh_microarea": {
+        "id": "Int64", "periodo": "category", "microarea_id": "Int64", "hh_necessarias": "float64",
+    },
+}
+
+SQLITE_INDICES = [
+    ("idx_demandas_periodo", "demandas", "periodo"),
+    ("idx_demandas_atividade", "demandas", "atividade_id"),
+    ("idx_colab_ativ_colab", "colab_atividades", "colab_id"),
+    ("idx_colab_ativ_atividade", "colab_atividades", "atividade_id"),
+    ("idx_atividades_microarea", "atividades", "microarea_id"),
+    ("idx_colaboradores_microarea", "colaboradores", "microarea_principal_id"),
+    ("idx_demanda_hh_ativ_periodo", "demanda_hh_atividade", "periodo"),
+    ("idx_demanda_hh_ativ_atividade", "demanda_hh_atividade", "atividade_id"),
+    ("idx_demanda_hh_micro_periodo", "demanda_hh_microarea", "periodo"),
+]
+
+
+_CACHE_TABELAS = {"tabelas": {}, "hits": 0, "misses": 0}
+
+
+def _cache_tabelas():
+    """
+    Cache das tabelas lidas, global do processo: compartilhado entre reruns e
+    sessões do Streamlit e entre chamadas da CLI.
+    tabelas: {chave: (assinatura, df)}
+    - CSV/Parquet/Feather: chave = path, assinatura = CsvStorage.assinatura
+    - SQLite: chave = "db::tabela", assinatura = versão da tabela
+    """
+    return _CACHE_TABELAS
+
+
+def _assinatura_arquivo(path):
+    info = os.stat(path)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def _ler_com_cache(chave, assinatura, leitor):
+    cache = _cache_tabelas()
+    entrada = cache["tabelas"].get(chave)
+    if entrada is not None and entrada[0] == assinatura:
+        cache["hits"] += 1
+        return entrada[1].copy()
+
+    cache["misses"] += 1
+    df = leitor()
+    cache["tabelas"][chave] = (assinatura, df)
+    return df.copy()
+
+
+def _invalidar_cache(chave):
+    _cache_tabelas()["tabelas"].pop(chave, None)
+
+# ---------------------------
+# Instrumentação: tempo, chamadas, linhas e bytes de E/S por função
+# ---------------------------
+# Eventos guardados para exportação em JSON lines (os mais antigos saem)
+MAX_EVENTOS_METRICAS = 20_000
+# Se definido, cada evento também é anexado a este arquivo JSONL
+PATH_METRICAS = os.environ.get("APP_METRICAS_JSONL")
+
+_METRICAS = {"funcoes": {}, "eventos": deque(maxlen=MAX_EVENTOS_METRICAS)}
+_METRICAS_LOCK = threading.Lock()
+# por thread (sessão do Streamlit): medições abertas e tela em renderização
+_CONTEXTO_METRICAS = threading.local()
+
+
+def _medicoes_abertas():
+    if not hasattr(_CONTEXTO_METRICAS, "pilha"):
+        _CONTEXTO_METRICAS.pilha = []
+    return _CONTEXTO_METRICAS.pilha
+
+
+def registrar_bytes(n):
+    """
+    Soma n bytes de E/S a todas as medições abertas na thread (a medição de
+    uma função inclui a das funções que ela chama). Só os backends de arquivo
+    (CSV/Parquet/Feather) e a matriz de pesos informam bytes.
+    """
+    for medicao in _medicoes_abertas():
+        medicao["bytes"] += n
+
+
+@contextmanager
+def medicao(nome, tela=None):
+    """
+    Mede o bloco como uma chamada de `nome`. Com `tela`, as medições feitas
+    dentro do bloco (na mesma thread) são atribuídas a essa tela.
+    Linhas podem ser informadas em medida["linhas"].
+    """
+    pilha = _medicoes_abertas()
+    tela_anterior = getattr(_CONTEXTO_METRICAS, "tela", None)
+    if tela is not None:
+        _CONTEXTO_METRICAS.tela = tela
+    medida = {"bytes": 0, "linhas": None}
+    pilha.append(medida)
+    inicio = time.perf_counter()
+    erro = True
+    try:
+        yield medida
+        erro = False
+    finally:
+        duracao = time.perf_counter() - inicio
+        pilha.pop()
+        _CONTEXTO_METRICAS.tela = tela_anterior
+        _registrar_metrica(nome, tela if tela is not None else tela_anterior, duracao, medida, erro)
+
+
+def _registrar_metrica(nome, tela, duracao, medida, erro):
+    evento = {
+        "instante": round(time.time(), 3),
+        "funcao": nome,
+        "tela": tela,
+        "duracao_s": round(duracao, 6),
+        "linhas": medida["linhas"],
+        "bytes": medida["bytes"],
+        "erro": erro,
+    }
+    with _METRICAS_LOCK:
+        total = _METRICAS["funcoes"].setdefault(nome, {
+            "chamadas": 0, "tempo_total_s": 0.0, "tempo_max_s": 0.0, "linhas": 0, "bytes": 0,
+        })
+        total["chamadas"] += 1
+        total["tempo_total_s"] += duracao
+        total["tempo_max_s"] = max(total["tempo_max_s"], duracao)
+        total["linhas"] += medida["linhas"] or 0
+        total["bytes"] += medida["bytes"]
+        _METRICAS["eventos"].append(evento)
+        if PATH_METRICAS:
+            with open(PATH_METRICAS, "a", encoding="utf-8") as f:
+                f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+
+
+def _contar_linhas(resultado):
+    # DataFrame, tupla/dict de DataFrames (cálculos) ou matriz de pesos
+    if isinstance(resultado, pd.DataFrame):
+        return len(resultado)
+    if isinstance(resultado, dict) and "valores" in resultado:
+        return len(resultado["valores"])
+    if isinstance(resultado, (tuple, dict)):
+        partes = resultado.values() if isinstance(resultado, dict) else resultado
+        return sum(len(df) for df in partes if isinstance(df, pd.DataFrame))
+    return None
+
+
+def instrumentar(nome=None, linhas=None):
+    """
+    Decorador: registra cada chamada em medicao(nome). As linhas vêm de
+    linhas(args, kwargs, resultado) ou, por padrão, do tamanho do resultado.
+    """
+    def decorador(func):
+        rotulo = nome or func.__name__
+
+        @functools.wraps(func)
+        def envolvida(*args, **kwargs):
+            with medicao(rotulo) as medida:
+                resultado = func(*args, **kwargs)
+                medida["linhas"] = (
+                    linhas(args, kwargs, resultado) if linhas else _contar_linhas(resultado)
+                )
+            return resultado
+        return envolvida
+    return decorador
+
+
+def _linhas_gravadas(args, kwargs, resultado):
+    # escritas: linhas do DataFrame recebido (atualizar/excluir não informam)
+    for valor in list(args) + list(kwargs.values()):
+        if isinstance(valor, pd.DataFrame):
+            return len(valor)
+    return None
+
+
+def metricas():
+    """
+    Totais por função: chamadas, tempo total/médio/máximo (inclui as funções
+    chamadas dentro dela), linhas e bytes; ordenado pelo tempo total.
+    """
+    with _METRICAS_LOCK:
+        df = pd.DataFrame.from_dict(_METRICAS["funcoes"], orient="index")
+    if df.empty:
+        return pd.DataFrame(columns=[
+            "funcao", "chamadas", "tempo_total_s", "tempo_medio_s", "tempo_max_s", "linhas", "bytes"
+        ])
+    df["tempo_medio_s"] = df["tempo_total_s"] / df["chamadas"]
+    df = df.rename_axis("funcao").reset_index()
+    return df[["funcao", "chamadas", "tempo_total_s", "tempo_medio_s", "tempo_max_s", "linhas", "bytes"]] \
+        .sort_values("tempo_total_s", ascending=False, ignore_index=True)
+
+
+def eventos_jsonl():
+    """
+    Eventos registrados (um por chamada medida), em JSON lines.
+    """
+    with _METRICAS_LOCK:
+        eventos = list(_METRICAS["eventos"])
+    return "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in eventos)
+
+
+def zerar_metricas():
+    with _METRICAS_LOCK:
+        _METRICAS["funcoes"].clear()
+        _METRICAS["eventos"].clear()
+
+
+class ConflitoVersao(Exception):
+    """
+    A tabela mudou desde a leitura: a versão informada na escrita não é a atual.
+    """
+
+
+# Tentativas de com_retentativa antes de desistir de uma escrita em conflito
+TENTATIVAS_CONFLITO = 8
+
+
+def com_retentativa(operacao, tentativas=TENTATIVAS_CONFLITO):
+    """
+    Executa operacao() (que lê a versão, lê os dados e grava com versao=...)
+    repetindo-a quando outra sessão grava na mesma tabela no meio do caminho.
+    """
+    for tentativa in range(tentativas):
+        try:
+            return operacao()
+        except ConflitoVersao:
+            if tentativa == tentativas - 1:
+                raise
+            time.sleep(random.uniform(0, min(0.5, 0.01 * 2 ** tentativa)))
+
+
+def _atribuir_ids(linhas, proximo):
+    """
+    Preenche ids ausentes (coluna sem valor ou inexistente) com ids novos,
+    a partir de `proximo` e acima dos ids já presentes em `linhas`.
+    """
+    if "id" in linhas.columns and linhas["id"].notna().all():
+        return linhas
+    linhas = linhas.copy()
+    if "id" not in linhas.columns:
+        linhas.insert(0, "id", np.nan)
+    ids = pd.to_numeric(linhas["id"], errors="coerce").to_numpy(dtype=float, copy=True)
+    faltam = np.isnan(ids)
+    inicio = max(proximo, int(np.nanmax(ids)) + 1 if (~faltam).any() else proximo)
+    ids[faltam] = np.arange(inicio, inicio + faltam.sum())
+    linhas["id"] = ids.astype(np.int64)
+    return linhas
+
+
+def _valor_sql(v):
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return None
+    return v.item() if hasattr(v, "item") else v
+
+
+def _valor_filtro(v):
+    # listas/tuplas/conjuntos em filtros significam "coluna IN (...)"
+    if isinstance(v, (list, tuple, set)):
+        return [_valor_sql(x) for x in v]
+    return _valor_sql(v)
+
+
+def _mascara(df, filtros):
+    mask = pd.Series(True, index=df.index)
+    for col, valor in filtros.items():
+        if isinstance(valor, (list, tuple, set)):
+            mask &= df[col].isin(list(valor))
+        else:
+            mask &= df[col] == valor
+    return mask
+
+
+def _atribuir(df, mask, col, valores):
+    """
+    df.loc[mask, col] = valores, convertendo a coluna para object quando o
+    tipo atual não aceita os valores (texto em coluna numérica, categoria nova).
+    """
+    if col not in df.columns:
+        df[col] = None
+    try:
+        df.loc[mask, col] = valores
+    except (TypeError, ValueError):
+        df[col] = df[col].astype(object)
+        df.loc[mask, col] = valores
+
+
+def aplicar_schema(df, tabela):
+    """
+    Converte as colunas de `tabela` para os tipos de SCHEMA_COLUNAR.
+    """
+    df = df.copy()
+    for col, tipo in SCHEMA_COLUNAR.get(tabela, {}).items():
+        if col not in df.columns:
+            df[col] = None
+        if tipo == "category":
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str)).astype("category")
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(tipo)
+    return df
+
+
+def _colunas_schema(tabela, df):
+    # só as colunas do schema são gravadas (as derivadas na leitura, como os
+    # nomes das micro-áreas, ficam de fora), como no SQLite
+    if tabela not in SCHEMA_TABELAS:
+        return df
+    colunas = {c for c, _ in SCHEMA_TABELAS[tabela]}
+    return df[[c for c in df.columns if c in colunas]]
+
+
+def _registros(linhas):
+    return [
+        {k: _valor_sql(v) for k, v in linha.items()}
+        for linha in linhas.to_dict("records")
+    ]
+
+
+def _entrada_journal(op, linhas=None, proximo_id=None, valores=None, filtros=None):
+    """
+    Operação no formato do journal; linhas sem id recebem ids a partir de proximo_id.
+    """
+    entrada = {"op": op}
+    if linhas is not None:
+        entrada["linhas"] = _registros(_atribuir_ids(linhas, proximo_id))
+    if valores is not None:
+        entrada["valores"] = {k: _valor_sql(v) for k, v in valores.items()}
+    if filtros is not None:
+        entrada["filtros"] = {k: _valor_filtro(v) for k, v in filtros.items()}
+    return entrada
+
+
+def _aplicar_journal(df, entradas):
+    """
+    Reaplica as operações do journal sobre a tabela base.
+    As operações são idempotentes (inserir substitui linhas de mesmo id),
+    então reaplicar um journal já compactado não duplica linhas.
+    """
+    pendentes = []
+
+    def incluir(df, linhas):
+        novas = pd.DataFrame(linhas)
+        if novas.empty:
+            return df
+        if "id" in novas.columns:
+            novas = novas.drop_duplicates(subset="id", keep="last")
+            if "id" in df.columns:
+                df = df[~df["id"].isin(novas["id"])]
+        return pd.concat([df, novas], ignore_index=True)
+
+    for e in entradas:
+        op = e["op"]
+        if op == "inserir":
+            # inserções seguidas viram um único concat
+            pendentes.extend(e["linhas"])
+            continue
+        if pendentes:
+            df = incluir(df, pendentes)
+            pendentes = []
+        if op in ("excluir", "substituir"):
+            df = df[~_mascara(df, e["filtros"])]
+        if op == "substituir":
+            df = incluir(df, e["linhas"])
+        elif op == "atualizar":
+            mask = _mascara(df, e["filtros"])
+            for col, valor in e["valores"].items():
+                _atribuir(df, mask, col, valor)
+    if pendentes:
+        df = incluir(df, pendentes)
+    return df.reset_index(drop=True)
+
+
+def _ler_journal(path):
+    entradas = []
+    with open(path, encoding="utf-8") as f:
+        for linha in f:
+            try:
+                entradas.append(json.loads(linha))
+            except json.JSONDecodeError:
+                # linha incompleta de uma escrita interrompida
+                continue
+    return entradas
+
+
+class CsvStorage:
+    """
+    Formato original: um arquivo CSV por tabela em data_dir.
+    Escritas por linha vão para um journal (<tabela>.journal.jsonl) em O(alteração);
+    a leitura aplica o journal sobre o CSV base e compactar() incorpora o
+    journal ao CSV quando ele passa de JOURNAL_MAX_BYTES.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._travas = {}
+        self._profundidade = {}
+
+    def _path(self, tabela):
+        return os.path.join(self.data_dir, f"{tabela}.csv")
+
+    @contextmanager
+    def _trava(self, tabela):
+        """
+        Trava de escrita da tabela: RLock entre as sessões (threads) do processo
+        e flock em <tabela>.lock entre processos. Tabelas diferentes não se bloqueiam.
+        """
+        with self._lock:
+            trava = self._travas.setdefault(tabela, threading.RLock())
+        with trava:
+            # só a thread dona da trava mexe na profundidade desta tabela
+            profundidade = self._profundidade.get(tabela, 0)
+            arquivo = None
+            if profundidade == 0 and fcntl is not None:
+                arquivo = open(os.path.join(self.data_dir, f"{tabela}.lock"), "a")
+                fcntl.flock(arquivo, fcntl.LOCK_EX)
+            self._profundidade[tabela] = profundidade + 1
+            try:
+                yield
+            finally:
+                self._profundidade[tabela] = profundidade
+                if arquivo is not None:
+                    fcntl.flock(arquivo, fcntl.LOCK_UN)
+                    arquivo.close()
+
+    def _path_versao(self, tabela):
+        return os.path.join(self.data_dir, f"{tabela}.versao")
+
+    def versao(self, tabela):
+        """
+        Carimbo de versão da tabela, incrementado a cada escrita (compactar não muda).
+        Passado como versao=... numa escrita, faz a escrita falhar com ConflitoVersao
+        se outra sessão gravou na tabela depois da leitura.
+        """
+        try:
+            with open(self._path_versao(tabela), encoding="utf-8") as f:
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _conferir_versao(self, tabela, versao):
+        # chamado com a trava da tabela, antes da escrita
+        atual = self.versao(tabela)
+        if versao is not None and versao != atual:
+            raise ConflitoVersao(f"{tabela}: versão {versao} lida, {atual} atual")
+
+    def _incrementar_versao(self, tabela):
+        # chamado com a trava da tabela, depois da escrita: quem ler a versão
+        # nova já encontra os dados novos
+        tmp = self._path_versao(tabela) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(self.versao(tabela) + 1))
+        os.replace(tmp, self._path_versao(tabela))
+
+    def _journal(self, tabela):
+        return os.path.join(self.data_dir, f"{tabela}.journal.jsonl")
+
+    def _journals(self, tabela):
+        # ".compactando" = journal já separado por uma compactação em andamento
+        journal = self._journal(tabela)
+        return [p for p in (journal + ".compactando", journal) if os.path.exists(p)]
+
+    def _ler_base(self, tabela):
+        return pd.read_csv(self._path(tabela))
+
+    def _gravar_base(self, tabela, df):
+        path = self._path(tabela)
+        tmp = path + ".tmp"
+        df.to_csv(tmp, index=False)
+        registrar_bytes(os.path.getsize(tmp))
+        os.replace(tmp, path)
+        _invalidar_cache(path)
+
+    def _tipar(self, tabela, df):
+        return df
+
+    def assinatura(self, tabela):
+        """
+        Muda sempre que a tabela muda: versão da tabela e (mtime_ns, tamanho) do
+        arquivo base e dos journals. A versão cobre regravações do mesmo tamanho
+        dentro da resolução do mtime; os arquivos cobrem a compactação.
+        """
+        path = self._path(tabela)
+        if not os.path.exists(path):
+            return None
+        return (self.versao(tabela), _assinatura_arquivo(path)) + tuple(
+            _assinatura_arquivo(p) for p in self._journals(tabela)
+        )
+
+    def carregar(self, tabela, colunas):
+        path = self._path(tabela)
+        if not os.path.exists(path):
+            if tabela in SCHEMA_TABELAS:
+                colunas = [c for c, _ in SCHEMA_TABELAS[tabela]]
+            with self._trava(tabela):
+                if not os.path.exists(path):
+                    self._gravar_base(tabela, pd.DataFrame(columns=colunas))
+
+        # a assinatura é lida antes dos dados: uma escrita no meio deixa no
+        # cache dados mais novos que a assinatura, e a próxima leitura recarrega
+        return _ler_com_cache(path, self.assinatura(tabela), lambda: self._ler_atual(tabela))
+
+    def _ler_atual(self, tabela):
+        # com a trava, para não ler a base de antes e o journal de depois de uma compactação
+        with self._trava(tabela):
+            journals = self._journals(tabela)
+            df = self._ler_base(tabela)
+            entradas = [e for p in journals for e in _ler_journal(p)]
+            registrar_bytes(sum(os.path.getsize(p) for p in [self._path(tabela)] + journals))
+        if not journals:
+            return df
+        return self._tipar(tabela, _aplicar_journal(df, entradas))
+
+    @instrumentar("armazenamento.salvar", _linhas_gravadas)
+    def salvar(self, tabela, df, versao=None):
+        with self._trava(tabela):
+            self._conferir_versao(tabela, versao)
+            self._gravar_base(tabela, _colunas_schema(tabela, df))
+            for p in self._journals(tabela):
+                os.remove(p)
+            self._incrementar_versao(tabela)
+
+    def _registrar(self, tabela, entrada, versao=None):
+        journal = self._journal(tabela)
+        with self._trava(tabela):
+            if callable(entrada):
+                entrada = entrada()
+            self._conferir_versao(tabela, versao)
+            antes = self.assinatura(tabela)
+            linha = json.dumps(entrada, ensure_ascii=False) + "\n"
+            with open(journal, "a", encoding="utf-8") as f:
+                f.write(linha)
+            registrar_bytes(len(linha.encode("utf-8")))
+            self._incrementar_versao(tabela)
+            self._avancar_cache(tabela, antes, entrada)
+            if os.path.getsize(journal) > JOURNAL_MAX_BYTES:
+                self.compactar(tabela)
+
+    def _avancar_cache(self, tabela, antes, entrada):
+        # se a tabela em cache é a de antes da escrita, aplica só a nova entrada
+        # (evita reaplicar o journal inteiro a cada escrita da mesma sessão/processo)
+        chave = self._path(tabela)
+        cache = _cache_tabelas()["tabelas"]
+        atual = cache.get(chave)
+        if atual is not None and atual[0] == antes:
+            df = self._tipar(tabela, _aplicar_journal(atual[1].copy(), [entrada]))
+            cache[chave] = (self.assinatura(tabela), df)
+
+    def compactar(self, tabela):
+        journal = self._journal(tabela)
+        with self._trava(tabela):
+            if os.path.exists(journal) and not os.path.exists(journal + ".compactando"):
+                os.replace(journal, journal + ".compactando")
+            if not os.path.exists(journal + ".compactando"):
+                return
+            df = self.carregar(tabela, [])
+            self._gravar_base(tabela, df)
+            os.remove(journal + ".compactando")
+
+    def consultar(self, tabela, colunas, **filtros):
+        df = self.carregar(tabela, colunas)
+        return df[_mascara(df, filtros)]
+
+    def distintos(self, tabela, coluna):
+        df = self.carregar(tabela, [coluna])
+        if coluna not in df.columns:
+            return []
+        return sorted(df[coluna].dropna().unique().tolist())
+
+    def proximo_id(self, tabela):
+        return new_id(self.carregar(tabela, ["id"]))
+
+    @instrumentar("armazenamento.inserir", _linhas_gravadas)
+    def inserir(self, tabela, linhas, versao=None):
+        """
+        Linhas sem id recebem ids novos dentro da trava da tabela,
+        então sessões simultâneas não geram ids repetidos.
+        """
+        self._registrar(tabela, lambda: _entrada_journal(
+            "inserir", _colunas_schema(tabela, linhas), self.proximo_id(tabela)
+        ), versao)
+
+    @instrumentar("armazenamento.atualizar", _linhas_gravadas)
+    def atualizar(self, tabela, valores, versao=None, **filtros):
+        self._registrar(tabela, _entrada_journal("atualizar", valores=valores, filtros=filtros), versao)
+
+    @instrumentar("armazenamento.excluir", _linhas_gravadas)
+    def excluir(self, tabela, versao=None, **filtros):
+        self._registrar(tabela, _entrada_journal("excluir", filtros=filtros), versao)
+
+    @instrumentar("armazenamento.substituir", _linhas_gravadas)
+    def substituir(self, tabela, linhas, versao=None, **filtros):
+        self._registrar(tabela, lambda: _entrada_journal(
+            "substituir", _colunas_schema(tabela, linhas), self.proximo_id(tabela), filtros=filtros
+        ), versao)
+
+
+class ColunarStorage(CsvStorage):
+    """
+    Tabelas em Parquet ou Feather com os tipos de SCHEMA_COLUNAR (ids inteiros,
+    micro-área/cargo/período categóricos, horas em float), então a leitura não
+    precisa converter tipos. Escritas por linha usam o mesmo journal do CsvStorage.
+    Na criação, tabelas que só existem em CSV são migradas (os CSVs são mantidos).
+    Requer pyarrow.
+    """
+
+    def __init__(self, data_dir, formato="parquet"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                f"APP_STORAGE={formato} requer o pacote pyarrow (pip install pyarrow)."
+            ) from e
+        super().__init__(data_dir)
+        self.formato = formato
+        self.migrar_csvs()
+
+    def _path(self, tabela):
+        return os.path.join(self.data_dir, f"{tabela}.{self.formato}")
+
+    def _journal(self, tabela):
+        return os.path.join(self.data_dir, f"{tabela}.{self.formato}.journal.jsonl")
+
+    def _path_versao(self, tabela):
+        # separado do CsvStorage: os CSVs migrados continuam no mesmo diretório
+        return os.path.join(self.data_dir, f"{tabela}.{self.formato}.versao")
+
+    def _ler_base(self, tabela):
+        path = self._path(tabela)
+        if self.formato == "parquet":
+            return pd.read_parquet(path)
+        return pd.read_feather(path)
+
+    def _gravar_base(self, tabela, df):
+        path = self._path(tabela)
+        tmp = path + ".tmp"
+        df = aplicar_schema(df, tabela).reset_index(drop=True)
+        if self.formato == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_feather(tmp)
+        registrar_bytes(os.path.getsize(tmp))
+        os.replace(tmp, path)
+        _invalidar_cache(path)
+
+    def _tipar(self, tabela, df):
+        return aplicar_schema(df, tabela)
+
+    def migrar_csvs(self):
+        """
+        Migração única: grava em formato colunar as tabelas que ainda só
+        existem em CSV (incluindo o journal pendente). Retorna as tabelas migradas.
+        """
+        csv = CsvStorage(self.data_dir)
+        migrar_microarea_ids(csv)
+        migradas = []
+        for tabela, colunas in SCHEMA_TABELAS.items():
+            if os.path.exists(self._path(tabela)) or not os.path.exists(csv._path(tabela)):
+                continue
+            df = csv.carregar(tabela, [c for c, _ in colunas])
+            with self._trava(tabela):
+                self._gravar_base(tabela, df)
+            migradas.append(tabela)
+        return migradas
+
+
+class SqliteStorage:
+    """
+    Mesmas tabelas em um banco SQLite, com índices nas colunas de
+    filtro e escrita por linha em transação. Cada escrita incrementa a
+    versão da tabela em _versoes, usada como assinatura do cache e como
+    carimbo de versão (versao=...) nas escritas otimistas.
+    Na criação do banco, os CSVs existentes em data_dir são importados.
+    """
+
+    def __init__(self, path_db, data_dir):
+        novo = not os.path.exists(path_db)
+        self.path_db = path_db
+        with self._transacao() as conn:
+            self._criar_schema(conn)
+        if novo:
+            self._importar_csvs(data_dir)
+
+    @contextmanager
+    def _transacao(self, escrita=False):
+        conn = sqlite3.connect(self.path_db, timeout=30)
+        try:
+            with conn:
+                if escrita:
+                    # trava de escrita desde o início: versão conferida e escrita no mesmo passo
+                    conn.execute("BEGIN IMMEDIATE")
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _escrita(self, tabela, versao):
+        """
+        Transação de escrita que confere a versão esperada (se informada)
+        e incrementa a versão da tabela ao final.
+        """
+        with self._transacao(escrita=True) as conn:
+            atual = self._versao(conn, tabela)
+            if versao is not None and versao != atual:
+                raise ConflitoVersao(f"{tabela}: versão {versao} lida, {atual} atual")
+            yield conn
+            self._incrementar_versao(conn, tabela)
+
+    def versao(self, tabela):
+        with self._transacao() as conn:
+            return self._versao(conn, tabela)
+
+    def _criar_schema(self, conn):
+        for tabela, colunas in SCHEMA_TABELAS.items():
+            defs = ", ".join(f"{c} {tipo}" for c, tipo in colunas)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {tabela} ({defs})")
+            # bancos de um schema anterior ganham as colunas novas (vazias)
+            existentes = {r[1] for r in conn.execute(f"PRAGMA table_info({tabela})")}
+            for c, tipo in colunas:
+                if c not in existentes:
+                    conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {c} {tipo}")
+        for nome, tabela, coluna in SQLITE_INDICES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({coluna})")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS _versoes (tabela TEXT PRIMARY KEY, versao INTEGER NOT NULL)"
+        )
+
+    def _importar_csvs(self, data_dir):
+        csv = CsvStorage(data_dir)
+        migrar_microarea_ids(csv)
+        for tabela, colunas in SCHEMA_TABELAS.items():
+            if os.path.exists(csv._path(tabela)):
+                df = csv.carregar(tabela, [c for c, _ in colunas])
+                if not df.empty:
+                    self.salvar(tabela, df)
+
+    def _colunas(self, tabela):
+        return [c for c, _ in SCHEMA_TABELAS[tabela]]
+
+    def descartar_colunas_obsoletas(self):
+        """
+        Remove as colunas que saíram do schema (depois de migradas).
+        """
+        with self._transacao(escrita=True) as conn:
+            for tabela, colunas in SCHEMA_TABELAS.items():
+                atuais = {c for c, _ in colunas}
+                for r in conn.execute(f"PRAGMA table_info({tabela})").fetchall():
+                    if r[1] not in atuais:
+                        conn.execute(f"ALTER TABLE {tabela} DROP COLUMN {r[1]}")
+                _invalidar_cache(f"{self.path_db}::{tabela}")
+
+    def _where(self, filtros):
+        if not filtros:
+            return "", []
+        conds, params = [], []
+        for col, valor in filtros.items():
+            valor = _valor_filtro(valor)
+            if isinstance(valor, list):
+                conds.append(f"{col} IN ({', '.join('?' for _ in valor)})" if valor else "0")
+                params.extend(valor)
+            else:
+                conds.append(f"{col} = ?")
+                params.append(valor)
+        return f" WHERE {' AND '.join(conds)}", params
+
+    def _versao(self, conn, tabela):
+        row = conn.execute("SELECT versao FROM _versoes WHERE tabela = ?", (tabela,)).fetchone()
+        return row[0] if row else 0
+
+    def _incrementar_versao(self, conn, tabela):
+        conn.execute(
+            "INSERT INTO _versoes (tabela, versao) VALUES (?, 1) "
+            "ON CONFLICT(tabela) DO UPDATE SET versao = versao + 1",
+            (tabela,)
+        )
+        _invalidar_cache(f"{self.path_db}::{tabela}")
+
+    def _inserir_linhas(self, conn, tabela, df):
+        colunas = [c for c in self._colunas(tabela) if c in df.columns]
+        linhas = [
+            tuple(_valor_sql(v) for v in linha)
+            for linha in df[colunas].itertuples(index=False, name=None)
+        ]
+        marcadores = ", ".join("?" for _ in colunas)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {tabela} ({', '.join(colunas)}) VALUES ({marcadores})",
+            linhas
+        )
+
+    def assinatura(self, tabela):
+        return (self.path_db, self.versao(tabela))
+
+    def carregar(self, tabela, colunas):
+        with self._transacao() as conn:
+            versao = self._versao(conn, tabela)
+            return _ler_com_cache(
+                f"{self.path_db}::{tabela}",
+                versao,
+                lambda: pd.read_sql_query(f"SELECT * FROM {tabela}", conn)
+            )
+
+    @instrumentar("armazenamento.salvar", _linhas_gravadas)
+    def salvar(self, tabela, df, versao=None):
+        with self._escrita(tabela, versao) as conn:
+            conn.execute(f"DELETE FROM {tabela}")
+            self._inserir_linhas(conn, tabela, df)
+
+    def consultar(self, tabela, colunas, **filtros):
+        where, params = self._where(filtros)
+        with self._transacao() as conn:
+            return pd.read_sql_query(f"SELECT * FROM {tabela}{where}", conn, params=params)
+
+    def distintos(self, tabela, coluna):
+        with self._transacao() as conn:
+            rows = conn.execute(
+                f"SELECT DISTINCT {coluna} FROM {tabela} WHERE {coluna} IS NOT NULL ORDER BY {coluna}"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def proximo_id(self, tabela):
+        with self._transacao() as conn:
+            return self._proximo_id(conn, tabela)
+
+    def _proximo_id(self, conn, tabela):
+        row = conn.execute(f"SELECT MAX(id) FROM {tabela}").fetchone()
+        return 1 if row[0] is None else int(row[0]) + 1
+
+    @instrumentar("armazenamento.inserir", _linhas_gravadas)
+    def inserir(self, tabela, linhas, versao=None):
+        # linhas sem id recebem ids novos na mesma transação de escrita
+        with self._escrita(tabela, versao) as conn:
+            self._inserir_linhas(conn, tabela, _atribuir_ids(linhas, self._proximo_id(conn, tabela)))
+
+    @instrumentar("armazenamento.atualizar", _linhas_gravadas)
+    def atualizar(self, tabela, valores, versao=None, **filtros):
+        where, params = self._where(filtros)
+        sets = ", ".join(f"{col} = ?" for col in valores)
+        with self._escrita(tabela, versao) as conn:
+            conn.execute(
+                f"UPDATE {tabela} SET {sets}{where}",
+                [_valor_sql(v) for v in valores.values()] + params
+            )
+
+    @instrumentar("armazenamento.excluir", _linhas_gravadas)
+    def excluir(self, tabela, versao=None, **filtros):
+        where, params = self._where(filtros)
+        with self._escrita(tabela, versao) as conn:
+            conn.execute(f"DELETE FROM {tabela}{where}", params)
+
+    @instrumentar("armazenamento.substituir", _linhas_gravadas)
+    def substituir(self, tabela, linhas, versao=None, **filtros):
+        where, params = self._where(filtros)
+        with self._escrita(tabela, versao) as conn:
+            linhas = _atribuir_ids(linhas, self._proximo_id(conn, tabela))
+            conn.execute(f"DELETE FROM {tabela}{where}", params)
+            self._inserir_linhas(conn, tabela, linhas)
+
+    def compactar(self, tabela):
+        # escritas no SQLite já são por linha; não há journal para incorporar
+        pass
+
+
+_STORAGES = {}
+_STORAGES_LOCK = threading.Lock()
+
+
+def _criar_storage(backend):
+    # uma instância por backend no processo (as travas por tabela ficam nela)
+    with _STORAGES_LOCK:
+        if backend not in _STORAGES:
+            if backend == "csv":
+                _STORAGES[backend] = CsvStorage(DATA_DIR)
+            elif backend == "sqlite":
+                _STORAGES[backend] = SqliteStorage(PATH_DB, DATA_DIR)
+            elif backend in ("parquet", "feather"):
+                _STORAGES[backend] = ColunarStorage(DATA_DIR, backend)
+            else:
+                raise ValueError(f"Backend de armazenamento desconhecido: {backend}")
+            migrar_microarea_ids(_STORAGES[backend])
+        return _STORAGES[backend]
+
+
+def get_storage():
+    return _criar_storage(STORAGE_BACKEND)
+
+
+def compactar_tabelas():
+    storage = get_storage()
+    for tabela in SCHEMA_TABELAS:
+        storage.compactar(tabela)
+
+
+# Colunas do schema anterior com o nome da micro-área -> coluna do id que as
+# substitui (None: o vínculo usa a micro-área da atividade)
+_COLUNAS_NOME_MICROAREA = {
+    "atividades": ("microarea", "microarea_id"),
+    "colaboradores": ("microarea_principal", "microarea_principal_id"),
+    "colab_atividades": ("microarea", None),
+    "demanda_hh_atividade": ("microarea", "microarea_id"),
+    "demanda_hh_microarea": ("microarea", "microarea_id"),
+}
+
+
+def migrar_microarea_ids(storage):
+    """
+    Migração única do schema que copiava o nome da micro-área em cada tabela
+    para o que guarda microarea_id: cada tabela com a coluna antiga é regravada
+    com o id correspondente ao nome. Nomes referenciados e não cadastrados
+    viram micro-áreas novas, para a referência não se perder.
+    Só usa `storage` (roda na criação dele); sem tabelas antigas não grava nada.
+    Retorna as tabelas migradas.
+    """
+    # assinatura None: tabela ainda não criada (carregar a criaria vazia)
+    pendentes = [
+        t for t, (antiga, _) in _COLUNAS_NOME_MICROAREA.items()
+        if storage.assinatura(t) is not None and antiga in storage.carregar(t, []).columns
+    ]
+    if not pendentes:
+        return []
+
+    def nomes_referenciados():
+        nomes = [
+            storage.carregar(t, [])[_COLUNAS_NOME_MICROAREA[t][0]]
+            for t in ("atividades", "colaboradores") if t in pendentes
+        ]
+        nomes = pd.concat(nomes, ignore_index=True).astype(object) if nomes else pd.Series(dtype=object)
+        return nomes[nomes.notna() & (nomes.astype(str).str.strip() != "")].astype(str).unique()
+
+    def gravar_microareas():
+        versao = storage.versao("microareas")
+        microareas = storage.carregar("microareas", ["id", "nome", "descricao"])
+        novas = [n for n in nomes_referenciados() if n not in set(microareas["nome"].dropna().astype(str))]
+        if novas:
+            storage.inserir("microareas", pd.DataFrame({"nome": novas, "descricao": ""}), versao=versao)
+
+    com_retentativa(gravar_microareas)
+    microareas = storage.carregar("microareas", ["id", "nome"]).drop_duplicates(subset="nome")
+    ids = pd.Series(
+        pd.to_numeric(microareas["id"], errors="coerce").to_numpy(), index=microareas["nome"].astype(str)
+    )
+
+    for tabela in pendentes:
+        antiga, nova = _COLUNAS_NOME_MICROAREA[tabela]
+
+        def migrar():
+            versao = storage.versao(tabela)
+            df = storage.carregar(tabela, [])
+            if antiga not in df.columns:
+                return
+            df = df.copy()
+            if nova is not None:
+                migrados = df[antiga].astype(object).map(ids)
+                if nova in df.columns:
+                    df[nova] = _numerico(df[nova]).fillna(migrados)
+                else:
+                    df.insert(df.columns.get_loc(antiga), nova, migrados)
+            storage.salvar(tabela, df.drop(columns=antiga), versao=versao)
+
+        com_retentativa(migrar)
+
+    if isinstance(storage, SqliteStorage):
+        storage.descartar_colunas_obsoletas()
+    return pendentes
+
+
+# ---------------------------
+# Utilitários de dados
+# ---------------------------
+def _tabela(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _completar_colunas(df, columns):
+    for c in columns:
+        if c not in df.columns:
+            df[c] = None
+    return df[columns]
+
+
+@instrumentar()
+def load_csv(path, columns):
+    df = get_storage().carregar(_tabela(path), columns)
+    return _completar_colunas(df, columns)
+
+
+@instrumentar(linhas=_linhas_gravadas)
+def save_csv(path, df, versao=None):
+    get_storage().salvar(_tabela(path), df, versao=versao)
+
+
+def estatisticas_cache():
+    """
+    Contadores do cache de tabelas (hits, misses e tabelas em memória).
+    """
+    cache = _cache_tabelas()
+    return {
+        "hits": cache["hits"],
+        "misses": cache["misses"],
+        "tabelas": len(cache["tabelas"]),
+    }
+
+
+def new_id(df):
+    if df.empty or "id" not in df.columns:
+        return 1
+    return int(df["id"].max()) + 1
+
+
+def _numerico(serie):
+    # colunas já tipadas (SQLite/Parquet/Feather) dispensam a conversão
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    return pd.to_numeric(serie, errors="coerce")
+
+
+# tabela -> (coluna com o id, coluna com o nome da micro-área juntada na leitura);
+# o vínculo usa a micro-área da atividade
+NOMES_MICROAREA = {
+    "colaboradores": ("microarea_principal_id", "microarea_principal"),
+    "atividades": ("microarea_id", "microarea"),
+    "colab_atividades": ("atividade_id", "microarea"),
+    "demanda_hh_atividade": ("microarea_id", "microarea"),
+    "demanda_hh_microarea": ("microarea_id", "microarea"),
+}
+
+
+def juntar_microareas(tabela, df, microareas, atividades=None):
+    """
+    Acrescenta a `df` (de `tabela`, ver NOMES_MICROAREA) o nome da micro-área
+    referenciada pelo id; colab_atividades usa o de `atividades` (já juntada).
+    O nome não é gravado: renomear uma micro-área é atualizar só a linha dela,
+    e ids sem micro-área cadastrada ficam sem nome.
+    """
+    coluna_id, coluna = NOMES_MICROAREA[tabela]
+    origem, campo = (atividades, "microarea") if tabela == "colab_atividades" else (microareas, "nome")
+    origem = origem.drop_duplicates(subset="id")
+    nomes = pd.Series(origem[campo].to_numpy(), index=_numerico(origem["id"]).astype(float))
+    valores = _numerico(df[coluna_id]).astype(float).map(nomes)
+    if coluna in df.columns:
+        df[coluna] = valores
+    else:
+        df.insert(df.columns.get_loc(coluna_id) + 1, coluna, valores)
+    return df
+
+
+@instrumentar()
+def get_colaboradores():
+    cols = [
+        "id", "nome", "cargo", "carga_diaria",
+        "microarea_principal_id", "microareas_secundarias", "ativo"
+    ]
+    return juntar_microareas("colaboradores", _preparar_colaboradores(load_csv(PATH_COLAB, cols)), get_microareas())
+
+
+def _preparar_colaboradores(df):
+    if df.empty:
+        return df
+    df["carga_diaria"] = _numerico(df["carga_diaria"])
+    if isinstance(df["ativo"].dtype, pd.CategoricalDtype) and "sim" not in df["ativo"].cat.categories:
+        df["ativo"] = df["ativo"].cat.add_categories(["sim"])
+    df["ativo"] = df["ativo"].fillna("sim")
+    return df
+
+
+@instrumentar()
+def get_microareas():
+    return load_csv(PATH_MICRO, ["id", "nome", "descricao"])
+
+
+@instrumentar()
+def get_atividades():
+    cols = [
+        "id", "nome", "microarea_id", "categoria",
+        "responsavel_funcao", "hh_por_unidade", "fator_por_projeto"
+    ]
+    return juntar_microareas("atividades", _preparar_atividades(load_csv(PATH_ATIV, cols)), get_microareas())
+
+
+def _preparar_atividades(df):
+    if df.empty:
+        return df
+    df["hh_por_unidade"] = _numerico(df["hh_por_unidade"])
+    df["fator_por_projeto"] = _numerico(df["fator_por_projeto"])
+    df["hh_por_unidade"] = df["hh_por_unidade"].fillna(1.0)
+    df["fator_por_projeto"] = df["fator_por_projeto"].fillna(1.0)
+    return df
+
+
+@instrumentar()
+def get_demandas(periodo=None, **filtros):
+    """
+    Demandas de todos os períodos, ou só de `periodo` (um ou uma lista) e dos
+    demais filtros por coluna (consulta indexada no SQLite).
+    """
+    cols = ["id", "periodo", "atividade_id", "quantidade"]
+    if periodo is not None:
+        filtros["periodo"] = periodo
+    if not filtros:
+        df = load_csv(PATH_DEM, cols)
+    else:
+        df = _completar_colunas(get_storage().consultar("demandas", cols, **filtros), cols)
+    return _preparar_demandas(df)
+
+
+def _preparar_demandas(df):
+    if df.empty:
+        return df
+    df["quantidade"] = _numerico(df["quantidade"])
+    return df
+
+
+def listar_periodos():
+    return get_storage().distintos("demandas", "periodo")
+
+
+@instrumentar()
+def get_colab_atividades():
+    cols = ["id", "colab_id", "atividade_id", "percentual"]
+    return juntar_microareas(
+        "colab_atividades", _preparar_colab_atividades(load_csv(PATH_COLAB_ATIV, cols)), None, get_atividades()
+    )
+
+
+def _preparar_colab_atividades(df):
+    if df.empty:
+        return df
+    df["colab_id"] = _numerico(df["colab_id"])
+    df["atividade_id"] = _numerico(df["atividade_id"])
+    df["percentual"] = _numerico(df["percentual"])
+    return df
+
+# ---------------------------
+# Seed inicial de micro-áreas + atividades
+# ---------------------------
+def _ids_microareas():
+    # nome -> id das micro-áreas cadastradas (nome repetido: o primeiro)
+    microareas = get_microareas().drop_duplicates(subset="nome")
+    return pd.Series(_numerico(microareas["id"]).to_numpy(), index=microareas["nome"])
+
+
+def _ids_sequenciais(df, n):
+    inicio = new_id(df)
+    return np.arange(inicio, inicio + n)
+
+
+def seed_default_microareas_atividades(catalogo=None):
+    """
+    Cria/atualiza micro-áreas e atividades com base em DEFAULT_GRUPOS_ATIVIDADES
+    (ou em `catalogo`, no mesmo formato), usando tempo em minutos e fator em % por projeto.
+    - hh_por_unidade = minutos / 60
+    - fator_por_projeto = percentual / 100
+    Atividades já existentes são atualizadas por nome (join); as novas entram
+    num único bloco com ids sequenciais.
+    Cada tabela é lida e gravada com a versão lida (com_retentativa), então
+    gravações simultâneas de outras sessões não se perdem.
+    Retorna (microareas, atividades) atualizadas.
+    """
+    if catalogo is None:
+        catalogo = DEFAULT_GRUPOS_ATIVIDADES
+
+    padrao = pd.DataFrame(catalogo, columns=["microarea", "nome", "minutos", "percentual"])
+    padrao["hh_por_unidade"] = padrao["minutos"].astype(float) / 60.0
+    padrao["fator_por_projeto"] = padrao["percentual"].astype(float) / 100.0   # 100% -> 1.0; 5% -> 0.05
+    storage = get_storage()
+
+    # Micro-áreas
+    def gravar_microareas():
+        versao = storage.versao("microareas")
+        microareas = get_microareas()
+        grupos = padrao["microarea"].drop_duplicates()
+        grupos = grupos[(grupos.fillna("") != "") & ~grupos.isin(microareas["nome"].dropna())]
+        if not grupos.empty:
+            storage.inserir(
+                "microareas",
+                pd.DataFrame({"nome": grupos.to_numpy(), "descricao": ""}),
+                versao=versao
+            )
+
+    com_retentativa(gravar_microareas)
+
+    # Atividades (micro-área pelo id do nome do catálogo)
+    padrao["microarea_id"] = padrao["microarea"].map(_ids_microareas())
+
+    def gravar_atividades():
+        versao = storage.versao("atividades")
+        atividades = _aplicar_catalogo(get_atividades(), padrao)
+        storage.salvar("atividades", atividades, versao=versao)
+
+    com_retentativa(gravar_atividades)
+    return get_microareas(), get_atividades()
+
+
+def _aplicar_catalogo(atividades, padrao):
+    """
+    Atualiza por nome as atividades existentes e acrescenta as novas do catálogo.
+    """
+    existe = padrao["nome"].isin(atividades["nome"].dropna())
+
+    # Atualização por nome: em nomes repetidos no catálogo vale a última linha
+    atualiz = padrao[existe].drop_duplicates(subset="nome", keep="last").set_index("nome")
+    if not atualiz.empty:
+        mask = atividades["nome"].isin(atualiz.index)
+        nomes = atividades.loc[mask, "nome"]
+        for col in ["microarea_id", "hh_por_unidade", "fator_por_projeto"]:
+            _atribuir(atividades, mask, col, nomes.map(atualiz[col]).to_numpy())
+
+    novas = padrao[~existe]
+    if not novas.empty:
+        novas_ativ = pd.DataFrame({
+            "id": _ids_sequenciais(atividades, len(novas)),
+            "nome": novas["nome"].to_numpy(),
+            "microarea_id": novas["microarea_id"].to_numpy(),
+            "categoria": "",
+            "responsavel_funcao": "",
+            "hh_por_unidade": novas["hh_por_unidade"].to_numpy(),
+            "fator_por_projeto": novas["fator_por_projeto"].to_numpy(),
+        })
+        atividades = pd.concat([atividades, novas_ativ], ignore_index=True)
+
+    return atividades
+
+# ---------------------------
+# Seed de colaboradores padrão
+# ---------------------------
+def seed_default_colaboradores(lista=None):
+    """
+    Cria colaboradores padrão com base em DEFAULT_COLABS (ou em `lista`,
+    no mesmo formato). Não duplica nomes já existentes.
+    Retorna os colaboradores atualizados.
+    """
+    if lista is None:
+        lista = DEFAULT_COLABS
+    storage = get_storage()
+
+    def gravar():
+        versao = storage.versao("colaboradores")
+        colabs = get_colaboradores()
+        padrao = pd.DataFrame(lista, columns=["cargo", "microarea_principal", "nome"])
+        padrao = padrao[~padrao["nome"].isin(colabs["nome"].dropna())]
+        padrao = padrao.drop_duplicates(subset="nome", keep="first")
+
+        if not padrao.empty:
+            storage.inserir("colaboradores", pd.DataFrame({
+                "nome": padrao["nome"].to_numpy(),
+                "cargo": padrao["cargo"].to_numpy(),
+                "carga_diaria": padrao["cargo"].map(carga_diaria_cargo).to_numpy(dtype=float),
+                "microarea_principal_id": padrao["microarea_principal"].map(_ids_microareas()).to_numpy(),
+                "microareas_secundarias": "",
+                "ativo": "sim",
+            }), versao=versao)
+
+    com_retentativa(gravar)
+    return get_colaboradores()
+
+# ---------------------------
+# Cálculos de capacidade e alocação
+# ---------------------------
+@instrumentar()
+def calcular_capacidades(colabs, dias_uteis):
+    """
+    capacidade_diaria = carga_diaria
+    capacidade_mensal = capacidade_diaria * dias_uteis
+    """
+    df = colabs.copy()
+    df["capacidade_diaria"] = df["carga_diaria"].fillna(0)
+    df["capacidade_mensal"] = df["capacidade_diaria"] * dias_uteis
+    return df[[
+        "id", "nome", "cargo", "microarea_principal_id", "microarea_principal",
+        "capacidade_diaria", "capacidade_mensal"
+    ]]
+
+
+def calcular_pesos_vinculos(colab_ativ):
+    """
+    Normaliza os percentuais dos vínculos por atividade.
+    Retorna (atividade_id, colab_id, frac), com frac somando 1 em cada atividade.
+    Se os percentuais de uma atividade somam zero, divide igualmente.
+    """
+    if colab_ativ.empty:
+        return pd.DataFrame(columns=["atividade_id", "colab_id", "frac"])
+
+    ca = colab_ativ.dropna(subset=["colab_id", "atividade_id"])
+    pesos = pd.DataFrame({
+        "atividade_id": ca["atividade_id"].astype(int),
+        "colab_id": ca["colab_id"].astype(int),
+        "peso": ca["percentual"].fillna(0).astype(float),
+    })
+
+    por_ativ = pesos.groupby("atividade_id")["peso"]
+    soma = por_ativ.transform("sum")
+    qtd = por_ativ.transform("size")
+
+    pesos["frac"] = (pesos["peso"] / soma.where(soma != 0)).fillna(1.0 / qtd)
+    return pesos[["atividade_id", "colab_id", "frac"]].reset_index(drop=True)
+
+
+def montar_matriz_pesos(colab_ativ):
+    """
+    Pesos de calcular_pesos_vinculos como matriz esparsa atividade x colaborador
+    (formato COO). Retorna um dict de arrays:
+    - atividades / colaboradores: id de cada linha / coluna (ordenados)
+    - linhas / colunas / valores: posição e fração de cada vínculo
+    """
+    pesos = calcular_pesos_vinculos(colab_ativ)
+    ids_ativ = pesos["atividade_id"].to_numpy(dtype=np.int64)
+    ids_colab = pesos["colab_id"].to_numpy(dtype=np.int64)
+    atividades = np.unique(ids_ativ)
+    colaboradores = np.unique(ids_colab)
+    return {
+        "atividades": atividades,
+        "colaboradores": colaboradores,
+        "linhas": np.searchsorted(atividades, ids_ativ),
+        "colunas": np.searchsorted(colaboradores, ids_colab),
+        "valores": pesos["frac"].to_numpy(dtype=float),
+    }
+
+
+def _ler_ou_montar_pesos(assinatura):
+    try:
+        with np.load(PATH_PESOS) as dados:
+            if str(dados["assinatura"]) == assinatura:
+                registrar_bytes(os.path.getsize(PATH_PESOS))
+                return {k: dados[k] for k in dados.files if k != "assinatura"}
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass
+
+    matriz = montar_matriz_pesos(get_colab_atividades())
+    tmp = PATH_PESOS + ".tmp.npz"
+    np.savez(tmp, assinatura=np.array(assinatura), **matriz)
+    registrar_bytes(os.path.getsize(tmp))
+    os.replace(tmp, PATH_PESOS)
+    return matriz
+
+
+@instrumentar()
+def get_matriz_pesos():
+    """
+    Matriz de pesos dos vínculos, guardada em memória e em PATH_PESOS junto com
+    a assinatura de colab_atividades: só é remontada quando os vínculos mudam.
+    """
+    assinatura = json.dumps(get_storage().assinatura("colab_atividades"))
+    return _ler_com_cache("pesos_vinculos", assinatura, lambda: _ler_ou_montar_pesos(assinatura))
+
+
+def _demanda_hh(demandas, atividades):
+    dem_ativ = demandas.merge(
+        atividades,
+        left_on="atividade_id",
+        right_on="id",
+        suffixes=("_dem", "_ativ")
+    )
+    dem_ativ["hh_total_atividade"] = dem_ativ["quantidade"] * dem_ativ["hh_por_unidade"]
+    return dem_ativ
+
+
+def _agregar_microarea(dem_ativ, chaves):
+    # agrupado pelo id; o nome (quando dem_ativ o tem) acompanha o grupo
+    agregacoes = {"hh_necessarias": ("hh_total_atividade", "sum")}
+    if "microarea" in dem_ativ.columns:
+        agregacoes = {"microarea": ("microarea", "first"), **agregacoes}
+    return dem_ativ.groupby(chaves + ["microarea_id"], as_index=False, observed=True).agg(**agregacoes)
+
+
+def _selecionar_demanda(demandas, atividades, periodos=None):
+    """
+    (dem_ativ, dem_micro) dos `periodos` (todos, se None). Com os agregados de
+    get_demanda_hh é só uma filtragem; com o DataFrame de demandas faz o merge
+    com atividades e dem_micro fica None (agregado depois, se preciso).
+    """
+    if isinstance(demandas, dict):
+        dem_ativ, dem_micro = demandas["por_atividade"], demandas["por_microarea"]
+        if periodos is not None:
+            dem_ativ = dem_ativ[dem_ativ["periodo"].isin(periodos)]
+            dem_micro = dem_micro[dem_micro["periodo"].isin(periodos)]
+        return dem_ativ, dem_micro
+
+    dem = demandas.dropna(subset=["periodo"])
+    if periodos is not None:
+        dem = dem[dem["periodo"].isin(periodos)]
+    return _demanda_hh(dem, atividades), None
+
+
+def _distribuir_hh(dem_ativ, pesos, chaves):
+    """
+    hh por colaborador dentro de `chaves` (ex.: ["periodo"]): para cada grupo,
+    produto da matriz esparsa de pesos pelo vetor de hh por atividade, feito
+    para todos os grupos num único np.bincount.
+    `pesos` é a matriz de montar_matriz_pesos ou o DataFrame de vínculos.
+    """
+    vazio = pd.DataFrame(columns=chaves + ["id_colaborador", "hh_alocadas"])
+    if isinstance(pesos, pd.DataFrame):
+        pesos = montar_matriz_pesos(pesos)
+
+    hh_ativ = dem_ativ.groupby(chaves + ["atividade_id"], as_index=False, observed=True)["hh_total_atividade"].sum()
+    linha = pd.Index(pesos["atividades"]).get_indexer(hh_ativ["atividade_id"].astype(np.int64))
+    hh_ativ = hh_ativ[linha >= 0]
+    linha = linha[linha >= 0]
+    if hh_ativ.empty or len(pesos["valores"]) == 0:
+        return vazio
+
+    if chaves:
+        por_grupo = hh_ativ.groupby(chaves, observed=True, sort=True)
+        grupo = por_grupo.ngroup().to_numpy()
+        grupos = por_grupo.size().index.to_frame(index=False)
+    else:
+        grupo = np.zeros(len(hh_ativ), dtype=np.int64)
+        grupos = pd.DataFrame(index=[0])
+
+    n_grupos, n_ativ, n_colab = len(grupos), len(pesos["atividades"]), len(pesos["colaboradores"])
+    hh = np.zeros((n_grupos, n_ativ))
+    hh[grupo, linha] = hh_ativ["hh_total_atividade"].to_numpy(dtype=float)
+    # atividades com demanda no grupo (mesmo com hh 0): definem quem aparece no resultado
+    com_demanda = np.zeros((n_grupos, n_ativ))
+    com_demanda[grupo, linha] = 1.0
+
+    destino = (np.arange(n_grupos)[:, None] * n_colab + pesos["colunas"]).ravel()
+    total = n_grupos * n_colab
+    hh_colab = np.bincount(
+        destino, weights=(hh[:, pesos["linhas"]] * pesos["valores"]).ravel(), minlength=total
+    ).reshape(n_grupos, n_colab)
+    alocado = np.bincount(
+        destino, weights=com_demanda[:, pesos["linhas"]].ravel(), minlength=total
+    ).reshape(n_grupos, n_colab) > 0
+
+    g, c = np.nonzero(alocado)
+    df = grupos.iloc[g][chaves].reset_index(drop=True)
+    df["id_colaborador"] = pesos["colaboradores"][c]
+    df["hh_alocadas"] = hh_colab[g, c]
+    return df
+
+
+def _demanda_x_capacidade(dem_ativ, colabs, dias_uteis, chaves, dem_micro=None):
+    # dem_micro: hh_necessarias por chaves x microarea já agregado (get_demanda_hh)
+    if dem_micro is None:
+        dem_micro = _agregar_microarea(dem_ativ, chaves)
+    dem_micro = dem_micro[chaves + ["microarea_id", "microarea", "hh_necessarias"]]
+
+    # junção pelo id inteiro da micro-área (o nome só aparece no resultado)
+    caps = calcular_capacidades(colabs, dias_uteis)
+    cap_micro = caps["capacidade_mensal"].groupby(_numerico(caps["microarea_principal_id"]).astype(float)).sum()
+
+    df_micro = dem_micro.assign(
+        capacidade_mensal=_numerico(dem_micro["microarea_id"]).astype(float).map(cap_micro).fillna(0).to_numpy()
+    )
+    df_micro["saldo"] = df_micro["capacidade_mensal"] - df_micro["hh_necessarias"]
+    return df_micro[chaves + ["microarea", "hh_necessarias", "capacidade_mensal", "saldo"]]
+
+
+@instrumentar()
+def calcular_alocacoes(colabs, microareas, atividades, demandas, colab_ativ, periodo, dias_uteis):
+    """
+    Usa demandas (quantidade por atividade) + hh_por_unidade das atividades
+    e distribui horas entre colaboradores de acordo com percentuais.
+    Também calcula demanda x capacidade por micro-área (mensal).
+    colab_ativ pode ser o DataFrame de vínculos ou get_matriz_pesos().
+    demandas pode ser o DataFrame de demandas ou get_demanda_hh() (agregados
+    materializados, que dispensam o merge com atividades e os groupbys).
+    """
+    dem_ativ, dem_micro = _selecionar_demanda(demandas, atividades, [periodo])
+    if dem_ativ.empty:
+        return (
+            pd.DataFrame(columns=["id_colaborador", "hh_alocadas"]),
+            pd.DataFrame(columns=["microarea", "hh_necessarias", "capacidade_mensal", "saldo"])
+        )
+
+    df_aloc = _distribuir_hh(dem_ativ, colab_ativ, [])
+    df_micro = _demanda_x_capacidade(dem_ativ, colabs, dias_uteis, [], dem_micro)
+    return df_aloc, df_micro
+
+
+@instrumentar()
+def calcular_alocacoes_lote(colabs, atividades, demandas, colab_ativ, dias_uteis):
+    """
+    Mesmo cálculo de calcular_alocacoes para todos os períodos de uma vez
+    (um único merge + groupby por período).
+    Retorna:
+    - df_micro: periodo x microarea (hh_necessarias, capacidade_mensal, saldo)
+    - df_colab: periodo x colaborador (capacidade_mensal, hh_alocadas, utilizacao_%)
+    demandas pode ser o DataFrame de demandas ou get_demanda_hh().
+    """
+    dem_ativ, dem_micro = _selecionar_demanda(demandas, atividades)
+    if dem_ativ.empty:
+        return (
+            pd.DataFrame(columns=["periodo", "microarea", "hh_necessarias", "capacidade_mensal", "saldo"]),
+            pd.DataFrame(columns=[
+                "periodo", "id", "nome", "cargo", "microarea_principal",
+                "capacidade_mensal", "hh_alocadas", "utilizacao_%"
+            ])
+        )
+
+    df_aloc = _distribuir_hh(dem_ativ, colab_ativ, ["periodo"])
+    df_micro = _demanda_x_capacidade(dem_ativ, colabs, dias_uteis, ["periodo"], dem_micro)
+
+    periodos = pd.DataFrame({"periodo": sorted(dem_ativ["periodo"].unique())})
+    caps = calcular_capacidades(colabs, dias_uteis)
+    df_colab = periodos.merge(caps, how="cross").merge(
+        df_aloc,
+        left_on=["periodo", "id"],
+        right_on=["periodo", "id_colaborador"],
+        how="left"
+    )
+    df_colab["hh_alocadas"] = df_colab["hh_alocadas"].fillna(0.0)
+    df_colab["utilizacao_%"] = (
+        df_colab["hh_alocadas"] / df_colab["capacidade_mensal"].replace(0, pd.NA)
+    ) * 100
+    df_colab["utilizacao_%"] = df_colab["utilizacao_%"].astype(float).round(1)
+
+    df_colab = df_colab[[
+        "periodo", "id", "nome", "cargo", "microarea_principal",
+        "capacidade_mensal", "hh_alocadas", "utilizacao_%"
+    ]]
+    return df_micro, df_colab
+
+# ---------------------------
+# Agregados de demanda por período (materializados)
+# ---------------------------
+# demanda_hh_atividade (periodo x atividade) e demanda_hh_microarea
+# (periodo x micro-área) guardam o hh de demandas x atividades. O carimbo
+# registra as versões das tabelas de origem e dos próprios agregados com que
+# foram gravados; se alguma mudou por outro caminho (seed, CLI, outro
+# processo), a próxima leitura reconstrói tudo.
+PATH_CARIMBO_AGREGADOS = os.path.join(DATA_DIR, "agregados_demanda.json")
+TABELAS_AGREGADOS = ("demanda_hh_atividade", "demanda_hh_microarea")
+ORIGENS_AGREGADOS = ("demandas", "atividades")
+
+
+def _versoes_agregados(storage):
+    # o backend entra no carimbo: CSVs e Parquet podem dividir o diretório
+    versoes = {t: storage.versao(t) for t in ORIGENS_AGREGADOS + TABELAS_AGREGADOS}
+    versoes["armazenamento"] = type(storage).__name__ + getattr(storage, "formato", "")
+    return versoes
+
+
+def _ler_carimbo_agregados():
+    try:
+        with open(PATH_CARIMBO_AGREGADOS, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_carimbo_agregados(versoes):
+    # nome temporário por thread: o carimbo é gravado fora das travas de tabela
+    tmp = f"{PATH_CARIMBO_AGREGADOS}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(versoes, f)
+    os.replace(tmp, PATH_CARIMBO_AGREGADOS)
+
+
+def agregar_demanda(demandas, atividades):
+    """
+    Agregados de demandas x atividades:
+    - por_atividade: periodo x atividade_id (microarea_id, microarea, hh_total_atividade)
+    - por_microarea: periodo x microarea_id (microarea, hh_necessarias)
+    Os nomes das micro-áreas não são gravados nos agregados.
+    """
+    dem_ativ, _ = _selecionar_demanda(demandas, atividades)
+    por_atividade = dem_ativ.groupby(
+        ["periodo", "atividade_id"], as_index=False, observed=True
+    ).agg(
+        microarea_id=("microarea_id", "first"), microarea=("microarea", "first"),
+        hh_total_atividade=("hh_total_atividade", "sum"),
+    )
+    return {
+        "por_atividade": por_atividade,
+        "por_microarea": _agregar_microarea(por_atividade, ["periodo"]),
+    }
+
+
+def _reconstruir_agregados(storage, versoes):
+    agregados = agregar_demanda(get_demandas(), get_atividades())
+    try:
+        for tabela, chave in zip(TABELAS_AGREGADOS, ("por_atividade", "por_microarea")):
+            storage.salvar(tabela, _atribuir_ids(agregados[chave], 1), versao=versoes[tabela])
+            versoes[tabela] += 1
+    except ConflitoVersao:
+        # outra sessão gravou os agregados no meio; fica para a próxima leitura
+        return agregados
+    _gravar_carimbo_agregados(versoes)
+    return agregados
+
+
+@instrumentar()
+def get_demanda_hh(periodos=None):
+    """
+    Agregados materializados ({"por_atividade", "por_microarea"}, como em
+    agregar_demanda) de todos os períodos ou só de `periodos`. Servem de
+    `demandas` para calcular_alocacoes/calcular_alocacoes_lote.
+    """
+    storage = get_storage()
+    # versões lidas antes dos dados: se algo mudar no meio, o carimbo fica velho
+    versoes = _versoes_agregados(storage)
+    if _ler_carimbo_agregados() == versoes:
+        agregados = {
+            "por_atividade": load_csv(PATH_DEMANDA_HH_ATIV, [c for c, _ in SCHEMA_TABELAS["demanda_hh_atividade"]]),
+            "por_microarea": load_csv(PATH_DEMANDA_HH_MICRO, [c for c, _ in SCHEMA_TABELAS["demanda_hh_microarea"]]),
+        }
+        agregados["por_atividade"]["atividade_id"] = _numerico(agregados["por_atividade"]["atividade_id"])
+        microareas = get_microareas()
+        for chave, col in (("por_atividade", "hh_total_atividade"), ("por_microarea", "hh_necessarias")):
+            agregados[chave][col] = _numerico(agregados[chave][col])
+        for chave, tabela in zip(("por_atividade", "por_microarea"), TABELAS_AGREGADOS):
+            agregados[chave] = juntar_microareas(tabela, agregados[chave], microareas)
+    else:
+        agregados = _reconstruir_agregados(storage, versoes)
+
+    if periodos is not None:
+        agregados = {k: df[df["periodo"].isin(periodos)] for k, df in agregados.items()}
+    return agregados
+
+
+def _atualizar_agregados(storage, versoes, periodos, atividade_ids):
+    # refaz só as linhas dos períodos / atividades afetados, com as versões esperadas
+    cols_ativ = [c for c, _ in SCHEMA_TABELAS["demanda_hh_atividade"]]
+    periodos_micro = set(periodos)
+    if periodos:
+        linhas = agregar_demanda(get_demandas(list(periodos)), get_atividades())["por_atividade"]
+        storage.substituir(
+            "demanda_hh_atividade", linhas, versao=versoes["demanda_hh_atividade"], periodo=list(periodos)
+        )
+        versoes["demanda_hh_atividade"] += 1
+    if atividade_ids:
+        antigas = storage.consultar("demanda_hh_atividade", cols_ativ, atividade_id=list(atividade_ids))
+        linhas = agregar_demanda(get_demandas(atividade_id=list(atividade_ids)), get_atividades())["por_atividade"]
+        storage.substituir(
+            "demanda_hh_atividade", linhas, versao=versoes["demanda_hh_atividade"],
+            atividade_id=list(atividade_ids)
+        )
+        versoes["demanda_hh_atividade"] += 1
+        periodos_micro |= set(antigas["periodo"].dropna()) | set(linhas["periodo"])
+    if periodos_micro:
+        periodos_micro = sorted(periodos_micro)
+        por_ativ = storage.consultar("demanda_hh_atividade", cols_ativ, periodo=periodos_micro)
+        storage.substituir(
+            "demanda_hh_microarea", _agregar_microarea(_completar_colunas(por_ativ, cols_ativ), ["periodo"]),
+            versao=versoes["demanda_hh_microarea"], periodo=periodos_micro
+        )
+        versoes["demanda_hh_microarea"] += 1
+    _gravar_carimbo_agregados(versoes)
+
+
+def escrever_com_agregados(origens, escrita):
+    """
+    Executa escrita(versoes), que grava uma vez em cada tabela de `origens`
+    (demandas e/ou atividades) com versao=versoes[tabela] e retorna
+    (periodos, atividade_ids) afetados, repetindo em caso de conflito.
+    Se os agregados estavam em dia antes da escrita, atualiza só as linhas
+    afetadas; senão ficam para a reconstrução na próxima leitura.
+    """
+    storage = get_storage()
+    estado = {}
+
+    def operacao():
+        estado["versoes"] = _versoes_agregados(storage)
+        return escrita(dict(estado["versoes"]))
+
+    periodos, atividade_ids = com_retentativa(operacao)
+    antes = estado["versoes"]
+    if _ler_carimbo_agregados() != antes:
+        return
+    versoes = dict(antes, **{t: antes[t] + 1 for t in origens})
+    try:
+        _atualizar_agregados(storage, versoes, periodos, atividade_ids)
+    except ConflitoVersao:
+        pass
+
+
+def gravar_demandas(linhas, periodos):
+    """
+    Substitui as demandas dos `periodos` por `linhas` (sem id: o storage atribui).
+    """
+    periodos = list(periodos)
+
+    def escrita(versoes):
+        get_storage().substituir("demandas", linhas, versao=versoes["demandas"], periodo=periodos)
+        return periodos, []
+    escrever_com_agregados(("demandas",), escrita)
+
+
+def excluir_demandas(periodos):
+    periodos = list(periodos)
+
+    def escrita(versoes):
+        get_storage().excluir("demandas", versao=versoes["demandas"], periodo=periodos)
+        return periodos, []
+    escrever_com_agregados(("demandas",), escrita)
+
+
+def inserir_atividades(linhas):
+    # atividades novas não têm demandas: os agregados só ganham o carimbo novo
+    def escrita(versoes):
+        get_storage().inserir("atividades", linhas, versao=versoes["atividades"])
+        return [], []
+    escrever_com_agregados(("atividades",), escrita)
+
+
+def atualizar_atividades(valores, **filtros):
+    """
+    storage.atualizar("atividades", valores, **filtros) refazendo os agregados
+    das atividades alteradas (hh_por_unidade e microarea mudam o hh).
+    """
+    def escrita(versoes):
+        storage = get_storage()
+        ids = storage.consultar("atividades", ["id"], **filtros)["id"].tolist()
+        storage.atualizar("atividades", valores, versao=versoes["atividades"], **filtros)
+        return [], ids
+    escrever_com_agregados(("atividades",), escrita)
+
+
+def excluir_atividade(atividade_id):
+    """
+    Exclui a atividade com suas demandas e vínculos.
+    """
+    def escrita(versoes):
+        storage = get_storage()
+        storage.excluir("demandas", versao=versoes["demandas"], atividade_id=atividade_id)
+        storage.excluir("colab_atividades", atividade_id=atividade_id)
+        storage.excluir("atividades", versao=versoes["atividades"], id=atividade_id)
+        return [], [atividade_id]
+    escrever_com_agregados(("demandas", "atividades"), escrita)
+
+# ---------------------------
+# Repositório da sessão
+# ---------------------------
+# tabela -> (carregar, preparar); preparar refaz tipos e padrões de uma
+# tabela alterada em memória, como na leitura
+TABELAS_REPOSITORIO = {
+    "colaboradores": (get_colaboradores, _preparar_colaboradores),
+    "microareas": (get_microareas, lambda df: df),
+    "atividades": (get_atividades, _preparar_atividades),
+    "demandas": (get_demandas, _preparar_demandas),
+    "colab_atividades": (get_colab_atividades, _preparar_colab_atividades),
+}
+
+# tabelas cujos nomes de micro-área (juntar_microareas) vêm de outras tabelas
+# do repositório: renomear uma micro-área só refaz a junção em memória
+DEPENDENCIAS_REPOSITORIO = {
+    "colaboradores": ("microareas",),
+    "atividades": ("microareas",),
+    "colab_atividades": ("atividades", "microareas"),
+}
+
+# com copy-on-write (padrão no pandas 3) uma cópia rasa não divide escritas
+# com a original; sem ele a visão entregue às telas precisa ser uma cópia
+_COPIA_RASA_ISOLADA = int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+class Repositorio:
+    """
+    As tabelas de TABELAS_REPOSITORIO em memória, para uma sessão.
+    tabela(nome) devolve uma visão somente leitura (alterá-la não altera o
+    repositório) e só relê do storage a tabela cuja versão mudou por outro
+    caminho (outra sessão, seed, CLI).
+    As escritas vão para o storage (atividades e demandas pelas funções que
+    mantêm os agregados) e são aplicadas na tabela em memória quando a versão
+    no storage avançou só com elas; senão a tabela é relida na próxima leitura.
+    Índices hash por coluna (indice, linha, ids) ficam junto da tabela e são
+    refeitos, sob demanda, só quando ela muda.
+    Os nomes das micro-áreas são juntados de novo quando muda uma tabela de
+    DEPENDENCIAS_REPOSITORIO, sem reler a tabela que os usa.
+    """
+
+    def __init__(self):
+        self._tabelas = {}
+        self._lock = threading.RLock()
+
+    def _atual(self, tabela):
+        """
+        (versao, df, indices, versoes das dependências com que df foi juntada).
+        """
+        versao = get_storage().versao(tabela)
+        with self._lock:
+            atual = self._tabelas.get(tabela)
+            if atual is None or atual[0] != versao:
+                # versão lida antes dos dados: uma escrita no meio deixa dados mais
+                # novos que a versão, e a próxima leitura (ou escrita) recarrega
+                atual = (versao, TABELAS_REPOSITORIO[tabela][0](), {}, None)
+            dependencias = {d: self._atual(d) for d in DEPENDENCIAS_REPOSITORIO.get(tabela, ())}
+            juntada = tuple(d[0] for d in dependencias.values())
+            if atual[3] != juntada:
+                df = atual[1]
+                if dependencias:
+                    df = juntar_microareas(
+                        tabela, df, *(dependencias.get(d, (None, None))[1] for d in ("microareas", "atividades"))
+                    )
+                atual = (atual[0], df, {}, juntada)
+            self._tabelas[tabela] = atual
+            return atual
+
+    def tabela(self, tabela):
+        return self._atual(tabela)[1].copy(deep=not _COPIA_RASA_ISOLADA)
+
+    def versao(self, tabela):
+        """
+        Versão da tabela como está em memória (a da última tabela(nome)).
+        Passada como versao=... numa escrita, a escrita falha com ConflitoVersao
+        se outra sessão gravou na tabela desde então.
+        """
+        with self._lock:
+            atual = self._tabelas.get(tabela)
+        return (atual or self._atual(tabela))[0]
+
+    def _gravar(self, operacoes, escrita):
+        """
+        Executa escrita() e aplica nas tabelas em memória as `operacoes`
+        ({tabela: [entrada do journal ou função(df) -> entrada]}) que ela gravou,
+        uma versão por entrada.
+        """
+        with self._lock:
+            antes = {t: self._tabelas.pop(t) for t in operacoes if t in self._tabelas}
+            escrita()
+            storage = get_storage()
+            for tabela, (versao, df, _, _) in antes.items():
+                entradas = operacoes[tabela]
+                if storage.versao(tabela) != versao + len(entradas):
+                    continue
+                for entrada in entradas:
+                    df = _aplicar_journal(df, [entrada(df) if callable(entrada) else entrada])
+                # linhas novas chegam sem os nomes das micro-áreas: junção refeita na leitura
+                self._tabelas[tabela] = (versao + len(entradas), TABELAS_REPOSITORIO[tabela][1](df), {}, None)
+
+    def _indice(self, tabela, coluna):
+        with self._lock:
+            _, df, indices, _ = self._atual(tabela)
+            if coluna not in indices:
+                valores = df[coluna]
+                # valor repetido aponta para a primeira linha, como .iloc[0] de um filtro
+                unicos = valores.notna().to_numpy() & ~valores.duplicated().to_numpy()
+                indices[coluna] = dict(zip(valores[unicos].tolist(), np.flatnonzero(unicos).tolist()))
+            return df, indices[coluna]
+
+    def indice(self, tabela, coluna):
+        """
+        {valor de `coluna`: posição da linha} da tabela como tabela(nome) a devolve.
+        """
+        return self._indice(tabela, coluna)[1]
+
+    def linha(self, tabela, valor, coluna="id"):
+        """
+        Linha (Series) com coluna == valor, ou None; O(1) em vez de filtrar a tabela.
+        """
+        df, indice = self._indice(tabela, coluna)
+        posicao = indice.get(valor)
+        return None if posicao is None else df.iloc[posicao]
+
+    def ids(self, tabela, valores, coluna="nome"):
+        """
+        ids das linhas com coluna == cada um de `valores` (KeyError se algum não existe).
+        """
+        df, indice = self._indice(tabela, coluna)
+        ids = df["id"].to_numpy()
+        return [ids[indice[v]] for v in valores]
+
+    # ids novos: com a versão conferida, a tabela em memória é a que o storage
+    # tinha na escrita, então new_id dela dá os mesmos ids que ele atribuiu
+    def inserir(self, tabela, linhas, versao=None):
+        self._gravar(
+            {tabela: [lambda df: _entrada_journal("inserir", linhas, new_id(df))]},
+            lambda: get_storage().inserir(tabela, linhas, versao=versao),
+        )
+
+    def atualizar(self, tabela, valores, versao=None, **filtros):
+        self._gravar(
+            {tabela: [_entrada_journal("atualizar", valores=valores, filtros=filtros)]},
+            lambda: get_storage().atualizar(tabela, valores, versao=versao, **filtros),
+        )
+
+    def excluir(self, tabela, versao=None, **filtros):
+        self._gravar(
+            {tabela: [_entrada_journal("excluir", filtros=filtros)]},
+            lambda: get_storage().excluir(tabela, versao=versao, **filtros),
+        )
+
+    def substituir(self, tabela, linhas, versao=None, **filtros):
+        self._gravar(
+            {tabela: [lambda df: _entrada_journal("substituir", linhas, new_id(df), filtros=filtros)]},
+            lambda: get_storage().substituir(tabela, linhas, versao=versao, **filtros),
+        )
+
+    def gravar_demandas(self, linhas, periodos):
+        periodos = list(periodos)
+        self._gravar(
+            {"demandas": [lambda df: _entrada_journal(
+                "substituir", linhas, new_id(df), filtros={"periodo": periodos}
+            )]},
+            lambda: gravar_demandas(linhas, periodos),
+        )
+
+    def excluir_demandas(self, periodos):
+        periodos = list(periodos)
+        self._gravar(
+            {"demandas": [_entrada_journal("excluir", filtros={"periodo": periodos})]},
+            lambda: excluir_demandas(periodos),
+        )
+
+    def inserir_atividades(self, linhas):
+        self._gravar(
+            {"atividades": [lambda df: _entrada_journal("inserir", linhas, new_id(df))]},
+            lambda: inserir_atividades(linhas),
+        )
+
+    def atualizar_atividades(self, valores, **filtros):
+        self._gravar(
+            {"atividades": [_entrada_journal("atualizar", valores=valores, filtros=filtros)]},
+            lambda: atualizar_atividades(valores, **filtros),
+        )
+
+    def excluir_atividade(self, atividade_id):
+        self._gravar({
+            "demandas": [_entrada_journal("excluir", filtros={"atividade_id": atividade_id})],
+            "colab_atividades": [_entrada_journal("excluir", filtros={"atividade_id": atividade_id})],
+            "atividades": [_entrada_journal("excluir", filtros={"id": atividade_id})],
+        }, lambda: excluir_atividade(atividade_id))
+
+# ---------------------------
+# Importação em lote (CSV / Excel)
+# ---------------------------
+LINHAS_POR_BLOCO_IMPORTACAO = 50_000
+
+# Colunas aceitas por tabela; as de ids/nomes alternativos ("x ou x_id") e as
+# opcionais estão na docstring de cada validador
+COLUNAS_IMPORTACAO = {
+    "colaboradores": ["nome", "cargo", "carga_diaria", "microarea_principal", "microareas_secundarias", "ativo"],
+    "atividades": ["nome", "microarea", "categoria", "responsavel_funcao", "minutos", "percentual"],
+    "colab_atividades": ["colaborador", "atividade", "percentual"],
+    "demandas": ["periodo", "atividade", "quantidade"],
+}
+
+# colunas obrigatórias; numa tupla, basta uma das alternativas
+_OBRIGATORIAS_IMPORTACAO = {
+    "colaboradores": ["nome", "cargo"],
+    "atividades": ["nome", ("microarea", "microarea_id")],
+    "colab_atividades": [("colaborador", "colab_id"), ("atividade", "atividade_id"), "percentual"],
+    "demandas": ["periodo", ("atividade", "atividade_id"), "quantidade"],
+}
+
+
+def _conferir_colunas(tabela, colunas):
+    faltam = [
+        " ou ".join(c) if isinstance(c, tuple) else c
+        for c in _OBRIGATORIAS_IMPORTACAO[tabela]
+        if not set(c if isinstance(c, tuple) else (c,)) & set(colunas)
+    ]
+    if faltam:
+        raise ValueError(f"colunas obrigatórias ausentes: {', '.join(faltam)}")
+
+
+def _abrir_binario(arquivo):
+    # caminho ou arquivo já aberto (upload do Streamlit, BytesIO)
+    return open(arquivo, "rb") if isinstance(arquivo, (str, os.PathLike)) else arquivo
+
+
+def _ler_blocos_importacao(arquivo, nome_arquivo):
+    """
+    Blocos de até LINHAS_POR_BLOCO_IMPORTACAO linhas, com tudo como texto
+    (célula vazia = "") e colunas em minúsculas. CSV é lido em blocos
+    (separador , ; ou tab e codificação UTF-8 ou Latin-1 detectados no início);
+    Excel (.xlsx requer openpyxl; .xls, xlrd) é lido inteiro e fatiado.
+    """
+    if nome_arquivo.lower().endswith((".xlsx", ".xls")):
+        try:
+            if nome_arquivo.lower().endswith(".xls"):
+                import xlrd  # noqa: F401
+            else:
+                import openpyxl  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                f"Importar planilhas Excel requer o pacote {e.name} (pip install {e.name})."
+            ) from e
+        df = pd.read_excel(arquivo, dtype=str, keep_default_na=False)
+        blocos = (df.iloc[i:i + LINHAS_POR_BLOCO_IMPORTACAO] for i in range(0, max(len(df), 1), LINHAS_POR_BLOCO_IMPORTACAO))
+    else:
+        inicio = arquivo.read(65536)
+        arquivo.seek(0)
+        try:
+            inicio.decode("utf-8")
+            codificacao = "utf-8-sig"
+        except UnicodeDecodeError:
+            codificacao = "latin-1"
+        cabecalho = inicio.decode(codificacao, errors="ignore").splitlines()[:1] or [""]
+        separador = max([",", ";", "\t"], key=cabecalho[0].count)
+        blocos = pd.read_csv(
+            arquivo, sep=separador, dtype=str, keep_default_na=False,
+            encoding=codificacao, chunksize=LINHAS_POR_BLOCO_IMPORTACAO
+        )
+    for bloco in blocos:
+        yield bloco.rename(columns=lambda c: str(c).strip().lower())
+
+
+def _texto(bloco, coluna):
+    if coluna not in bloco.columns:
+        return pd.Series("", index=bloco.index, dtype=object)
+    return bloco[coluna].astype(str).str.strip()
+
+
+def _numero(bloco, coluna):
+    """
+    (valores, invalidos): texto -> número aceitando vírgula decimal; célula
+    vazia vira NaN e não é inválida.
+    """
+    texto = _texto(bloco, coluna).str.replace(",", ".", regex=False)
+    vazio = texto == ""
+    valores = pd.to_numeric(texto.where(~vazio), errors="coerce")
+    return valores, ~vazio & valores.isna()
+
+
+def _marcar(motivos, mask, texto):
+    return motivos.where(~mask, motivos + texto + "; ")
+
+
+def _resolver_ids(repo, tabela, bloco, coluna_nome, coluna_id):
+    """
+    ids de `tabela` referenciados pelo nome (índice hash do repositório) ou,
+    sem a coluna de nome, pelo id. NaN onde não há cadastro.
+    """
+    df = repo.tabela(tabela)
+    ids = df["id"].to_numpy(dtype=float)
+    if len(ids) == 0:
+        # cadastro vazio: nada a referenciar (e nada a indexar por posição)
+        return pd.Series(np.nan, index=bloco.index)
+    if coluna_nome in bloco.columns or coluna_id not in bloco.columns:
+        posicoes = _texto(bloco, coluna_nome).map(repo.indice(tabela, "nome"))
+        return pd.Series(ids[posicoes.fillna(0).astype(np.int64)], index=bloco.index).where(posicoes.notna())
+    valores, _ = _numero(bloco, coluna_id)
+    return valores.where(valores.isin(ids))
+
+
+def _validar_colaboradores(bloco, repo, vistos):
+    """
+    nome e cargo (um de CARGOS) obrigatórios; carga_diaria ((0, 24] h, padrão
+    pela carga do cargo), microarea_principal (nome) ou microarea_principal_id
+    cadastrada, ativo (sim/nao).
+    Nomes já cadastrados ou repetidos no arquivo são rejeitados.
+    """
+    nome, cargo = _texto(bloco, "nome"), _texto(bloco, "cargo")
+    micro_id = _resolver_ids(repo, "microareas", bloco, "microarea_principal", "microarea_principal_id")
+    micro_informada = (_texto(bloco, "microarea_principal") != "") | (_texto(bloco, "microarea_principal_id") != "")
+    carga, carga_invalida = _numero(bloco, "carga_diaria")
+    ativo = _texto(bloco, "ativo").str.lower().replace({"": "sim", "s": "sim", "não": "nao", "n": "nao"})
+
+    motivos = pd.Series("", index=bloco.index, dtype=object)
+    motivos = _marcar(motivos, nome == "", "nome vazio")
+    motivos = _marcar(motivos, ~cargo.isin(CARGOS), "cargo inválido")
+    motivos = _marcar(motivos, carga_invalida, "carga_diaria não numérica")
+    motivos = _marcar(motivos, (carga <= 0) | (carga > 24), "carga_diaria fora de (0, 24] h")
+    motivos = _marcar(motivos, micro_informada & micro_id.isna(), "microarea_principal não cadastrada")
+    motivos = _marcar(motivos, ~ativo.isin(["sim", "nao"]), "ativo deve ser sim ou nao")
+    motivos = _marcar(motivos, nome.isin(repo.indice("colaboradores", "nome")), "nome já cadastrado")
+    motivos = _marcar(motivos, (nome != "") & (nome.duplicated() | nome.isin(vistos)), "nome repetido no arquivo")
+    vistos.update(nome)
+
+    linhas = pd.DataFrame({
+        "nome": nome,
+        "cargo": cargo,
+        "carga_diaria": carga.fillna(cargo.map(carga_diaria_cargo)),
+        "microarea_principal_id": micro_id,
+        "microareas_secundarias": _texto(bloco, "microareas_secundarias"),
+        "ativo": ativo,
+    })
+    return linhas, motivos
+
+
+def _validar_atividades(bloco, repo, vistos):
+    """
+    nome e microarea (nome) ou microarea_id cadastrada obrigatórios; minutos por execução (>= 0)
+    ou hh_por_unidade; percentual dos projetos (0-100) ou fator_por_projeto
+    (>= 0); categoria; responsavel_funcao (colaborador cadastrado).
+    Vazios valem 60 minutos e 100%, como na leitura das atividades.
+    Nomes já cadastrados ou repetidos no arquivo são rejeitados.
+    """
+    nome = _texto(bloco, "nome")
+    micro_id = _resolver_ids(repo, "microareas", bloco, "microarea", "microarea_id")
+    micro_informada = (_texto(bloco, "microarea") != "") | (_texto(bloco, "microarea_id") != "")
+    responsavel = _texto(bloco, "responsavel_funcao")
+    if "minutos" in bloco.columns or "hh_por_unidade" not in bloco.columns:
+        minutos, tempo_invalido = _numero(bloco, "minutos")
+        hh = minutos / 60.0
+    else:
+        hh, tempo_invalido = _numero(bloco, "hh_por_unidade")
+    if "percentual" in bloco.columns or "fator_por_projeto" not in bloco.columns:
+        percentual, fator_invalido = _numero(bloco, "percentual")
+        fator, fator_fora = percentual / 100.0, (percentual < 0) | (percentual > 100)
+        texto_fora = "percentual fora de 0-100"
+    else:
+        fator, fator_invalido = _numero(bloco, "fator_por_projeto")
+        fator_fora, texto_fora = fator < 0, "fator_por_projeto negativo"
+
+    motivos = pd.Series("", index=bloco.index, dtype=object)
+    motivos = _marcar(motivos, nome == "", "nome vazio")
+    motivos = _marcar(motivos, ~micro_informada, "microarea vazia")
+    motivos = _marcar(motivos, micro_informada & micro_id.isna(), "microarea não cadastrada")
+    motivos = _marcar(motivos, tempo_invalido, "tempo não numérico")
+    motivos = _marcar(motivos, hh < 0, "tempo negativo")
+    motivos = _marcar(motivos, fator_invalido, "percentual/fator não numérico")
+    motivos = _marcar(motivos, fator_fora, texto_fora)
+    motivos = _marcar(
+        motivos, (responsavel != "") & ~responsavel.isin(repo.indice("colaboradores", "nome")),
+        "responsavel_funcao não é colaborador cadastrado"
+    )
+    motivos = _marcar(motivos, nome.isin(repo.indice("atividades", "nome")), "nome já cadastrado")
+    motivos = _marcar(motivos, (nome != "") & (nome.duplicated() | nome.isin(vistos)), "nome repetido no arquivo")
+    vistos.update(nome)
+
+    linhas = pd.DataFrame({
+        "nome": nome,
+        "microarea_id": micro_id,
+        "categoria": _texto(bloco, "categoria"),
+        "responsavel_funcao": responsavel,
+        "hh_por_unidade": hh.fillna(1.0),
+        "fator_por_projeto": fator.fillna(1.0),
+    })
+    return linhas, motivos
+
+
+def _validar_colab_atividades(bloco, repo, vistos):
+    """
+    colaborador (nome) ou colab_id e atividade (nome) ou atividade_id,
+    cadastrados; percentual (0-100) obrigatório. Um vínculo que já existe
+    tem o percentual substituído (mantém o id); pares repetidos no arquivo
+    são rejeitados.
+    """
+    colab_id = _resolver_ids(repo, "colaboradores", bloco, "colaborador", "colab_id")
+    atividade_id = _resolver_ids(repo, "atividades", bloco, "atividade", "atividade_id")
+    percentual, percentual_invalido = _numero(bloco, "percentual")
+    par = colab_id.astype(str) + "/" + atividade_id.astype(str)
+
+    motivos = pd.Series("", index=bloco.index, dtype=object)
+    motivos = _marcar(motivos, colab_id.isna(), "colaborador não cadastrado")
+    motivos = _marcar(motivos, atividade_id.isna(), "atividade não cadastrada")
+    motivos = _marcar(motivos, percentual_invalido, "percentual não numérico")
+    motivos = _marcar(motivos, percentual.isna() & ~percentual_invalido, "percentual vazio")
+    motivos = _marcar(motivos, (percentual < 0) | (percentual > 100), "percentual fora de 0-100")
+    motivos = _marcar(
+        motivos, colab_id.notna() & atividade_id.notna() & (par.duplicated() | par.isin(vistos)),
+        "vínculo repetido no arquivo"
+    )
+    vistos.update(par)
+
+    vinculos = repo.tabela("colab_atividades")
+    existentes = pd.Series(
+        vinculos["id"].to_numpy(),
+        index=pd.MultiIndex.from_arrays([
+            pd.to_numeric(vinculos["colab_id"], errors="coerce"),
+            pd.to_numeric(vinculos["atividade_id"], errors="coerce"),
+        ])
+    )
+    existentes = existentes[~existentes.index.duplicated()]
+    linhas = pd.DataFrame({
+        "id": existentes.reindex(pd.MultiIndex.from_arrays([colab_id, atividade_id])).to_numpy(),
+        "colab_id": colab_id,
+        "atividade_id": atividade_id,
+        "percentual": percentual,
+    })
+    return linhas, motivos
+
+
+def _validar_demandas(bloco, repo, vistos):
+    """
+    periodo (AAAA-MM), atividade (nome) ou atividade_id cadastrada e
+    quantidade (>= 0) obrigatórios. As demandas do arquivo substituem as dos
+    períodos que ele traz; atividade repetida num período é rejeitada, e um
+    período com linha rejeitada não é importado (ver importar_arquivo).
+    """
+    periodo = _texto(bloco, "periodo")
+    atividade_id = _resolver_ids(repo, "atividades", bloco, "atividade", "atividade_id")
+    quantidade, quantidade_invalida = _numero(bloco, "quantidade")
+    chave = periodo + "/" + atividade_id.astype(str)
+
+    motivos = pd.Series("", index=bloco.index, dtype=object)
+    motivos = _marcar(motivos, ~periodo.str.fullmatch(r"\d{4}-(0[1-9]|1[0-2])"), "periodo fora do formato AAAA-MM")
+    motivos = _marcar(motivos, atividade_id.isna(), "atividade não cadastrada")
+    motivos = _marcar(motivos, quantidade_invalida, "quantidade não numérica")
+    motivos = _marcar(motivos, quantidade.isna() & ~quantidade_invalida, "quantidade vazia")
+    motivos = _marcar(motivos, quantidade < 0, "quantidade negativa")
+    motivos = _marcar(
+        motivos, atividade_id.notna() & (chave.duplicated() | chave.isin(vistos)),
+        "atividade repetida no período"
+    )
+    vistos.update(chave)
+
+    linhas = pd.DataFrame({"periodo": periodo, "atividade_id": atividade_id, "quantidade": quantidade})
+    return linhas, motivos
+
+
+_VALIDADORES_IMPORTACAO = {
+    "colaboradores": _validar_colaboradores,
+    "atividades": _validar_atividades,
+    "colab_atividades": _validar_colab_atividades,
+    "demandas": _validar_demandas,
+}
+
+
+def _descartar_periodos_rejeitados(validas, originais, rejeitadas):
+    # a gravação substitui o período inteiro: um período com alguma linha
+    # rejeitada não é gravado, para não apagar a demanda que a linha corrigiria
+    periodos = set(rejeitadas["periodo"].astype(str).str.strip())
+    fora = validas["periodo"].isin(periodos).to_numpy()
+    if not fora.any():
+        return validas, rejeitadas
+    descartadas = originais[fora].assign(motivo="período com linhas rejeitadas (não importado)")
+    rejeitadas = pd.concat([rejeitadas, descartadas], ignore_index=True).sort_values("linha", kind="stable")
+    return validas[~fora].reset_index(drop=True), rejeitadas.reset_index(drop=True)
+
+
+def _gravar_importacao(repo, tabela, linhas):
+    # uma única escrita por tabela, pelo repositório (e pelos agregados de demanda)
+    if tabela == "atividades":
+        repo.inserir_atividades(linhas)
+    elif tabela == "demandas":
+        linhas = linhas.astype({"atividade_id": np.int64})
+        repo.gravar_demandas(linhas, linhas["periodo"].unique().tolist())
+    elif tabela == "colab_atividades":
+        # vínculos já cadastrados mantêm o id e têm a linha substituída
+        linhas = linhas.astype({"colab_id": np.int64, "atividade_id": np.int64})
+        existentes = linhas["id"].dropna().astype(np.int64).tolist()
+        if existentes:
+            repo.substituir(tabela, linhas, id=existentes)
+        else:
+            repo.inserir(tabela, linhas.drop(columns="id"))
+    else:
+        repo.inserir(tabela, linhas)
+
+
+@instrumentar()
+def importar_arquivo(tabela, arquivo, nome_arquivo=None, repositorio=None):
+    """
+    Importa um CSV ou Excel (pela extensão de `nome_arquivo`) para `tabela`
+    (uma de COLUNAS_IMPORTACAO). O arquivo é lido em blocos, cada bloco é
+    validado de uma vez (obrigatórios, números e faixas, cadastros
+    referenciados e repetições; ver _validar_<tabela>) e as linhas válidas
+    de todos os blocos são gravadas numa única escrita. Em demandas, que
+    substituem o período inteiro, cada período é tudo ou nada: uma linha
+    rejeitada devolve as demais linhas do período como rejeitadas.
+    `arquivo` é um caminho ou um arquivo aberto em modo binário; `repositorio`,
+    o da sessão (sem ele, um novo, lido do armazenamento).
+    Retorna (importadas, rejeitadas): rejeitadas tem a linha no arquivo
+    (o cabeçalho é a linha 1), o motivo e as colunas lidas.
+    """
+    if tabela not in _VALIDADORES_IMPORTACAO:
+        raise ValueError(f"tabela sem importação: {tabela}")
+    if nome_arquivo is None:
+        nome_arquivo = str(arquivo)
+    repo = repositorio if repositorio is not None else Repositorio()
+    validar = _VALIDADORES_IMPORTACAO[tabela]
+
+    validas, rejeitadas, originais, vistos = [], [], [], set()
+    proxima_linha = 2
+    arquivo = _abrir_binario(arquivo)
+    try:
+        for bloco in _ler_blocos_importacao(arquivo, nome_arquivo):
+            bloco = bloco.reset_index(drop=True)
+            _conferir_colunas(tabela, bloco.columns)
+            linhas, motivos = validar(bloco, repo, vistos)
+            ok = (motivos == "").to_numpy()
+            validas.append(linhas[ok])
+            rejeitadas.append(bloco[~ok].assign(
+                linha=np.flatnonzero(~ok) + proxima_linha,
+                motivo=motivos[~ok].str.rstrip("; ")
+            ))
+            if tabela == "demandas":
+                originais.append(bloco[ok].assign(linha=np.flatnonzero(ok) + proxima_linha))
+            proxima_linha += len(bloco)
+    finally:
+        if arquivo is not None and not hasattr(arquivo, "getvalue"):
+            arquivo.close()
+
+    validas = pd.concat(validas, ignore_index=True) if validas else pd.DataFrame()
+    rejeitadas = pd.concat(rejeitadas, ignore_index=True) if rejeitadas else pd.DataFrame()
+    if tabela == "demandas" and not validas.empty and not rejeitadas.empty:
+        validas, rejeitadas = _descartar_periodos_rejeitados(validas, pd.concat(originais, ignore_index=True), rejeitadas)
+    rejeitadas = rejeitadas[["linha", "motivo"] + [c for c in rejeitadas.columns if c not in ("linha", "motivo")]] \
+        if not rejeitadas.empty else pd.DataFrame(columns=["linha", "motivo"])
+    if not validas.empty:
+        _gravar_importacao(repo, tabela, validas)
+    return len(validas), rejeitadas
+
+# ---------------------------
+# Matriz de vínculos (edição em grade)
+# ---------------------------
+def matriz_vinculos(vinculos, colab_ids, atividade_ids):
+    """
+    Percentual de cada colaborador (linhas) em cada atividade (colunas), na
+    ordem pedida; NaN onde não há vínculo. Em pares repetidos vale o primeiro.
+    """
+    colab = pd.to_numeric(vinculos["colab_id"], errors="coerce")
+    atividade = pd.to_numeric(vinculos["atividade_id"], errors="coerce")
+    sel = colab.isin(colab_ids) & atividade.isin(atividade_ids)
+    pares = pd.DataFrame({
+        "colab_id": colab[sel], "atividade_id": atividade[sel],
+        "percentual": pd.to_numeric(vinculos.loc[sel, "percentual"], errors="coerce"),
+    }).drop_duplicates(subset=["colab_id", "atividade_id"])
+    matriz = pares.pivot(index="colab_id", columns="atividade_id", values="percentual")
+    return matriz.reindex(index=pd.Index(colab_ids), columns=pd.Index(atividade_ids)).astype(float)
+
+
+def alteracoes_vinculos(vinculos, antes, depois):
+    """
+    Compara duas matrizes de matriz_vinculos (mesma forma) e devolve
+    (linhas, ids) para uma única escrita substituir(id=ids):
+    - linhas: os pares com percentual novo; os que já têm vínculo mantêm o id
+    - ids: os vínculos dos pares alterados, inclusive os apagados na grade
+      (percentual vazio) e os repetidos do mesmo par, que deixam de existir
+    """
+    a = antes.to_numpy(dtype=float)
+    d = depois.to_numpy(dtype=float)
+    mudou = ~((a == d) | (np.isnan(a) & np.isnan(d)))
+    linha, coluna = np.nonzero(mudou)
+    alteradas = pd.DataFrame({
+        "colab_id": antes.index.to_numpy()[linha],
+        "atividade_id": antes.columns.to_numpy()[coluna],
+        "percentual": d[linha, coluna],
+    })
+
+    chaves = pd.MultiIndex.from_arrays([
+        pd.to_numeric(vinculos["colab_id"], errors="coerce"),
+        pd.to_numeric(vinculos["atividade_id"], errors="coerce"),
+    ])
+    pares = pd.MultiIndex.from_frame(alteradas[["colab_id", "atividade_id"]])
+    afetados = chaves.isin(pares)
+    ids = vinculos.loc[afetados, "id"].astype(np.int64).tolist()
+    primeiro_id = pd.Series(vinculos.loc[afetados, "id"].to_numpy(), index=chaves[afetados])
+    primeiro_id = primeiro_id[~primeiro_id.index.duplicated()]
+
+    alteradas = alteradas[alteradas["percentual"].notna()]
+    linhas = pd.DataFrame({
+        "id": primeiro_id.reindex(pd.MultiIndex.from_frame(alteradas[["colab_id", "atividade_id"]])).to_numpy(),
+        "colab_id": alteradas["colab_id"].astype(np.int64).to_numpy(),
+        "atividade_id": alteradas["atividade_id"].astype(np.int64).to_numpy(),
+        "percentual": alteradas["percentual"].to_numpy(),
+    })
+    return linhas, ids
+
+# ---------------------------
+# Simulação Monte Carlo da demanda
+# ---------------------------
+PERCENTIS_SIMULACAO = (50, 90, 99)
+
+
+def _resumo_sorteios(hh, chaves, nome_chave, deterministico):
+    """
+    Média e percentis (colunas) de uma matriz sorteios x chaves.
+    """
+    df = pd.DataFrame({nome_chave: chaves})
+    df["hh_fixo"] = deterministico
+    df["hh_medio"] = hh.mean(axis=0)
+    for p, valores in zip(PERCENTIS_SIMULACAO, np.percentile(hh, PERCENTIS_SIMULACAO, axis=0)):
+        df[f"p{p}"] = valores
+    return df
+
+
+def simular_demanda(atividades, num_projetos, pesos, n_sorteios=10000, seed=None):
+    """
+    Simulação Monte Carlo do mix de projetos de um período.
+    fator_por_projeto é tratado como a chance de um projeto exigir a atividade,
+    então as execuções de cada atividade seguem Binomial(num_projetos, fator)
+    (a parte inteira de fatores > 1 entra como execuções fixas por projeto).
+    Todos os sorteios saem numa única matriz sorteios x atividades.
+    `pesos` é a matriz de montar_matriz_pesos ou o DataFrame de vínculos.
+    Retorna (df_micro, df_colab) com hh fixo (cálculo atual), médio e P50/P90/P99
+    por micro-área e por colaborador.
+    """
+    if isinstance(pesos, pd.DataFrame):
+        pesos = montar_matriz_pesos(pesos)
+
+    ativ = atividades.dropna(subset=["id"])
+    fatores = ativ["fator_por_projeto"].fillna(1.0).clip(lower=0).to_numpy(dtype=float)
+    hh_unidade = ativ["hh_por_unidade"].fillna(0).to_numpy(dtype=float)
+    n = int(num_projetos)
+
+    fixas = np.floor(fatores)
+    rng = np.random.default_rng(seed)
+    execucoes = rng.binomial(n, fatores - fixas, size=(n_sorteios, len(fatores))) + n * fixas
+    hh = execucoes * hh_unidade
+    hh_fixo = num_projetos * fatores * hh_unidade
+
+    # micro-área: soma das colunas de cada grupo (matriz indicadora atividades x micro-áreas)
+    codigos, microareas = pd.factorize(ativ["microarea"])
+    indicadora = np.zeros((len(fatores), len(microareas)))
+    com_micro = codigos >= 0
+    indicadora[np.nonzero(com_micro)[0], codigos[com_micro]] = 1.0
+    df_micro = _resumo_sorteios(hh @ indicadora, microareas, "microarea", hh_fixo @ indicadora)
+
+    # colaborador: pesos dos vínculos restritos às atividades simuladas
+    posicao = np.full(len(pesos["atividades"]), -1)
+    linha = pd.Index(pesos["atividades"]).get_indexer(ativ["id"].astype(np.int64))
+    posicao[linha[linha >= 0]] = np.nonzero(linha >= 0)[0]
+    alvo = posicao[pesos["linhas"]]
+    usados = alvo >= 0
+    matriz = np.zeros((len(fatores), len(pesos["colaboradores"])))
+    np.add.at(matriz, (alvo[usados], pesos["colunas"][usados]), pesos["valores"][usados])
+    com_vinculo = matriz.any(axis=0)
+    matriz = matriz[:, com_vinculo]
+    df_colab = _resumo_sorteios(
+        hh @ matriz, pesos["colaboradores"][com_vinculo], "id_colaborador", hh_fixo @ matriz
+    )
+    return df_micro, df_colab
+
+# ---------------------------
+# Plano de contratações
+# ---------------------------
+def otimizar_contratacoes(df_micro, dias_uteis, cargos=None, limites=None):
+    """
+    Menor plano de contratações que cobre o déficit (saldo < 0) de cada linha de
+    df_micro (micro-área, ou período x micro-área no cálculo em lote).
+    Critérios, em ordem: menos horas descobertas (se os limites não bastam),
+    menos contratações e menos horas contratadas.
+    Cargos com a mesma carga diária são intercambiáveis, então a enumeração exata
+    é feita sobre as cargas distintas (todas as linhas de uma vez) e cada carga é
+    repartida entre seus cargos na ordem de `cargos`.
+    `limites` ({cargo: máximo}) vale por linha; cargos fora dele não têm limite.
+    Retorna as linhas com déficit e as colunas faltam_horas, uma por cargo,
+    total_contratacoes, horas_contratadas e horas_descobertas.
+    """
+    if cargos is None:
+        cargos = CARGOS_CONTRATACAO
+    if not cargos:
+        raise ValueError("Informe ao menos um cargo para o plano de contratações.")
+    limites = limites or {}
+
+    plano = df_micro[df_micro["saldo"] < 0].reset_index(drop=True)
+    plano["faltam_horas"] = -plano["saldo"].astype(float)
+    faltam = plano["faltam_horas"].to_numpy()[:, None]
+
+    cargas = sorted({carga_diaria_cargo(c) for c in cargos}, reverse=True)
+    por_carga = {h: [c for c in cargos if carga_diaria_cargo(c) == h] for h in cargas}
+    horas = np.array(cargas) * dias_uteis
+    limite = np.array([sum(limites.get(c, np.inf) for c in por_carga[h]) for h in cargas])
+
+    # todas as combinações das cargas maiores; a menor carga cobre o que faltar
+    maximo = np.ceil(faltam.max(initial=0) / horas[:-1])
+    faixas = [np.arange(int(min(m, lim)) + 1) for m, lim in zip(maximo, limite[:-1])]
+    combos = np.stack([g.ravel() for g in np.meshgrid(*faixas, indexing="ij")], axis=1) if faixas \
+        else np.zeros((1, 0))
+    cobertas = combos @ horas[:-1]
+
+    resto = np.maximum(faltam - cobertas, 0)
+    ultima = np.minimum(np.ceil(resto / horas[-1] - 1e-9), limite[-1])
+    descobertas = np.maximum(resto - ultima * horas[-1], 0)
+    total = combos.sum(axis=1) + ultima
+    contratadas = cobertas + ultima * horas[-1]
+
+    escolha = descobertas <= descobertas.min(axis=1, initial=np.inf, keepdims=True) + 1e-9
+    total = np.where(escolha, total, np.inf)
+    escolha &= total == total.min(axis=1, initial=np.inf, keepdims=True)
+    melhor = np.where(escolha, contratadas, np.inf).argmin(axis=1)
+    linhas = np.arange(len(plano))
+    for c in cargos:
+        plano[c] = 0
+
+    qtd_carga = np.column_stack([combos[melhor], ultima[linhas, melhor]])
+    for i, h in enumerate(cargas):
+        restante = qtd_carga[:, i]
+        for c in por_carga[h]:
+            plano[c] = np.minimum(restante, limites.get(c, np.inf)).astype(int)
+            restante = restante - plano[c].to_numpy()
+    plano["total_contratacoes"] = plano[list(cargos)].sum(axis=1).astype(int)
+    plano["horas_contratadas"] = qtd_carga @ horas
+    plano["horas_descobertas"] = descobertas[linhas, melhor]
+    return plano
+
+# ---------------------------
+# Varredura de cenários (what-if)
+# ---------------------------
+# Limite de cenários (variante x projetos x dias) exibidos na tela de cenários
+MAX_CENARIOS_TELA = 50_000
+
+
+def varrer_cenarios(atividades, colabs, projetos, dias_uteis, tempos=None):
+    """
+    Avalia o modelo de capacidade para todas as combinações de número de projetos,
+    dias úteis e tempos alternativos de atividades.
+    - tempos: {atividade_id: [minutos, ...]}; cada combinação dos tempos é uma variante
+      (a variante "base" usa os tempos cadastrados quando tempos é vazio)
+    - demanda é linear em projetos e capacidade em dias úteis: a grade inteira
+      é um único broadcasting (variantes x projetos x dias x micro-áreas)
+    Retorna uma linha por variante x num_projetos x dias_uteis x micro-área com
+    hh_necessarias, capacidade_mensal e saldo.
+    """
+    tempos = {k: list(v) for k, v in (tempos or {}).items() if len(v)}
+    projetos = np.asarray(projetos, dtype=float)
+    dias = np.asarray(dias_uteis, dtype=float)
+
+    ativ = atividades.dropna(subset=["id"]).reset_index(drop=True)
+    hh_base = ativ["hh_por_unidade"].fillna(0).to_numpy(dtype=float)
+    fatores = ativ["fator_por_projeto"].fillna(0).to_numpy(dtype=float)
+    nomes = dict(zip(ativ["id"].astype(int), ativ["nome"]))
+
+    ids = list(tempos)
+    combinacoes = list(product(*(tempos[i] for i in ids)))
+    posicoes = pd.Index(ativ["id"].astype(int)).get_indexer(ids)
+    hh_unidade = np.repeat(hh_base[None, :], len(combinacoes), axis=0)
+    for j, pos in enumerate(posicoes):
+        if pos >= 0:
+            hh_unidade[:, pos] = [c[j] / 60.0 for c in combinacoes]
+    variantes = [
+        "; ".join(f"{nomes.get(i, i)}={m:g} min" for i, m in zip(ids, c)) or "base"
+        for c in combinacoes
+    ]
+
+    # micro-áreas pelo id inteiro; o nome só entra no resultado
+    codigos, microarea_ids = pd.factorize(_numerico(ativ["microarea_id"]).astype(float))
+    microareas = ativ["microarea"].groupby(codigos).first().reindex(range(len(microarea_ids))).to_numpy(dtype=object)
+    indicadora = np.zeros((len(ativ), len(microareas)))
+    com_micro = codigos >= 0
+    indicadora[np.nonzero(com_micro)[0], codigos[com_micro]] = 1.0
+    hh_projeto = (hh_unidade * fatores) @ indicadora
+
+    caps = calcular_capacidades(colabs, 1)
+    cap_diaria = (
+        caps["capacidade_diaria"].groupby(_numerico(caps["microarea_principal_id"]).astype(float)).sum()
+        .reindex(microarea_ids).fillna(0).to_numpy(dtype=float)
+    )
+
+    demanda = projetos[None, :, None, None] * hh_projeto[:, None, None, :]
+    saldo = dias[None, None, :, None] * cap_diaria[None, None, None, :] - demanda
+
+    v, p, d, m = np.meshgrid(
+        np.arange(len(variantes)), np.arange(len(projetos)),
+        np.arange(len(dias)), np.arange(len(microareas)), indexing="ij"
+    )
+    df = pd.DataFrame({
+        "variante": np.asarray(variantes, dtype=object)[v.ravel()],
+        "num_projetos": projetos[p.ravel()],
+        "dias_uteis": dias[d.ravel()],
+        "microarea": np.asarray(microareas, dtype=object)[m.ravel()],
+        "capacidade_mensal": (dias[:, None] * cap_diaria[None, :])[d.ravel(), m.ravel()],
+        "saldo": saldo.ravel(),
+    })
+    df["hh_necessarias"] = df["capacidade_mensal"] - df["saldo"]
+    return df[["variante", "num_projetos", "dias_uteis", "microarea", "hh_necessarias", "capacidade_mensal", "saldo"]]
+
+# ---------------------------
+# Geração de demandas a partir do número de projetos
+# ---------------------------
+def preparar_cronograma(cronograma):
+    """
+    Limpa um cronograma (periodo, num_projetos) vindo do editor ou de arquivo.
+    Descarta períodos vazios e quantidades não positivas; se um período
+    aparece mais de uma vez, vale a última linha.
+    """
+    cron = cronograma.rename(columns=lambda c: str(c).strip().lower())
+    if "periodo" not in cron.columns or "num_projetos" not in cron.columns:
+        return pd.DataFrame(columns=["periodo", "num_projetos"])
+
+    cron = pd.DataFrame({
+        "periodo": cron["periodo"].astype("string").str.strip(),
+        "num_projetos": pd.to_numeric(cron["num_projetos"], errors="coerce"),
+    })
+    cron = cron[(cron["periodo"].fillna("") != "") & (cron["num_projetos"] > 0)]
+    cron = cron.drop_duplicates(subset="periodo", keep="last")
+    return cron.astype({"periodo": object}).reset_index(drop=True)
+
+
+def gerar_demandas(atividades, cronograma, primeiro_id=None):
+    """
+    Gera as demandas de todos os períodos do cronograma num único produto
+    externo períodos x atividades:
+    quantidade = num_projetos * fator_por_projeto (quantidades <= 0 são descartadas).
+    Sem primeiro_id, as linhas saem sem id e o storage atribui os ids ao gravar.
+    """
+    fatores = atividades["fator_por_projeto"].fillna(1.0).to_numpy(dtype=float)
+    projetos = cronograma["num_projetos"].to_numpy(dtype=float)
+
+    novas = pd.DataFrame({
+        "periodo": np.repeat(cronograma["periodo"].to_numpy(dtype=object), len(fatores)),
+        "atividade_id": np.tile(atividades["id"].to_numpy(dtype=int), len(projetos)),
+        "quantidade": np.outer(projetos, fatores).ravel(),
+    })
+    novas = novas[novas["quantidade"] > 0].reset_index(drop=True)
+    if primeiro_id is not None:
+        novas.insert(0, "id", np.arange(primeiro_id, primeiro_id + len(novas)))
+    return novas
+
+# ---------------------------
+# Programação diária (dias úteis x colaborador)
+# ---------------------------
+# Fração da razão áurea: defasa as atividades entre si, para que execuções
+# únicas de atividades diferentes não caiam todas no mesmo dia
+_DEFASAGEM_ATIVIDADES = (np.sqrt(5) - 1) / 2
+
+# Tolerância de arredondamento ao comparar horas
+_TOLERANCIA_HH = 1e-9
+
+
+def dias_uteis_periodo(periodo, dias_uteis=22, feriados=()):
+    """
+    Dias úteis (segunda a sexta, menos `feriados`) do mês `periodo` (AAAA-MM).
+    Um período que não é um mês fica com `dias_uteis` dias numerados (1, 2, ...).
+    """
+    try:
+        mes = pd.Period(str(periodo), freq="M")
+    except ValueError:
+        return pd.Index(np.arange(1, dias_uteis + 1), name="dia")
+    dias = pd.bdate_range(mes.start_time, mes.end_time.normalize())
+    return dias.difference(pd.DatetimeIndex(list(feriados))).rename("dia")
+
+
+@instrumentar()
+def programar_periodo(colabs, atividades, demandas, pesos, dias):
+    """
+    Programação dia a dia das demandas de um período (em vez da média
+    hh mensal / dias_uteis):
+    - cada atividade vira ceil(quantidade) execuções de hh_por_unidade horas
+      (a última só com a fração que sobra);
+    - as execuções de cada atividade são repartidas entre os colaboradores
+      vinculados na proporção dos percentuais, e as de cada colaborador são
+      espalhadas pelos `dias`;
+    - cada colaborador trabalha até a carga_diaria por dia e o que passa fica
+      pendente para o dia seguinte.
+    Tudo em arrays (uma linha por execução), então milhares de execuções
+    por mês custam milissegundos.
+    demandas: linhas do período (atividade_id, quantidade); pesos: matriz de
+    get_matriz_pesos() ou DataFrame de vínculos; dias: dias_uteis_periodo().
+    Retorna {nome: DataFrame}:
+    - carga: dia x colaborador (capacidade_dia, hh_programadas, hh_executadas,
+      hh_pendentes, sobrecarga = terminou o dia com horas pendentes)
+    - execucoes_longas: atividade x colaborador com execuções maiores que a
+      carga diária de quem as recebe (não cabem num dia)
+    - sem_vinculo: hh das atividades com demanda e sem colaborador vinculado
+    """
+    n_dias = len(dias)
+    if n_dias == 0:
+        raise ValueError("período sem dias úteis")
+    if isinstance(pesos, pd.DataFrame):
+        pesos = montar_matriz_pesos(pesos)
+
+    caps = calcular_capacidades(colabs, n_dias)
+    caps = caps[pd.to_numeric(caps["id"], errors="coerce").notna()]
+    ids_cadastro = caps["id"].to_numpy(dtype=np.int64)
+    # colaboradores cadastrados e os que só aparecem nos vínculos (capacidade 0)
+    ids_colab = np.union1d(ids_cadastro, pesos["colaboradores"])
+    n_colab = len(ids_colab)
+    cap = np.zeros(n_colab)
+    cap[np.searchsorted(ids_colab, ids_cadastro)] = caps["capacidade_diaria"].to_numpy(dtype=float)
+    nomes_colab = pd.Series(caps["nome"].to_numpy(), index=ids_cadastro)
+
+    # Demanda por atividade: quantidade de execuções e horas por execução
+    dem = demandas.assign(atividade_id=pd.to_numeric(demandas["atividade_id"], errors="coerce"))
+    qtd = dem.dropna(subset=["atividade_id"]).groupby("atividade_id")["quantidade"].sum()
+    ativ = atividades.assign(id=pd.to_numeric(atividades["id"], errors="coerce")).drop_duplicates("id").set_index("id")
+    hh_unid = ativ["hh_por_unidade"].reindex(qtd.index).to_numpy(dtype=float)
+    q = qtd.to_numpy(dtype=float)
+    valida = (q > 0) & (hh_unid > 0)
+    ids_ativ, q, hh_unid = qtd.index.to_numpy(dtype=np.int64)[valida], q[valida], hh_unid[valida]
+
+    linha = pd.Index(pesos["atividades"]).get_indexer(ids_ativ)
+    sem = linha < 0
+    sem_vinculo = pd.DataFrame({
+        "atividade_id": ids_ativ[sem],
+        "atividade": ativ["nome"].reindex(ids_ativ[sem]).to_numpy(),
+        "hh": q[sem] * hh_unid[sem],
+    })
+    ids_ativ, q, hh_unid, linha = ids_ativ[~sem], q[~sem], hh_unid[~sem], linha[~sem]
+
+    # Uma posição por execução: a = atividade, j = ordem dentro da atividade
+    k = np.ceil(q - _TOLERANCIA_HH).astype(np.int64)
+    a = np.repeat(np.arange(len(k)), k)
+    j = np.arange(len(a)) - np.repeat(np.cumsum(k) - k, k)
+    duracao = hh_unid[a].copy()
+    ultima = j == k[a] - 1
+    duracao[ultima] *= (q - (k - 1))[a[ultima]]
+
+    # Colaborador de cada execução: a fração (j + 0.5) / k da atividade cai no
+    # trecho dos percentuais acumulados de um dos vínculos dela (busca binária
+    # sobre linha + acumulado, um trecho por atividade)
+    ordem = np.lexsort((pesos["colunas"], pesos["linhas"]))
+    linhas_v, colunas_v = pesos["linhas"][ordem], pesos["colunas"][ordem]
+    acum = np.cumsum(pesos["valores"][ordem])
+    inicio_v = np.searchsorted(linhas_v, linhas_v, side="left")
+    limites = linhas_v + acum - np.concatenate(([0.0], acum))[inicio_v]
+    vinculo = np.searchsorted(limites, linha[a] + (j + 0.5) / k[a], side="left")
+    vinculo = np.minimum(vinculo, np.searchsorted(linhas_v, linha[a], side="right") - 1)
+    colab = np.searchsorted(ids_colab, pesos["colaboradores"][colunas_v[vinculo]])
+
+    # Dia de cada execução: as n execuções de (atividade, colaborador) ficam a
+    # 1/n do período uma da outra, com a defasagem da atividade
+    novo = np.r_[True, (a[1:] != a[:-1]) | (colab[1:] != colab[:-1])][:len(a)]
+    grupo = np.cumsum(novo) - 1
+    inicio = np.flatnonzero(novo)
+    tamanho = np.diff(np.append(inicio, len(a)))
+    posicao = (np.arange(len(a)) - inicio[grupo] + 0.5) / tamanho[grupo]
+    fase = (ids_ativ * _DEFASAGEM_ATIVIDADES) % 1.0
+    dia = (((posicao + fase[a]) % 1.0) * n_dias).astype(np.int64)
+
+    programadas = np.bincount(
+        colab * n_dias + dia, weights=duracao, minlength=n_colab * n_dias
+    ).reshape(n_colab, n_dias)
+
+    # Pendências: p[d] = max(0, p[d-1] + programadas[d] - capacidade), em forma
+    # fechada com somas e mínimos acumulados (sem laço por dia)
+    saldo = np.cumsum(programadas - cap[:, None], axis=1)
+    pendentes = saldo - np.minimum(np.minimum.accumulate(saldo, axis=1), 0.0)
+    anteriores = np.hstack([np.zeros((n_colab, 1)), pendentes[:, :-1]])
+    executadas = anteriores + programadas - pendentes
+
+    carga = pd.DataFrame({
+        "dia": np.tile(np.asarray(dias), n_colab),
+        "id_colaborador": np.repeat(ids_colab, n_dias),
+        "nome": np.repeat(nomes_colab.reindex(ids_colab).to_numpy(), n_dias),
+        "capacidade_dia": np.repeat(cap, n_dias),
+        "hh_programadas": programadas.ravel(),
+        "hh_executadas": executadas.ravel(),
+        "hh_pendentes": np.where(pendentes > _TOLERANCIA_HH, pendentes, 0.0).ravel(),
+    })
+    carga["sobrecarga"] = carga["hh_pendentes"] > 0
+
+    longa = duracao > cap[colab] + _TOLERANCIA_HH
+    execucoes_longas = pd.DataFrame({
+        "atividade_id": ids_ativ[a[longa]],
+        "id_colaborador": ids_colab[colab[longa]],
+        "hh_por_execucao": duracao[longa],
+    }).groupby(["atividade_id", "id_colaborador"], as_index=False).agg(
+        hh_por_execucao=("hh_por_execucao", "max"), execucoes=("hh_por_execucao", "size")
+    )
+    execucoes_longas.insert(1, "atividade", ativ["nome"].reindex(execucoes_longas["atividade_id"]).to_numpy())
+    execucoes_longas.insert(3, "nome", nomes_colab.reindex(execucoes_longas["id_colaborador"]).to_numpy())
+    execucoes_longas["capacidade_dia"] = cap[np.searchsorted(ids_colab, execucoes_longas["id_colaborador"])]
+
+    return {"carga": carga, "execucoes_longas": execucoes_longas, "sem_vinculo": sem_vinculo}
+
+
+def calcular_programacao(periodo, feriados=(), dias_uteis=22):
+    """
+    programar_periodo das demandas de `periodo`, lidas do armazenamento configurado.
+    """
+    return programar_periodo(
+        get_colaboradores(), get_atividades(), get_demandas(periodo), get_matriz_pesos(),
+        dias_uteis_periodo(periodo, dias_uteis, feriados)
+    )
+
+
+# ---------------------------
+# Painel em lote (CLI)
+# ---------------------------
+def resumo_diario(df_micro, colabs, dias_uteis):
+    """
+    Resumo diário global do painel: horas/dia necessárias para a demanda de
+    df_micro x capacidade diária dos colaboradores ativos, também em
+    colaboradores equivalentes de 8h (gap positivo = falta gente).
+    """
+    hh_dia_necessarias = df_micro["hh_necessarias"].sum() / dias_uteis if dias_uteis > 0 else 0
+    capacidade_dia_atual = colabs.loc[colabs["ativo"] == "sim", "carga_diaria"].fillna(0).sum()
+    colabs_necessarios_8h = hh_dia_necessarias / 8 if hh_dia_necessarias > 0 else 0
+    colabs_atuais_equiv_8h = capacidade_dia_atual / 8 if capacidade_dia_atual > 0 else 0
+    return {
+        "hh_dia_necessarias": float(hh_dia_necessarias),
+        "capacidade_dia_atual": float(capacidade_dia_atual),
+        "colabs_necessarios_8h": float(colabs_necessarios_8h),
+        "colabs_atuais_equiv_8h": float(colabs_atuais_equiv_8h),
+        "gap_colabs_8h": float(colabs_necessarios_8h - colabs_atuais_equiv_8h),
+    }
+
+
+@instrumentar()
+def calcular_painel(periodos=None, dias_uteis=22):
+    """
+    Resultados do painel para os períodos pedidos (todos, se None), lidos do
+    armazenamento configurado. Retorna {nome: DataFrame}:
+    - resumo: um registro por período com o resumo_diario
+    - microareas: periodo x microarea (hh_necessarias, capacidade_mensal, saldo)
+    - colaboradores: periodo x colaborador (capacidade_mensal, hh_alocadas, utilizacao_%)
+    - contratacoes: plano de otimizar_contratacoes das micro-áreas em déficit
+    """
+    colabs = get_colaboradores()
+    df_micro, df_colab = calcular_alocacoes_lote(
+        colabs, get_atividades(), get_demanda_hh(periodos), get_matriz_pesos(), dias_uteis
+    )
+    resumo = pd.DataFrame(
+        [{"periodo": p, **resumo_diario(g, colabs, dias_uteis)} for p, g in df_micro.groupby("periodo")],
+        columns=["periodo", "hh_dia_necessarias", "capacidade_dia_atual",
+                 "colabs_necessarios_8h", "colabs_atuais_equiv_8h", "gap_colabs_8h"]
+    )
+    return {
+        "resumo": resumo,
+        "microareas": df_micro,
+        "colaboradores": df_colab,
+        "contratacoes": otimizar_contratacoes(df_micro, dias_uteis),
+    }
+
+
+def gravar_resultados(resultados, diretorio, formato="csv", prefixo="painel"):
+    """
+    Grava cada DataFrame de `resultados` em <diretorio>/<prefixo>_<nome>.<formato>
+    (JSON em lista de registros). Retorna os caminhos gravados.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = []
+    for nome, df in resultados.items():
+        path = os.path.join(diretorio, f"{prefixo}_{nome}.{formato}")
+        tmp = path + ".tmp"
+        if formato == "json":
+            df.to_json(tmp, orient="records", force_ascii=False, indent=2)
+        else:
+            df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        caminhos.append(path)
+    return caminhos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cálculos do app sem a interface (relatórios em lote).")
+    parser.add_argument("--metricas", help="Grava as medições da execução (JSON lines) neste arquivo")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    painel = comandos.add_parser("painel", help="Demanda x capacidade por período (CSV ou JSON)")
+    painel.add_argument("--periodo", action="append",
+                        help="Período AAAA-MM; repita para vários (padrão: todos com demanda)")
+    painel.add_argument("--dias-uteis", type=int, default=22)
+    painel.add_argument("--formato", choices=["csv", "json"], default="csv")
+    painel.add_argument("--saida", default=".", help="Diretório dos arquivos gerados")
+
+    programacao = comandos.add_parser("programacao", help="Carga dia a dia por colaborador de um período")
+    programacao.add_argument("--periodo", required=True, help="Período AAAA-MM")
+    programacao.add_argument("--feriado", action="append", default=[],
+                             help="Data AAAA-MM-DD fora dos dias úteis; repita para vários")
+    programacao.add_argument("--dias-uteis", type=int, default=22,
+                             help="Dias do período quando ele não é um mês AAAA-MM")
+    programacao.add_argument("--formato", choices=["csv", "json"], default="csv")
+    programacao.add_argument("--saida", default=".", help="Diretório dos arquivos gerados")
+
+    importar = comandos.add_parser("importar", help="Importa um CSV ou Excel para uma tabela do cadastro")
+    importar.add_argument("--tabela", required=True, choices=list(COLUNAS_IMPORTACAO))
+    importar.add_argument("arquivo", help="Arquivo .csv, .xlsx ou .xls")
+    importar.add_argument("--rejeitadas", help="Grava as linhas rejeitadas (com o motivo) neste CSV")
+
+    comandos.add_parser("periodos", help="Lista os períodos com demanda cadastrada")
+    comandos.add_parser("seed", help="Carrega as listas padrão de micro-áreas, atividades e colaboradores")
+    comandos.add_parser("compactar", help="Incorpora os journals às tabelas")
+    args = parser.parse_args(argv)
+
+    if args.comando == "periodos":
+        for periodo in listar_periodos():
+            print(periodo)
+    elif args.comando == "seed":
+        microareas, atividades = seed_default_microareas_atividades()
+        colabs = seed_default_colaboradores()
+        print(f"{len(microareas)} micro-áreas, {len(atividades)} atividades, {len(colabs)} colaboradores")
+    elif args.comando == "compactar":
+        compactar_tabelas()
+    elif args.comando == "importar":
+        try:
+            importadas, rejeitadas = importar_arquivo(args.tabela, args.arquivo)
+        except (ValueError, ImportError) as e:
+            parser.error(str(e))
+        print(f"{importadas} linhas importadas, {len(rejeitadas)} rejeitadas")
+        if args.rejeitadas:
+            rejeitadas.to_csv(args.rejeitadas, index=False)
+        else:
+            for r in rejeitadas.head(20).itertuples(index=False):
+                print(f"linha {r.linha}: {r.motivo}")
+    elif args.comando == "programacao":
+        if args.periodo not in listar_periodos():
+            parser.error(f"período sem demanda cadastrada: {args.periodo}")
+        try:
+            resultados = calcular_programacao(args.periodo, args.feriado, args.dias_uteis)
+        except ValueError as e:
+            parser.error(str(e))
+        for path in gravar_resultados(resultados, args.saida, args.formato, f"programacao_{args.periodo}"):
+            print(path)
+    else:
+        if args.dias_uteis <= 0:
+            parser.error("--dias-uteis deve ser positivo")
+        if args.periodo:
+            desconhecidos = sorted(set(args.periodo) - set(listar_periodos()))
+            if desconhecidos:
+                parser.error(f"períodos sem demanda cadastrada: {', '.join(desconhecidos)}")
+        resultados = calcular_painel(args.periodo, args.dias_uteis)
+        for path in gravar_resultados(resultados, args.saida, args.formato):
+            print(path)
+
+    if args.metricas:
+        with open(args.metricas, "w", encoding="utf-8") as f:
+            f.write(eventos_jsonl())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
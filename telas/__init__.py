@@ -0,0 +1,4 @@
+"""
+Telas do app, uma por módulo. app.main importa só o módulo da tela escolhida,
+na primeira vez em que ela é aberta no processo.
+"""
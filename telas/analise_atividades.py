@@ -0,0 +1,163 @@
+"""
+Tela de análise de atividades: mapas de calor e simulação da demanda.
+"""
+import streamlit as st
+import pandas as pd
+
+from engine import (
+    PERCENTIS_SIMULACAO,
+    calcular_capacidades,
+    get_matriz_pesos,
+    simular_demanda,
+)
+from telas.paginacao import paginar
+from telas.sessao import repositorio
+
+# com semente fixa o resultado só muda com os parâmetros ou com as tabelas
+# (que entram no hash), então reruns da tela não repetem os sorteios
+_simular_demanda = st.cache_data(max_entries=8, show_spinner=False)(simular_demanda)
+
+
+def tela_analise_atividades():
+    st.header("Análise de Atividades (tempo por projeto)")
+
+    repo = repositorio()
+    atividades = repo.tabela("atividades")
+    if atividades.empty:
+        st.warning("Não há atividades cadastradas. Vá em 'Micro-áreas & Atividades' para carregar a lista padrão.")
+        return
+
+    st.subheader("Parâmetros da análise")
+    num_projetos = st.number_input(
+        "Número de projetos para simulação",
+        min_value=1.0,
+        step=10.0,
+        value=500.0
+    )
+
+    df = atividades.copy()
+    df["min_por_unidade"] = (df["hh_por_unidade"].fillna(0) * 60).round(1)
+    df["fator_%"] = (df["fator_por_projeto"].fillna(0) * 100).round(1)
+    df["hh_por_projeto"] = (df["hh_por_unidade"].fillna(0) * df["fator_por_projeto"].fillna(0)).round(3)
+    df["min_por_projeto"] = (df["hh_por_projeto"] * 60).round(1)
+    df["hh_total_periodo"] = (df["hh_por_projeto"] * num_projetos).round(2)
+
+    st.subheader("Atividades ordenadas por tempo total no período")
+    col_target = f"hh em {int(num_projetos)} projetos"
+    micros_sel = st.multiselect(
+        "Micro-áreas", options=sorted(df["microarea"].dropna().unique()), key="rank_filtro_micros"
+    )
+    df_rank = df[df["microarea"].isin(micros_sel)] if micros_sel else df
+    df_rank = df_rank[["microarea", "nome", "min_por_unidade", "fator_%", "min_por_projeto", "hh_total_periodo"]]
+    nomes_rank = {
+        "microarea": "grupo",
+        "nome": "atividade",
+        "min_por_unidade": "min/execução",
+        "fator_%": "% projetos",
+        "min_por_projeto": "min/projeto",
+        "hh_total_periodo": col_target
+    }
+
+    # o gradiente é calculado só na página, com a escala de todas as atividades
+    escala = {"vmin": df["hh_total_periodo"].min(), "vmax": df["hh_total_periodo"].max()}
+    paginar(
+        df_rank, "rank_atividades",
+        ["hh_total_periodo", "min_por_projeto", "min_por_unidade", "fator_%", "nome", "microarea"],
+        estilo=lambda pagina: pagina.rename(columns=nomes_rank).style.background_gradient(
+            subset=[col_target], cmap="Reds", **escala
+        ),
+        crescente=False
+    )
+
+    st.markdown("---")
+    st.subheader("Resumo por grupo (micro-área)")
+
+    df_grp = df.groupby("microarea", as_index=False, observed=True).agg(
+        hh_por_projeto=("hh_por_projeto", "sum")
+    )
+    df_grp["hh_por_dia_proj"] = (df_grp["hh_por_projeto"] / 22).round(2)
+    df_grp["hh_total_periodo"] = (df_grp["hh_por_projeto"] * num_projetos).round(2)
+
+    df_grp.rename(columns={
+        "microarea": "grupo",
+        "hh_por_projeto": "hh/projeto (grupo)",
+        "hh_por_dia_proj": "hh/dia (22d, 1 projeto/dia)",
+        "hh_total_periodo": col_target
+    }, inplace=True)
+
+    st.dataframe(
+        df_grp.style.background_gradient(
+            subset=[col_target],
+            cmap="Reds"
+        ),
+        use_container_width=True
+    )
+
+    st.bar_chart(
+        df_grp.set_index("grupo")[col_target]
+    )
+
+    st.markdown(
+        "_Obs.: 'hh/projeto' considera o tempo da atividade multiplicado pela fração de projetos que exigem essa atividade (fator %)._"
+    )
+
+    st.markdown("---")
+    st.subheader("Simulação de cenários (Monte Carlo)")
+    st.caption(
+        "Cada projeto exige a atividade com probabilidade igual ao fator (% projetos). "
+        "A simulação sorteia vários mixes de projetos e mostra a faixa de hh esperada, "
+        "em vez do valor fixo (número de projetos x fator)."
+    )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_sorteios = st.number_input("Cenários sorteados", min_value=100, max_value=100000, value=10000, step=1000)
+    with col2:
+        dias_uteis = st.number_input("Dias úteis no período", min_value=15, max_value=31, value=22, step=1)
+    with col3:
+        seed = st.number_input("Semente", min_value=0, value=0, step=1)
+
+    df_sim_micro, df_sim_colab = _simular_demanda(
+        atividades, num_projetos, get_matriz_pesos(), int(n_sorteios), int(seed)
+    )
+    caps = calcular_capacidades(repo.tabela("colaboradores"), dias_uteis)
+    percentis = [f"p{p}" for p in PERCENTIS_SIMULACAO]
+
+    st.markdown("**Por micro-área**")
+    cap_micro = caps.groupby("microarea_principal", observed=True)["capacidade_mensal"].sum()
+    df_sim_micro["capacidade_mensal"] = df_sim_micro["microarea"].map(cap_micro).fillna(0)
+    df_sim_micro["saldo_p90"] = df_sim_micro["capacidade_mensal"] - df_sim_micro["p90"]
+    df_sim_micro = df_sim_micro.round(1).rename(columns={
+        "microarea": "grupo",
+        "hh_fixo": "hh (fixo)",
+        "hh_medio": "hh médio",
+        "capacidade_mensal": "capacidade (h)",
+        "saldo_p90": "saldo no P90 (h)",
+    })
+    st.dataframe(df_sim_micro, use_container_width=True)
+
+    if df_sim_colab.empty:
+        st.info("Sem vínculos colaborador x atividade: a simulação por colaborador não se aplica.")
+        return
+
+    st.markdown("**Por colaborador**")
+    df_sim_colab = df_sim_colab.merge(
+        caps[["id", "nome", "capacidade_mensal"]],
+        left_on="id_colaborador",
+        right_on="id",
+        how="left"
+    )
+    for p in percentis:
+        df_sim_colab[f"utilizacao_{p}_%"] = (
+            df_sim_colab[p] / df_sim_colab["capacidade_mensal"].replace(0, pd.NA) * 100
+        ).astype(float)
+    df_sim_colab = df_sim_colab[
+        ["nome", "capacidade_mensal", "hh_fixo", "hh_medio"] + percentis
+        + [f"utilizacao_{p}_%" for p in percentis]
+    ].round(1).rename(columns={
+        "nome": "colaborador",
+        "capacidade_mensal": "capacidade (h)",
+        "hh_fixo": "hh (fixo)",
+        "hh_medio": "hh médio",
+    })
+    st.dataframe(df_sim_colab, use_container_width=True)
@@ -0,0 +1,94 @@
+"""
+Tela de cenários: varredura what-if de projetos x dias úteis x tempos.
+"""
+import streamlit as st
+import numpy as np
+
+from engine import MAX_CENARIOS_TELA, varrer_cenarios
+from telas.sessao import repositorio
+
+
+def tela_cenarios():
+    st.header("Cenários - número de projetos x dias úteis")
+
+    repo = repositorio()
+    colabs = repo.tabela("colaboradores")
+    atividades = repo.tabela("atividades")
+    if atividades.empty or colabs.empty:
+        st.warning("Para simular cenários, é necessário ter colaboradores e atividades cadastradas.")
+        return
+
+    st.subheader("Grade de parâmetros")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        proj_min = st.number_input("Projetos (mín.)", min_value=1, value=300, step=50)
+        dias_min = st.number_input("Dias úteis (mín.)", min_value=1, max_value=31, value=18, step=1)
+    with col2:
+        proj_max = st.number_input("Projetos (máx.)", min_value=1, value=900, step=50)
+        dias_max = st.number_input("Dias úteis (máx.)", min_value=1, max_value=31, value=23, step=1)
+    with col3:
+        proj_passo = st.number_input("Passo de projetos", min_value=1, value=100, step=10)
+
+    projetos = np.arange(proj_min, max(proj_min, proj_max) + 1, proj_passo)
+    dias = np.arange(dias_min, max(dias_min, dias_max) + 1)
+
+    opcoes = dict(zip(atividades["id"].astype(int), atividades["microarea"].fillna("").astype(str) + " - " + atividades["nome"].astype(str)))
+    selecionadas = st.multiselect(
+        "Atividades com tempos alternativos (opcional)",
+        options=list(opcoes),
+        format_func=lambda i: opcoes[i]
+    )
+    tempos = {}
+    for atividade_id in selecionadas:
+        atual = repo.linha("atividades", atividade_id)["hh_por_unidade"] * 60
+        texto = st.text_input(
+            f"Tempos (min) para {opcoes[atividade_id]}, separados por vírgula",
+            value=f"{atual:g}",
+            key=f"cenario_tempos_{atividade_id}"
+        )
+        try:
+            tempos[atividade_id] = [float(t) for t in texto.replace(";", ",").split(",") if t.strip()]
+        except ValueError:
+            st.error(f"Tempos inválidos para {opcoes[atividade_id]}: use números separados por vírgula.")
+            return
+
+    n_cenarios = int(np.prod([len(v) for v in tempos.values() if v])) * len(projetos) * len(dias)
+    if n_cenarios > MAX_CENARIOS_TELA:
+        st.warning(f"{n_cenarios} cenários: reduza a grade para até {MAX_CENARIOS_TELA}.")
+        return
+
+    df = varrer_cenarios(atividades, colabs, projetos, dias, tempos)
+    n_variantes = df["variante"].nunique()
+    st.caption(f"{n_cenarios} cenários avaliados.")
+
+    variante = df["variante"].iloc[0]
+    if n_variantes > 1:
+        variante = st.selectbox("Variante de tempos", df["variante"].unique())
+    df = df[df["variante"] == variante]
+
+    st.subheader("Mapa de viabilidade (saldo em horas: capacidade - demanda)")
+    pior = "Pior micro-área"
+    micro_sel = st.selectbox("Micro-área", [pior] + sorted(df["microarea"].dropna().unique().tolist()))
+    base = df if micro_sel == pior else df[df["microarea"] == micro_sel]
+    mapa = base.pivot_table(index="num_projetos", columns="dias_uteis", values="saldo", aggfunc="min")
+    mapa.index = mapa.index.astype(int)
+    mapa.columns = mapa.columns.astype(int)
+    limite = max(abs(mapa.min().min()), abs(mapa.max().max()), 1)
+    st.dataframe(
+        mapa.round(0).style.background_gradient(cmap="RdYlGn", vmin=-limite, vmax=limite),
+        use_container_width=True
+    )
+
+    st.subheader("Micro-áreas em déficit por cenário")
+    df_deficit = df[df["saldo"] < 0]
+    if df_deficit.empty:
+        st.success("Nenhuma micro-área fica em déficit na grade informada.")
+    else:
+        contagem = df_deficit.pivot_table(
+            index="num_projetos", columns="dias_uteis", values="microarea", aggfunc="count"
+        ).reindex(index=mapa.index, columns=mapa.columns).fillna(0).astype(int)
+        st.dataframe(contagem, use_container_width=True)
+
+        st.markdown("**% dos cenários em que cada micro-área fica em déficit**")
+        frac = (df.assign(deficit=df["saldo"] < 0).groupby("microarea")["deficit"].mean() * 100).round(1)
+        st.dataframe(frac[frac > 0].sort_values(ascending=False).rename("% cenários em déficit"), use_container_width=True)
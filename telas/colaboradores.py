@@ -0,0 +1,376 @@
+"""
+Tela de cadastro de colaboradores e vínculos com atividades.
+"""
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from engine import (
+    CARGOS,
+    alteracoes_vinculos,
+    carga_diaria_cargo,
+    com_retentativa,
+    matriz_vinculos,
+    seed_default_colaboradores,
+)
+from telas.paginacao import paginar
+from telas.sessao import repositorio
+
+
+def tela_colaboradores():
+    st.header("Cadastro de Colaboradores")
+
+    repo = repositorio()
+    colabs = repo.tabela("colaboradores")
+    microareas = repo.tabela("microareas")
+    atividades = repo.tabela("atividades")
+
+    if st.button("Carregar lista padrão de colaboradores"):
+        seed_default_colaboradores()
+        colabs = repo.tabela("colaboradores")
+        st.success("Colaboradores padrão carregados/atualizados com sucesso!")
+
+    # Novo colaborador
+    st.subheader("Novo colaborador")
+
+    with st.form("form_colaborador"):
+        nome = st.text_input("Nome")
+
+        cargo = st.selectbox("Cargo", CARGOS)
+
+        carga_default = carga_diaria_cargo(cargo)
+
+        carga_diaria = st.number_input(
+            "Carga horária diária (h)",
+            min_value=1.0, max_value=12.0,
+            value=carga_default, step=0.5
+        )
+
+        ativo = st.checkbox("Ativo", value=True)
+
+        submitted = st.form_submit_button("Salvar colaborador")
+
+        if submitted:
+            if not nome:
+                st.error("Informe o nome do colaborador.")
+            else:
+                new = {
+                    "nome": nome,
+                    "cargo": cargo,
+                    "carga_diaria": carga_diaria,
+                    "microarea_principal_id": None,
+                    "microareas_secundarias": "",
+                    "ativo": "sim" if ativo else "nao"
+                }
+                repo.inserir("colaboradores", pd.DataFrame([new]))
+                colabs = repo.tabela("colaboradores")
+                st.success("Colaborador salvo com sucesso!")
+
+    # Lista de colaboradores
+    st.subheader("Colaboradores cadastrados")
+    if colabs.empty:
+        st.info("Nenhum colaborador cadastrado ainda.")
+    else:
+        df_show = colabs.copy()
+        df_show["capacidade_diaria"] = df_show["carga_diaria"].fillna(0)
+        df_show["capacidade_mensal_22d"] = df_show["capacidade_diaria"] * 22
+        st.dataframe(df_show, use_container_width=True)
+
+    # Editar / excluir colaborador
+    st.subheader("Editar / excluir colaborador")
+    if not colabs.empty:
+        nomes_colab = colabs["nome"].tolist()
+        sel_nome = st.selectbox("Selecione um colaborador para editar/excluir", options=[""] + nomes_colab)
+        if sel_nome:
+            row = repo.linha("colaboradores", sel_nome, "nome")
+            col1, col2 = st.columns(2)
+            with col1:
+                novo_nome = st.text_input("Nome", value=row["nome"], key="edit_colab_nome")
+                cargo_lista = CARGOS
+                idx_cargo = cargo_lista.index(row["cargo"]) if row["cargo"] in cargo_lista else 0
+                novo_cargo = st.selectbox(
+                    "Cargo",
+                    cargo_lista,
+                    index=idx_cargo,
+                    key="edit_colab_cargo"
+                )
+                nova_carga = st.number_input(
+                    "Carga horária diária (h)",
+                    min_value=1.0, max_value=12.0,
+                    value=float(row["carga_diaria"]) if not pd.isna(row["carga_diaria"]) else 8.0,
+                    step=0.5,
+                    key="edit_colab_carga"
+                )
+            with col2:
+                micro_princ = st.selectbox(
+                    "Micro-área principal",
+                    options=[""] + microareas["nome"].tolist(),
+                    index=0 if row["microarea_principal"] not in microareas["nome"].tolist()
+                    else ([""] + microareas["nome"].tolist()).index(row["microarea_principal"]),
+                    key="edit_colab_micro"
+                )
+                ativo_flag = st.checkbox("Ativo", value=(row["ativo"] == "sim"), key="edit_colab_ativo")
+
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if st.button("Salvar alterações do colaborador"):
+                    repo.atualizar("colaboradores", {
+                        "nome": novo_nome,
+                        "cargo": novo_cargo,
+                        "carga_diaria": nova_carga,
+                        "microarea_principal_id": _id_microarea(repo, micro_princ),
+                        "ativo": "sim" if ativo_flag else "nao",
+                    }, id=row["id"])
+                    colabs = repo.tabela("colaboradores")
+                    st.success("Colaborador atualizado.")
+            with col_b:
+                if st.button("Excluir colaborador"):
+                    repo.excluir("colab_atividades", colab_id=row["id"])
+                    repo.excluir("colaboradores", id=row["id"])
+                    colabs = repo.tabela("colaboradores")
+                    st.success("Colaborador excluído.")
+
+    if colabs.empty or atividades.empty or microareas.empty:
+        st.info("Cadastre colaboradores, micro-áreas e atividades para configurar área de atuação.")
+        return
+
+    # Vincular atividades a um colaborador (modo por colaborador)
+    st.subheader("Vincular atividades a um colaborador (modo por colaborador)")
+
+    with st.form("form_atuacao_colab"):
+        colab_nome = st.selectbox(
+            "Colaborador",
+            options=colabs["nome"].tolist()
+        )
+        colab_row = repo.linha("colaboradores", colab_nome, "nome")
+        colab_id = int(colab_row["id"])
+
+        micro_princ = st.selectbox(
+            "Micro-área principal deste colaborador",
+            options=[""] + microareas["nome"].tolist(),
+            index=0 if colab_row["microarea_principal"] not in microareas["nome"].tolist()
+            else ([""] + microareas["nome"].tolist()).index(colab_row["microarea_principal"])
+        )
+
+        micro_sel = st.selectbox(
+            "Micro-área das atividades a vincular",
+            options=microareas["nome"].tolist()
+        )
+
+        atividades_micro = atividades[atividades["microarea"] == micro_sel]
+        if atividades_micro.empty:
+            st.warning("Não há atividades cadastradas para esta micro-área.")
+            atividades_sel = []
+        else:
+            atividades_sel = st.multiselect(
+                "Atividades para vincular a este colaborador",
+                options=atividades_micro["nome"].tolist()
+            )
+
+        percentual = st.number_input(
+            "Percentual de participação do colaborador em cada atividade selecionada (%)",
+            min_value=0.0, max_value=100.0, value=50.0, step=5.0
+        )
+
+        submitted_atuacao = st.form_submit_button("Salvar vínculos de atividades (por colaborador)")
+
+        if submitted_atuacao:
+            repo.atualizar("colaboradores", {"microarea_principal_id": _id_microarea(repo, micro_princ)}, id=colab_id)
+
+            if not atividades_sel:
+                st.error("Selecione ao menos uma atividade.")
+            else:
+                novos = []
+                for atividade_id in repo.ids("atividades", atividades_sel):
+                    novos.append({
+                        "colab_id": colab_id,
+                        "atividade_id": int(atividade_id),
+                        "percentual": percentual
+                    })
+                if novos:
+                    repo.inserir("colab_atividades", pd.DataFrame(novos))
+                    st.success("Vínculos de atividades registrados para o colaborador.")
+
+    # Vincular vários colaboradores a uma atividade (modo por atividade)
+    st.subheader("Vincular vários colaboradores a uma atividade (modo por atividade)")
+
+    with st.form("form_atuacao_atividade"):
+        micro_sel2 = st.selectbox(
+            "Micro-área da atividade",
+            options=microareas["nome"].tolist()
+        )
+
+        atividades_micro2 = atividades[atividades["microarea"] == micro_sel2]
+        if atividades_micro2.empty:
+            st.warning("Não há atividades cadastradas para esta micro-área.")
+            atividade_nome2 = None
+        else:
+            atividade_nome2 = st.selectbox(
+                "Atividade",
+                options=atividades_micro2["nome"].tolist()
+            )
+
+        nomes_colabs = colabs["nome"].tolist()
+        colabs_sel = st.multiselect(
+            "Colaboradores que participarão desta atividade",
+            options=nomes_colabs
+        )
+
+        percentuais = {}
+        if atividade_nome2 and colabs_sel:
+            st.markdown("**Percentual de participação por colaborador (%)**")
+            for nome_c, cid in zip(colabs_sel, repo.ids("colaboradores", colabs_sel)):
+                cid = int(cid)
+                key_input = f"pct_{cid}_{atividade_nome2}"
+                valor = st.number_input(
+                    f"{nome_c} (%)",
+                    min_value=0.0, max_value=100.0,
+                    value=0.0,
+                    step=5.0,
+                    key=key_input
+                )
+                percentuais[cid] = valor
+
+        submitted_atuacao2 = st.form_submit_button("Salvar vínculos de colaboradores (por atividade)")
+
+        if submitted_atuacao2:
+            if not atividade_nome2:
+                st.error("Selecione uma atividade.")
+            elif not colabs_sel:
+                st.error("Selecione pelo menos um colaborador.")
+            else:
+                atividade_id2 = int(repo.ids("atividades", [atividade_nome2])[0])
+
+                def gravar_vinculos():
+                    # vínculos existentes mantêm o id; todos são regravados numa única escrita
+                    vinculos = repo.tabela("colab_atividades")
+                    versao = repo.versao("colab_atividades")
+                    existentes = vinculos[vinculos["atividade_id"] == atividade_id2]
+                    ids = dict(zip(
+                        pd.to_numeric(existentes["colab_id"], errors="coerce"),
+                        existentes["id"]
+                    ))
+                    linhas = pd.DataFrame([{
+                        "id": ids.get(cid, np.nan),
+                        "colab_id": cid,
+                        "atividade_id": atividade_id2,
+                        "percentual": pct
+                    } for cid, pct in percentuais.items()])
+                    repo.substituir(
+                        "colab_atividades", linhas, versao=versao,
+                        atividade_id=atividade_id2, colab_id=list(percentuais)
+                    )
+
+                com_retentativa(gravar_vinculos)
+                st.success("Participações por atividade atualizadas.")
+
+    # Vínculos cadastrados (a edição é pela grade abaixo)
+    st.subheader("Vínculos de colaborador x atividade")
+    colab_ativ = repo.tabela("colab_atividades")
+    if colab_ativ.empty:
+        st.info("Ainda não há atividades vinculadas a colaboradores.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            colabs_filtro = st.multiselect(
+                "Colaboradores", options=colabs["nome"].dropna().tolist(), key="vinc_filtro_colabs"
+            )
+        with col2:
+            micros_filtro = st.multiselect(
+                "Micro-áreas", options=microareas["nome"].dropna().tolist(), key="vinc_filtro_micros"
+            )
+        if colabs_filtro:
+            colab_ativ = colab_ativ[colab_ativ["colab_id"].isin(repo.ids("colaboradores", colabs_filtro))]
+        if micros_filtro:
+            colab_ativ = colab_ativ[colab_ativ["microarea"].isin(micros_filtro)]
+
+        # nomes por mapeamento pelo id (sem merge da tabela inteira)
+        df_map_show = pd.DataFrame({
+            "id_vinculo": colab_ativ["id"],
+            "colaborador": colab_ativ["colab_id"].map(colabs.drop_duplicates(subset="id").set_index("id")["nome"]),
+            "atividade": colab_ativ["atividade_id"].map(atividades.drop_duplicates(subset="id").set_index("id")["nome"]),
+            "microarea": colab_ativ["microarea"],
+            "percentual": colab_ativ["percentual"],
+        })
+        paginar(df_map_show, "vinc_tabela", ["colaborador", "atividade", "microarea", "percentual", "id_vinculo"])
+
+    _grade_vinculos(repo, colabs, microareas, atividades)
+
+
+def _id_microarea(repo, nome):
+    # "" (nenhuma) -> sem micro-área
+    return int(repo.ids("microareas", [nome])[0]) if nome else None
+
+
+def _rotulos(df):
+    # nomes como rótulos da grade; nomes repetidos levam o id
+    nomes = df["nome"].astype(str)
+    repetido = nomes.duplicated(keep=False)
+    return nomes.where(~repetido, nomes + " (#" + df["id"].astype(str) + ")").tolist()
+
+
+def _grade_vinculos(repo, colabs, microareas, atividades):
+    """
+    Percentuais colaborador x atividade de uma micro-área numa grade editável;
+    só as células alteradas são gravadas, numa única escrita.
+    """
+    st.subheader("Editar participações em grade (colaborador x atividade)")
+    if "grade_mensagem" in st.session_state:
+        st.success(st.session_state.pop("grade_mensagem"))
+
+    micro = st.selectbox("Micro-área", options=microareas["nome"].tolist(), key="grade_micro")
+    ativ_micro = atividades[atividades["microarea"] == micro]
+    if ativ_micro.empty:
+        st.info("Não há atividades cadastradas para esta micro-área.")
+        return
+
+    # linhas: quem já atua na micro-área (vínculo ou micro-área principal) e os incluídos
+    vinculos = repo.tabela("colab_atividades")
+    atuantes = vinculos.loc[vinculos["atividade_id"].isin(ativ_micro["id"]), "colab_id"]
+    incluidos = st.multiselect(
+        "Incluir colaboradores na grade", options=colabs["nome"].dropna().tolist(), key=f"grade_incluir_{micro}"
+    )
+    linhas_grade = colabs[
+        colabs["id"].isin(atuantes) | (colabs["microarea_principal"] == micro) | colabs["nome"].isin(incluidos)
+    ]
+    if linhas_grade.empty:
+        st.info("Nenhum colaborador atua nesta micro-área; inclua colaboradores na grade.")
+        return
+
+    antes = matriz_vinculos(vinculos, linhas_grade["id"].tolist(), ativ_micro["id"].tolist())
+    colunas = _rotulos(ativ_micro)
+    chave = f"grade_{micro}"
+    editada = st.data_editor(
+        antes.set_axis(_rotulos(linhas_grade), axis=0).set_axis(colunas, axis=1),
+        column_config={
+            c: st.column_config.NumberColumn(c, min_value=0.0, max_value=100.0, step=5.0, format="%.0f%%")
+            for c in colunas
+        },
+        use_container_width=True,
+        key=chave
+    )
+    st.caption("Percentual de participação (%). Célula vazia = sem vínculo; apagar um percentual exclui o vínculo.")
+
+    if st.button("Salvar alterações da grade"):
+        depois = editada.set_axis(antes.index, axis=0).set_axis(antes.columns, axis=1)
+
+        def gravar_grade():
+            vinculos = repo.tabela("colab_atividades")
+            versao = repo.versao("colab_atividades")
+            linhas, ids = alteracoes_vinculos(vinculos, antes, depois)
+            if ids:
+                repo.substituir("colab_atividades", linhas, versao=versao, id=ids)
+            elif not linhas.empty:
+                repo.inserir("colab_atividades", linhas.drop(columns="id"), versao=versao)
+            return len(linhas), len(ids)
+
+        gravadas, substituidas = com_retentativa(gravar_grade)
+        if not gravadas and not substituidas:
+            st.info("Nenhuma alteração na grade.")
+            return
+        # a grade volta a partir da tabela gravada, sem as edições pendentes
+        st.session_state.pop(chave, None)
+        st.session_state["grade_mensagem"] = (
+            f"Grade salva: {gravadas} vínculos gravados, {substituidas} substituídos ou excluídos."
+        )
+        st.rerun()
@@ -0,0 +1,29 @@
+"""
+Widgets do plano de contratações usados pelo Painel e por Tendências.
+"""
+import streamlit as st
+
+from engine import CARGOS_CONTRATACAO
+
+
+def limites_contratacao(chave):
+    """
+    Limites opcionais de contratações por cargo (por micro-área) informados na tela.
+    """
+    limites = {}
+    with st.expander("Limites de contratação por cargo (por micro-área)"):
+        cols = st.columns(len(CARGOS_CONTRATACAO))
+        for col, cargo in zip(cols, CARGOS_CONTRATACAO):
+            with col:
+                valor = st.number_input(
+                    f"Máx. {cargo}", min_value=0, value=None, step=1,
+                    placeholder="sem limite", key=f"limite_{chave}_{cargo}"
+                )
+            if valor is not None:
+                limites[cargo] = int(valor)
+    return limites
+
+
+def avisar_horas_descobertas(plano):
+    if (plano["horas_descobertas"] > 0).any():
+        st.warning("Os limites por cargo não cobrem todo o déficit: veja a coluna horas_descobertas.")
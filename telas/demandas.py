@@ -0,0 +1,127 @@
+"""
+Tela de demandas: cronograma de projetos e geração das demandas por período.
+"""
+import streamlit as st
+import pandas as pd
+
+from engine import (
+    gerar_demandas,
+    listar_periodos,
+    preparar_cronograma,
+)
+from telas.paginacao import paginar
+from telas.sessao import repositorio
+
+
+def tela_demandas():
+    st.header("Cadastro de Demandas")
+
+    repo = repositorio()
+    atividades = repo.tabela("atividades")
+
+    if atividades.empty:
+        st.warning("Cadastre atividades antes de inserir demanda.")
+        return
+
+    st.subheader("Gerar demandas automaticamente a partir do número de projetos")
+
+    with st.form("form_demanda_projetos"):
+        periodo = st.text_input("Período (ex.: 2025-11)", value="")
+        num_projetos = st.number_input(
+            "Quantidade de projetos no período",
+            min_value=0.0, step=1.0, value=0.0
+        )
+
+        submitted_auto = st.form_submit_button("Gerar demandas para o período")
+
+        if submitted_auto:
+            if not periodo:
+                st.error("Informe o período.")
+            elif num_projetos <= 0:
+                st.error("Informe uma quantidade de projetos maior que zero.")
+            else:
+                cronograma = pd.DataFrame({"periodo": [periodo], "num_projetos": [num_projetos]})
+                novas_dem = gerar_demandas(atividades, cronograma)
+
+                if not novas_dem.empty:
+                    repo.gravar_demandas(novas_dem, [periodo])
+                    st.success("Demandas geradas automaticamente a partir do número de projetos.")
+
+    st.subheader("Gerar demandas para vários períodos (cronograma de projetos)")
+
+    arquivo = st.file_uploader(
+        "Cronograma em CSV ou Excel com as colunas periodo e num_projetos (opcional)",
+        type=["csv", "xlsx", "xls"]
+    )
+    cronograma = pd.DataFrame({"periodo": [""], "num_projetos": [0.0]})
+    if arquivo is not None:
+        try:
+            if arquivo.name.lower().endswith(".csv"):
+                cronograma = pd.read_csv(arquivo, dtype={"periodo": str})
+            else:
+                cronograma = pd.read_excel(arquivo, dtype={"periodo": str})
+        except ImportError:
+            st.error("Leitura de Excel requer o pacote openpyxl. Envie o cronograma em CSV.")
+        except (ValueError, pd.errors.ParserError) as e:
+            st.error(f"Não foi possível ler o arquivo: {e}")
+
+    cronograma = st.data_editor(
+        cronograma,
+        num_rows="dynamic",
+        use_container_width=True,
+        key=f"editor_cronograma_{arquivo.name if arquivo is not None else ''}"
+    )
+
+    if st.button("Gerar demandas do cronograma"):
+        cron = preparar_cronograma(cronograma)
+        if cron.empty:
+            st.error("Informe ao menos um período com quantidade de projetos maior que zero.")
+        else:
+            novas_dem = gerar_demandas(atividades, cron)
+            repo.gravar_demandas(novas_dem, cron["periodo"].tolist())
+            st.success(f"{len(novas_dem)} demandas geradas para {len(cron)} períodos.")
+
+    st.subheader("Demandas cadastradas")
+
+    demandas = repo.tabela("demandas")
+    if demandas.empty:
+        st.info("Nenhuma demanda cadastrada ainda.")
+    else:
+        # filtros antes de montar a tabela exibida; atividade e hh vêm por
+        # mapeamento pelo id, sem merge da tabela inteira
+        col1, col2 = st.columns(2)
+        with col1:
+            periodos_sel = st.multiselect("Períodos", options=listar_periodos(), key="dem_filtro_periodos")
+        with col2:
+            micros_sel = st.multiselect(
+                "Micro-áreas", options=sorted(atividades["microarea"].dropna().unique()), key="dem_filtro_micros"
+            )
+        if periodos_sel:
+            demandas = demandas[demandas["periodo"].isin(periodos_sel)]
+        if micros_sel:
+            ids_micro = atividades.loc[atividades["microarea"].isin(micros_sel), "id"]
+            demandas = demandas[demandas["atividade_id"].isin(ids_micro)]
+
+        por_id = atividades.drop_duplicates(subset="id").set_index("id")
+        df_show = pd.DataFrame({
+            "id_demanda": demandas["id"],
+            "periodo": demandas["periodo"],
+            "atividade": demandas["atividade_id"].map(por_id["nome"]),
+            "microarea": demandas["atividade_id"].map(por_id["microarea"]),
+            "quantidade": demandas["quantidade"],
+            "hh_por_unidade": demandas["atividade_id"].map(por_id["hh_por_unidade"]),
+        })
+        df_show["hh_total_atividade"] = df_show["quantidade"] * df_show["hh_por_unidade"]
+        paginar(
+            df_show, "dem_tabela",
+            ["periodo", "atividade", "microarea", "quantidade", "hh_total_atividade", "id_demanda"]
+        )
+
+    st.subheader("Excluir demandas de um período")
+    periodos = listar_periodos()
+    if periodos:
+        sel_per = st.selectbox("Período para limpar demandas", options=[""] + periodos)
+        if sel_per:
+            if st.button("Excluir todas as demandas desse período"):
+                repo.excluir_demandas([sel_per])
+                st.success(f"Demandas do período {sel_per} excluídas.")
@@ -0,0 +1,63 @@
+"""
+Tela de importação em lote: CSV ou Excel de colaboradores, atividades,
+vínculos ou demandas, validado e gravado de uma vez pelo repositório da sessão.
+"""
+import streamlit as st
+
+from engine import CARGOS, COLUNAS_IMPORTACAO, importar_arquivo
+from telas.paginacao import paginar
+from telas.sessao import repositorio
+
+TABELAS = {
+    "Colaboradores": "colaboradores",
+    "Atividades": "atividades",
+    "Vínculos colaborador x atividade": "colab_atividades",
+    "Demandas": "demandas",
+}
+
+AJUDA = {
+    "colaboradores": f"cargo: um de {', '.join(CARGOS)}; "
+                     "carga_diaria em horas (vazia = carga do cargo); ativo: sim/nao.",
+    "atividades": "minutos por execução (ou hh_por_unidade) e percentual dos projetos 0-100 "
+                  "(ou fator_por_projeto); microarea e responsavel_funcao já cadastrados.",
+    "colab_atividades": "colaborador (ou colab_id) e atividade (ou atividade_id) já cadastrados; "
+                        "percentual 0-100. Vínculos existentes têm o percentual substituído.",
+    "demandas": "periodo AAAA-MM, atividade (ou atividade_id) e quantidade >= 0. "
+                "As demandas dos períodos do arquivo substituem as cadastradas; "
+                "um período com alguma linha rejeitada não é importado.",
+}
+
+
+def tela_importacao():
+    st.header("Importação em lote")
+
+    repo = repositorio()
+    rotulo = st.selectbox("Tabela", list(TABELAS))
+    tabela = TABELAS[rotulo]
+    st.caption(f"Colunas: {', '.join(COLUNAS_IMPORTACAO[tabela])}. {AJUDA[tabela]}")
+
+    arquivo = st.file_uploader("Arquivo CSV ou Excel", type=["csv", "xlsx", "xls"], key=f"imp_arquivo_{tabela}")
+    if arquivo is not None and st.button("Importar"):
+        try:
+            importadas, rejeitadas = importar_arquivo(tabela, arquivo, arquivo.name, repo)
+        except (ValueError, ImportError) as e:
+            st.error(str(e))
+        else:
+            st.session_state["imp_resultado"] = (tabela, arquivo.name, importadas, rejeitadas)
+
+    resultado = st.session_state.get("imp_resultado")
+    if resultado is None or resultado[0] != tabela:
+        return
+    _, nome_arquivo, importadas, rejeitadas = resultado
+    st.success(f"{importadas} linhas de {nome_arquivo} importadas.")
+    if rejeitadas.empty:
+        return
+
+    st.subheader(f"Linhas rejeitadas ({len(rejeitadas)})")
+    paginar(rejeitadas, "imp_rejeitadas", ["linha", "motivo"])
+    st.download_button(
+        "Baixar linhas rejeitadas (CSV)",
+        data=rejeitadas.to_csv(index=False).encode("utf-8"),
+        file_name=f"rejeitadas_{tabela}.csv",
+        mime="text/csv"
+    )
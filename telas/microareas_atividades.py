@@ -0,0 +1,199 @@
+"""
+Tela de cadastro de micro-áreas e atividades.
+"""
+import streamlit as st
+import pandas as pd
+
+from engine import com_retentativa, seed_default_microareas_atividades
+from telas.sessao import repositorio
+
+
+def tela_microareas_atividades():
+    st.header("Cadastro de Micro-áreas e Atividades")
+
+    repo = repositorio()
+    microareas = repo.tabela("microareas")
+    atividades = repo.tabela("atividades")
+    colabs = repo.tabela("colaboradores")
+
+    if st.button("Carregar lista padrão de micro-áreas e atividades"):
+        seed_default_microareas_atividades()
+        microareas, atividades = repo.tabela("microareas"), repo.tabela("atividades")
+        st.success("Lista padrão carregada/atualizada com sucesso!")
+
+    tab_micro, tab_ativ = st.tabs(["Micro-áreas", "Atividades"])
+
+    # Micro-áreas
+    with tab_micro:
+        st.subheader("Nova micro-área")
+        with st.form("form_micro"):
+            nome = st.text_input("Nome da micro-área")
+            descricao = st.text_area("Descrição (opcional)")
+            submitted = st.form_submit_button("Salvar micro-área")
+
+            if submitted:
+                if not nome:
+                    st.error("Informe um nome para a micro-área.")
+                else:
+                    def gravar_microarea():
+                        # nome conferido e inserido na mesma versão da tabela
+                        atuais = repo.tabela("microareas")
+                        versao = repo.versao("microareas")
+                        if (atuais["nome"] == nome).any():
+                            return False
+                        repo.inserir(
+                            "microareas", pd.DataFrame([{"nome": nome, "descricao": descricao}]), versao=versao
+                        )
+                        return True
+
+                    if com_retentativa(gravar_microarea):
+                        microareas = repo.tabela("microareas")
+                        st.success("Micro-área salva com sucesso!")
+                    else:
+                        st.warning("Já existe uma micro-área com esse nome.")
+
+        st.subheader("Micro-áreas cadastradas")
+        if microareas.empty:
+            st.info("Nenhuma micro-área cadastrada ainda.")
+        else:
+            st.dataframe(microareas, use_container_width=True)
+
+        # Editar / excluir micro-área
+        st.subheader("Editar / excluir micro-área")
+        if not microareas.empty:
+            nomes_micro = microareas["nome"].tolist()
+            sel_micro = st.selectbox("Selecione uma micro-área", options=[""] + nomes_micro)
+            if sel_micro:
+                row = repo.linha("microareas", sel_micro, "nome")
+                novo_nome = st.text_input("Nome da micro-área", value=row["nome"], key="edit_micro_nome")
+                nova_desc = st.text_area("Descrição", value=row["descricao"] if row["descricao"] else "", key="edit_micro_desc")
+
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    if st.button("Salvar alterações da micro-área"):
+                        # as outras tabelas guardam o id: renomear é atualizar só esta linha
+                        repo.atualizar("microareas", {"nome": novo_nome, "descricao": nova_desc}, id=row["id"])
+                        st.success("Micro-área atualizada.")
+                with col_b:
+                    if st.button("Excluir micro-área"):
+                        # referências à micro-área excluída ficam vazias, não órfãs
+                        repo.atualizar_atividades({"microarea_id": None}, microarea_id=row["id"])
+                        repo.atualizar("colaboradores", {"microarea_principal_id": None}, microarea_principal_id=row["id"])
+                        repo.excluir("microareas", id=row["id"])
+                        st.success("Micro-área excluída. Atividades e colaboradores dela ficaram sem micro-área.")
+
+    # Atividades
+    with tab_ativ:
+        st.subheader("Nova atividade (tempo em minutos)")
+
+        with st.form("form_ativ"):
+            nome_ativ = st.text_input("Nome da atividade")
+            micro = st.selectbox(
+                "Micro-área",
+                options=[""] + microareas["nome"].tolist()
+            )
+            categoria = st.text_input(
+                "Categoria (ensaio, relatório, setup, análise, etc.)",
+                value=""
+            )
+            responsavel_funcao = st.selectbox(
+                "Responsável pela função (opcional)",
+                options=[""] + colabs["nome"].tolist()
+            )
+
+            min_por_unidade = st.number_input(
+                "Tempo por execução da atividade (minutos)",
+                min_value=0.0, step=5.0, value=60.0
+            )
+            fator_por_projeto = st.number_input(
+                "Fator por projeto (quantas execuções dessa atividade por projeto)",
+                min_value=0.0, step=0.1, value=1.0
+            )
+            submitted_ativ = st.form_submit_button("Salvar atividade")
+
+            if submitted_ativ:
+                if not nome_ativ or not micro:
+                    st.error("Informe pelo menos nome da atividade e micro-área.")
+                else:
+                    hh_por_unidade = min_por_unidade / 60.0
+                    new = {
+                        "nome": nome_ativ,
+                        "microarea_id": int(repo.ids("microareas", [micro])[0]),
+                        "categoria": categoria,
+                        "responsavel_funcao": responsavel_funcao,
+                        "hh_por_unidade": hh_por_unidade,
+                        "fator_por_projeto": fator_por_projeto
+                    }
+                    repo.inserir_atividades(pd.DataFrame([new]))
+                    atividades = repo.tabela("atividades")
+                    st.success("Atividade salva com sucesso!")
+
+        st.subheader("Atividades cadastradas")
+        if atividades.empty:
+            st.info("Nenhuma atividade cadastrada ainda.")
+        else:
+            df_show = atividades.copy()
+            df_show["min_por_unidade"] = (df_show["hh_por_unidade"].fillna(0) * 60).round(1)
+            df_show["fator_%"] = (df_show["fator_por_projeto"].fillna(0) * 100).round(1)
+            st.dataframe(df_show, use_container_width=True)
+
+        # Editar / excluir atividade
+        st.subheader("Editar / excluir atividade")
+        if not atividades.empty:
+            nomes_ativ = atividades["nome"].tolist()
+            sel_ativ = st.selectbox("Selecione uma atividade", options=[""] + nomes_ativ)
+            if sel_ativ:
+                row = repo.linha("atividades", sel_ativ, "nome")
+                col1, col2 = st.columns(2)
+                with col1:
+                    novo_nome = st.text_input("Nome da atividade", value=row["nome"], key="edit_ativ_nome")
+                    micro = st.selectbox(
+                        "Micro-área",
+                        options=microareas["nome"].tolist(),
+                        index=microareas["nome"].tolist().index(row["microarea"]) if row["microarea"] in microareas["nome"].tolist() else 0,
+                        key="edit_ativ_micro"
+                    )
+                    categoria = st.text_input(
+                        "Categoria",
+                        value=row["categoria"] if row["categoria"] else "",
+                        key="edit_ativ_cat"
+                    )
+                with col2:
+                    responsavel_funcao = st.selectbox(
+                        "Responsável pela função",
+                        options=[""] + colabs["nome"].tolist(),
+                        index=([""] + colabs["nome"].tolist()).index(row["responsavel_funcao"]) if row["responsavel_funcao"] in colabs["nome"].tolist() else 0,
+                        key="edit_ativ_resp"
+                    )
+                    min_por_unidade_edit = st.number_input(
+                        "Tempo por execução (minutos)",
+                        min_value=0.0,
+                        step=5.0,
+                        value=float(row["hh_por_unidade"]) * 60.0 if not pd.isna(row["hh_por_unidade"]) else 60.0,
+                        key="edit_ativ_min"
+                    )
+                    fator_por_projeto = st.number_input(
+                        "Fator por projeto",
+                        min_value=0.0,
+                        step=0.1,
+                        value=float(row["fator_por_projeto"]) if not pd.isna(row["fator_por_projeto"]) else 1.0,
+                        key="edit_ativ_fator"
+                    )
+
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    if st.button("Salvar alterações da atividade"):
+                        hh_por_unidade_edit = min_por_unidade_edit / 60.0
+                        repo.atualizar_atividades({
+                            "nome": novo_nome,
+                            "microarea_id": int(repo.ids("microareas", [micro])[0]) if micro else None,
+                            "categoria": categoria,
+                            "responsavel_funcao": responsavel_funcao,
+                            "hh_por_unidade": hh_por_unidade_edit,
+                            "fator_por_projeto": fator_por_projeto,
+                        }, id=row["id"])
+                        st.success("Atividade atualizado.")
+                with col_b:
+                    if st.button("Excluir atividade"):
+                        repo.excluir_atividade(row["id"])
+                        st.success("Atividade excluída.")
@@ -0,0 +1,51 @@
+"""
+Paginação no servidor para as tabelas grandes: a tela filtra, esta função
+ordena e fatia, e o st.dataframe só serializa (e estiliza) as linhas da página.
+"""
+import math
+import streamlit as st
+import numpy as np
+
+TAMANHOS_PAGINA = (25, 50, 100, 250)
+
+
+def _fatia_ordenada(df, coluna, crescente, inicio, tamanho):
+    # ordena só a coluna escolhida e copia só as linhas da página
+    valores = df[coluna].reset_index(drop=True)
+    posicoes = valores.sort_values(ascending=crescente, kind="stable", na_position="last").index
+    return df.iloc[np.asarray(posicoes[inicio:inicio + tamanho])]
+
+
+def paginar(df, chave, colunas_ordem, estilo=None, crescente=True, tamanho_padrao=50):
+    """
+    Controles de ordenação e página para `df` (já filtrado) e o st.dataframe
+    da página. Começa ordenado pela primeira de `colunas_ordem`.
+    estilo(pagina) -> Styler é aplicado só às linhas exibidas.
+    Retorna a página exibida.
+    """
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        coluna = st.selectbox("Ordenar por", colunas_ordem, key=f"{chave}_ordem")
+    with col2:
+        sentido = st.selectbox(
+            "Ordem", ["crescente", "decrescente"], index=0 if crescente else 1, key=f"{chave}_sentido"
+        )
+    with col3:
+        tamanho = st.selectbox(
+            "Linhas por página", TAMANHOS_PAGINA,
+            index=TAMANHOS_PAGINA.index(tamanho_padrao), key=f"{chave}_tamanho"
+        )
+    n_paginas = max(1, math.ceil(len(df) / tamanho))
+    # filtros ou página menor podem deixar a página guardada fora do intervalo;
+    # sem value= (o padrão já é min_value), o valor vem só do session_state
+    chave_pagina = f"{chave}_pagina"
+    if st.session_state.get(chave_pagina, 1) > n_paginas:
+        st.session_state[chave_pagina] = n_paginas
+    with col4:
+        pagina = st.number_input("Página", min_value=1, max_value=n_paginas, step=1, key=chave_pagina)
+
+    inicio = (int(pagina) - 1) * tamanho
+    df_pagina = _fatia_ordenada(df, coluna, sentido == "crescente", inicio, tamanho)
+    st.caption(f"Linhas {min(inicio + 1, len(df))}–{inicio + len(df_pagina)} de {len(df)} (página {pagina} de {n_paginas})")
+    st.dataframe(estilo(df_pagina) if estilo else df_pagina, use_container_width=True)
+    return df_pagina
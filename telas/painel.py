@@ -0,0 +1,169 @@
+"""
+Tela do painel geral de demanda x capacidade de um período.
+"""
+import streamlit as st
+import numpy as np
+import pandas as pd
+
+from engine import (
+    CARGOS_CONTRATACAO,
+    calcular_alocacoes,
+    calcular_capacidades,
+    dias_uteis_periodo,
+    get_demanda_hh,
+    get_demandas,
+    get_matriz_pesos,
+    listar_periodos,
+    otimizar_contratacoes,
+    programar_periodo,
+    resumo_diario,
+)
+from telas.contratacao import avisar_horas_descobertas, limites_contratacao
+from telas.sessao import repositorio
+
+
+def tela_painel():
+    st.header("Painel Geral - Demanda x Capacidade")
+
+    repo = repositorio()
+    colabs = repo.tabela("colaboradores")
+    microareas = repo.tabela("microareas")
+    atividades = repo.tabela("atividades")
+    pesos = get_matriz_pesos()
+    periodos = listar_periodos()
+
+    if atividades.empty or not periodos or colabs.empty:
+        st.warning("Para visualizar o painel, é necessário ter colaboradores, atividades e demandas cadastradas.")
+        return
+
+    periodo_sel = st.selectbox("Selecione o período", options=periodos)
+    demandas = get_demanda_hh([periodo_sel])
+
+    dias_uteis = st.number_input(
+        "Dias úteis no período (para cálculo das horas diárias)",
+        min_value=15, max_value=31, value=22, step=1
+    )
+
+    df_caps = calcular_capacidades(colabs, dias_uteis)
+    df_aloc, df_micro = calcular_alocacoes(colabs, microareas, atividades, demandas, pesos, periodo_sel, dias_uteis)
+
+    st.subheader("Resumo diário global (todos os grupos)")
+
+    if df_micro.empty:
+        st.info("Nenhuma demanda para o período selecionado.")
+    else:
+        resumo = resumo_diario(df_micro, colabs, dias_uteis)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Horas diárias necessárias", f"{resumo['hh_dia_necessarias']:.2f} h/dia")
+            st.metric("Colaboradores 8h necessários", f"{resumo['colabs_necessarios_8h']:.2f}")
+        with col2:
+            st.metric("Capacidade diária atual", f"{resumo['capacidade_dia_atual']:.2f} h/dia")
+            st.metric("Colaboradores 8h equivalentes atuais", f"{resumo['colabs_atuais_equiv_8h']:.2f}")
+
+        st.markdown(
+            f"**Gap de colaboradores (equivalente a 8h/dia):** "
+            f"{resumo['gap_colabs_8h']:.2f}  (positivo = falta gente, negativo = sobra capacidade)"
+        )
+
+    st.markdown("---")
+
+    st.subheader("Demanda x Capacidade por Micro-área (mensal)")
+
+    if df_micro.empty:
+        st.info("Nenhuma demanda para o período selecionado.")
+    else:
+        st.dataframe(df_micro, use_container_width=True)
+        data_chart = df_micro.set_index("microarea")[["hh_necessarias", "capacidade_mensal"]]
+        if not data_chart.empty:
+            st.bar_chart(data_chart)
+
+    st.subheader("Utilização por colaborador (mensal)")
+
+    df_col = df_caps.merge(
+        df_aloc,
+        left_on="id",
+        right_on="id_colaborador",
+        how="left"
+    )
+    df_col["hh_alocadas"] = df_col["hh_alocadas"].fillna(0.0)
+    df_col["utilizacao_%"] = (
+        df_col["hh_alocadas"] / df_col["capacidade_mensal"].replace(0, pd.NA)
+    ) * 100
+    df_col["utilizacao_%"] = df_col["utilizacao_%"].round(1)
+
+    df_col_show = df_col[[
+        "nome", "cargo", "microarea_principal",
+        "capacidade_diaria", "capacidade_mensal", "hh_alocadas", "utilizacao_%"
+    ]].sort_values("utilizacao_%", ascending=False)
+
+    st.dataframe(df_col_show, use_container_width=True)
+
+    _mostrar_programacao(colabs, atividades, pesos, periodo_sel, dias_uteis)
+
+    st.subheader("Necessidade de capacidade adicional por Micro-área (mensal)")
+
+    if not df_micro.empty:
+        df_deficit = df_micro[df_micro["saldo"] < 0].copy()
+        if df_deficit.empty:
+            st.success("Não há déficit de capacidade nas micro-áreas para o período selecionado.")
+        else:
+            plano = otimizar_contratacoes(df_deficit, dias_uteis, limites=limites_contratacao("painel"))
+            st.caption("Plano com o menor número de contratações que cobre o déficit de cada micro-área.")
+            st.dataframe(
+                plano[
+                    ["microarea", "hh_necessarias", "capacidade_mensal", "faltam_horas"]
+                    + CARGOS_CONTRATACAO
+                    + ["total_contratacoes", "horas_contratadas", "horas_descobertas"]
+                ].round(1),
+                use_container_width=True
+            )
+            avisar_horas_descobertas(plano)
+
+
+def _mostrar_programacao(colabs, atividades, pesos, periodo, dias_uteis):
+    st.subheader("Programação diária (dias úteis do período)")
+    dias = dias_uteis_periodo(periodo, dias_uteis)
+    st.caption(
+        f"{len(dias)} dias úteis em {periodo}. Cada execução de atividade vai inteira para um "
+        "colaborador vinculado (na proporção dos percentuais) e as horas que passam da carga "
+        "diária ficam pendentes para o dia seguinte."
+    )
+    # só o período programado, pela consulta indexada (não o histórico inteiro)
+    prog = programar_periodo(colabs, atividades, get_demandas(periodo), pesos, dias)
+    carga = prog["carga"]
+    if carga.empty or not (carga["hh_programadas"] > 0).any():
+        st.info("Nenhuma execução com colaborador vinculado neste período.")
+        return
+
+    pendentes_fim = carga.loc[carga["dia"] == dias[-1], "hh_pendentes"].sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Colaboradores com sobrecarga", int(carga.loc[carga["sobrecarga"], "id_colaborador"].nunique()))
+    col2.metric("Dias x colaborador em sobrecarga", int(carga["sobrecarga"].sum()))
+    col3.metric("Horas pendentes no fim do período", f"{pendentes_fim:.1f} h")
+
+    st.markdown("**Horas por dia (todos os colaboradores)**")
+    st.line_chart(carga.groupby("dia")[["hh_programadas", "hh_executadas", "capacidade_dia", "hh_pendentes"]].sum())
+
+    com_carga = carga.groupby("id_colaborador")["hh_programadas"].transform("sum") > 0
+    rotulos = carga["dia"].dt.strftime("%d/%m") if hasattr(carga["dia"], "dt") else carga["dia"].astype(str)
+    matriz = carga[com_carga].assign(dia=rotulos[com_carga], nome=carga["nome"].fillna(carga["id_colaborador"].astype(str)))
+    horas = matriz.pivot_table(index="nome", columns="dia", values="hh_programadas", aggfunc="sum", sort=False)
+    sobrecarga = matriz.pivot_table(index="nome", columns="dia", values="sobrecarga", aggfunc="any", sort=False)
+    # colaboradores com mais dias em sobrecarga primeiro
+    ordem = sobrecarga.sum(axis=1).sort_values(ascending=False, kind="stable").index
+    horas, sobrecarga = horas.loc[ordem], sobrecarga.loc[ordem]
+    st.markdown("**Horas programadas por dia x colaborador** (em vermelho: dia terminado com horas pendentes)")
+    st.dataframe(
+        horas.round(1).style.apply(
+            lambda _: np.where(sobrecarga.to_numpy(), "background-color: #f8d7da", ""), axis=None
+        ),
+        use_container_width=True
+    )
+
+    if not prog["execucoes_longas"].empty:
+        st.warning("Execuções maiores que a carga diária de quem as recebe (não cabem num dia):")
+        st.dataframe(prog["execucoes_longas"].round(2), use_container_width=True)
+    if not prog["sem_vinculo"].empty:
+        st.info(f"{prog['sem_vinculo']['hh'].sum():.1f} h de atividades sem colaborador vinculado ficaram fora da programação.")
@@ -0,0 +1,13 @@
+"""
+Repositório da sessão: as tabelas do cadastro ficam em st.session_state e
+são compartilhadas entre telas e reruns, em vez de relidas a cada tela.
+"""
+import streamlit as st
+
+from engine import Repositorio
+
+
+def repositorio():
+    if "repositorio" not in st.session_state:
+        st.session_state["repositorio"] = Repositorio()
+    return st.session_state["repositorio"]
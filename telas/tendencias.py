@@ -0,0 +1,75 @@
+"""
+Tela de tendências de demanda x capacidade em todos os períodos.
+"""
+import streamlit as st
+
+from engine import (
+    CARGOS_CONTRATACAO,
+    calcular_alocacoes_lote,
+    get_demanda_hh,
+    get_matriz_pesos,
+    otimizar_contratacoes,
+)
+from telas.contratacao import avisar_horas_descobertas, limites_contratacao
+from telas.sessao import repositorio
+
+
+def tela_tendencias():
+    st.header("Tendências - Demanda x Capacidade por período")
+
+    repo = repositorio()
+    colabs = repo.tabela("colaboradores")
+    atividades = repo.tabela("atividades")
+    demandas = get_demanda_hh()
+    pesos = get_matriz_pesos()
+
+    if atividades.empty or demandas["por_atividade"].empty or colabs.empty:
+        st.warning("Para visualizar as tendências, é necessário ter colaboradores, atividades e demandas cadastradas.")
+        return
+
+    dias_uteis = st.number_input(
+        "Dias úteis por período (para cálculo da capacidade mensal)",
+        min_value=15, max_value=31, value=22, step=1
+    )
+
+    df_micro, df_colab = calcular_alocacoes_lote(colabs, atividades, demandas, pesos, dias_uteis)
+
+    st.subheader("Saldo por micro-área ao longo dos períodos (capacidade - demanda)")
+    saldo = df_micro.pivot_table(index="periodo", columns="microarea", values="saldo", aggfunc="sum", observed=True)
+    st.line_chart(saldo)
+
+    st.subheader("Demanda total x capacidade total por período")
+    totais = df_micro.groupby("periodo", observed=True)[["hh_necessarias", "capacidade_mensal"]].sum()
+    st.line_chart(totais)
+
+    st.subheader("Déficits (períodos x micro-áreas com saldo negativo)")
+    df_deficit = df_micro[df_micro["saldo"] < 0].copy()
+    if df_deficit.empty:
+        st.success("Não há déficit de capacidade em nenhum período.")
+    else:
+        df_deficit["faltam_horas"] = -df_deficit["saldo"]
+        st.dataframe(
+            df_deficit.pivot_table(index="microarea", columns="periodo", values="faltam_horas", aggfunc="sum", observed=True).round(1),
+            use_container_width=True
+        )
+
+        st.subheader("Plano de contratações por período")
+        plano = otimizar_contratacoes(df_deficit, dias_uteis, limites=limites_contratacao("tendencias"))
+        st.dataframe(
+            plano.pivot_table(index="microarea", columns="periodo", values="total_contratacoes", aggfunc="sum", observed=True),
+            use_container_width=True
+        )
+        st.markdown("**Plano que cobre todos os períodos (período de maior déficit de cada micro-área)**")
+        pior = plano.loc[plano.groupby("microarea", observed=True)["faltam_horas"].idxmax()]
+        st.dataframe(
+            pior[
+                ["microarea", "periodo", "faltam_horas"] + CARGOS_CONTRATACAO
+                + ["total_contratacoes", "horas_contratadas", "horas_descobertas"]
+            ].round(1),
+            use_container_width=True
+        )
+        avisar_horas_descobertas(pior)
+
+    st.subheader("Utilização por colaborador (%) por período")
+    util = df_colab.pivot_table(index="nome", columns="periodo", values="utilizacao_%", aggfunc="sum", observed=True)
+    st.dataframe(util, use_container_width=True)
@@ -0,0 +1,48 @@
+"""
+Importação em lote num cadastro vazio: referências a micro-áreas, atividades
+ou colaboradores inexistentes viram linhas rejeitadas, não exceções.
+Cada caso roda o CLI num APP_DATA_DIR novo (o storage é global ao processo).
+"""
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _importar(tmp_path, tabela, conteudo):
+    arquivo = tmp_path / f"{tabela}.csv"
+    arquivo.write_text(conteudo, encoding="utf-8")
+    rejeitadas = tmp_path / "rejeitadas.csv"
+    resultado = subprocess.run(
+        [sys.executable, os.path.join(RAIZ, "engine.py"), "importar", "--tabela", tabela,
+         str(arquivo), "--rejeitadas", str(rejeitadas)],
+        cwd=RAIZ, capture_output=True, text=True,
+        env={**os.environ, "APP_DATA_DIR": str(tmp_path / "data"), "APP_STORAGE": "csv"},
+    )
+    assert resultado.returncode == 0, resultado.stderr
+    return resultado.stdout, pd.read_csv(rejeitadas) if rejeitadas.exists() else pd.DataFrame()
+
+
+def test_colaboradores_em_cadastro_vazio(tmp_path):
+    from engine import CARGOS
+    saida, rejeitadas = _importar(
+        tmp_path, "colaboradores",
+        f"nome,cargo,carga_diaria,microarea_principal\nAna,{CARGOS[0]},,\nBeto,{CARGOS[0]},8,Inexistente\n",
+    )
+    assert saida.startswith("1 linhas importadas, 1 rejeitadas")
+    assert rejeitadas["motivo"].tolist() == ["microarea_principal não cadastrada"]
+
+
+@pytest.mark.parametrize("tabela, conteudo, motivo", [
+    ("atividades", "nome,microarea,minutos,percentual\nColeta,Inexistente,10,50\n", "microarea não cadastrada"),
+    ("colab_atividades", "colaborador,atividade,percentual\nAna,Coleta,50\n", "colaborador não cadastrado"),
+    ("demandas", "periodo,atividade,quantidade\n2024-01,Coleta,3\n", "atividade não cadastrada"),
+])
+def test_referencias_em_cadastro_vazio(tmp_path, tabela, conteudo, motivo):
+    saida, rejeitadas = _importar(tmp_path, tabela, conteudo)
+    assert saida.startswith("0 linhas importadas, 1 rejeitadas")
+    assert motivo in rejeitadas["motivo"].iloc[0]